@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 
-from .routers import note, provider, model, config
+from .routers import note, provider, model, config, task, metrics
 
 
 
@@ -10,5 +10,8 @@ def create_app(lifespan) -> FastAPI:
     app.include_router(provider.router, prefix="/api")
     app.include_router(model.router,prefix="/api")
     app.include_router(config.router,  prefix="/api")
+    app.include_router(task.router, prefix="/api")
+    # Prometheus 默认抓取 /metrics，不加 /api 前缀
+    app.include_router(metrics.router)
 
     return app
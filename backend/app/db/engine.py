@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,16 +12,72 @@ load_dotenv()
 # 默认 SQLite，如果想换 PostgreSQL 或 MySQL，可以直接改 .env
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///bili_note.db")
 
-# SQLite 需要特定连接参数，其他数据库不需要
-engine_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    engine_args["connect_args"] = {"check_same_thread": False}
+# 连接池大小，默认按会同时访问数据库的线程数推算：视频线程池 + 多变体总结线程池 + 执行任务与处理请求的线程
+# （DB_REQUEST_CONNECTIONS）；溢出连接用完后最多等待 DB_POOL_TIMEOUT 秒
+DB_REQUEST_CONNECTIONS = int(os.getenv("DB_REQUEST_CONNECTIONS", "4"))
+DB_POOL_SIZE = int(os.getenv(
+    "DB_POOL_SIZE",
+    str(int(os.getenv("VIDEO_WORKERS", "2")) + int(os.getenv("SUMMARY_WORKERS", "4")) + DB_REQUEST_CONNECTIONS),
+))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# SQLite 写锁被占用时的等待时间（毫秒），超时才报 database is locked
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _apply_sqlite_pragmas(engine: Engine) -> None:
+    """
+    每个新连接建立时设置 WAL、synchronous=NORMAL 与 busy_timeout：
+    WAL 下读写互不阻塞，NORMAL 在 WAL 下仍保证崩溃一致性，busy_timeout 让并发写入排队等待而不是立即失败
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(database_url: str = DATABASE_URL, **kwargs) -> Engine:
+    """
+    按数据库类型创建 Engine：SQLite 文件库启用 WAL 等 PRAGMA 并使用连接池，其他数据库只配置连接池。
+
+    :param database_url: SQLAlchemy 连接串
+    :param kwargs: 透传给 create_engine 的额外参数
+    """
+    engine_args = {
+        "echo": os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true",
+    }
+    is_sqlite = database_url.startswith("sqlite")
+    if is_sqlite:
+        # SQLite 需要特定连接参数，其他数据库不需要
+        engine_args["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    if not (is_sqlite and _is_memory_sqlite(database_url)):
+        engine_args.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=not is_sqlite,
+        )
+    engine_args.update(kwargs)
+
+    engine = create_engine(database_url, **engine_args)
+    if is_sqlite and not _is_memory_sqlite(database_url):
+        _apply_sqlite_pragmas(engine)
+    return engine
+
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true",
-    **engine_args
-)
+engine = create_db_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -33,4 +93,37 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    工作单元：块内的所有写操作在同一事务中提交，异常时整体回滚
+
+    用法：
+        with session_scope() as db:
+            insert_video_task(..., db=db)
+            ...
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_or_scope(db: Optional[Session] = None) -> Iterator[Session]:
+    """
+    传入 db 时直接复用（提交由外层工作单元负责），否则开启一个新的工作单元
+    """
+    if db is not None:
+        yield db
+    else:
+        with session_scope() as new_db:
+            yield new_db
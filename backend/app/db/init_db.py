@@ -1,9 +1,12 @@
 from app.db.models.models import Model
 from app.db.models.providers import Provider
 from app.db.models.video_tasks import VideoTask
+from app.db.models.llm_usage import LLMUsage
 from app.db.engine import get_engine, Base
+from app.db.migrations import run_migrations
 
 def init_db():
     engine = get_engine()
 
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
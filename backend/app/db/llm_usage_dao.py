@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Integer, String, func, type_coerce
+from sqlalchemy.orm import Session
+
+from app.db.engine import session_or_scope
+from app.db.models.llm_usage import LLMUsage
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 汇总接口允许的分组维度
+GROUP_COLUMNS = {
+    "provider": LLMUsage.provider_id,
+    "model": LLMUsage.model,
+    "style": LLMUsage.style,
+    "day": func.date(LLMUsage.created_at),
+}
+
+
+def insert_llm_usage(task_id: str, provider_id: Optional[str] = None, model: Optional[str] = None,
+                     style: Optional[str] = None, prompt_tokens: int = 0, completion_tokens: int = 0,
+                     cached_tokens: int = 0, latency_ms: Optional[float] = None, cache_hit: bool = False,
+                     cost: Optional[float] = None, db: Optional[Session] = None):
+    try:
+        with session_or_scope(db) as session:
+            session.add(LLMUsage(task_id=task_id, provider_id=provider_id, model=model, style=style,
+                                 prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                 cached_tokens=cached_tokens, latency_ms=latency_ms, cache_hit=cache_hit,
+                                 cost=cost))
+    except Exception as e:
+        logger.error(f"Failed to insert llm usage: {e}")
+        raise
+
+
+def list_task_usage(task_id: str, db: Optional[Session] = None) -> List[dict]:
+    try:
+        with session_or_scope(db) as session:
+            rows = (
+                session.query(LLMUsage)
+                .filter(LLMUsage.task_id == task_id)
+                .order_by(LLMUsage.id)
+                .all()
+            )
+            return [
+                {
+                    "provider_id": row.provider_id,
+                    "model": row.model,
+                    "style": row.style,
+                    "prompt_tokens": row.prompt_tokens,
+                    "completion_tokens": row.completion_tokens,
+                    "cached_tokens": row.cached_tokens,
+                    "latency_ms": row.latency_ms,
+                    "cache_hit": bool(row.cache_hit),
+                    "cost": row.cost,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                }
+                for row in rows
+            ]
+    except Exception as e:
+        logger.error(f"Failed to list llm usage: {e}")
+        raise
+
+
+def aggregate_llm_usage(group_by: Sequence[str] = ("provider", "model", "day"),
+                        created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                        db: Optional[Session] = None) -> List[dict]:
+    """
+    按维度汇总调用次数、token、耗时与费用
+
+    :param group_by: GROUP_COLUMNS 中的维度，顺序即排序顺序
+    :param created_from: 创建时间下界（含，UTC）
+    :param created_to: 创建时间上界（不含，UTC）
+    """
+    unknown = [g for g in group_by if g not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown group_by: {', '.join(unknown)}")
+    keys = [GROUP_COLUMNS[g].label(g) for g in group_by]
+    try:
+        with session_or_scope(db) as session:
+            query = session.query(
+                *keys,
+                func.count(LLMUsage.id).label("calls"),
+                func.sum(type_coerce(LLMUsage.cache_hit, Integer)).label("cache_hits"),
+                func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+                func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+                func.sum(LLMUsage.cached_tokens).label("cached_tokens"),
+                func.avg(LLMUsage.latency_ms).label("avg_latency_ms"),
+                func.sum(LLMUsage.cost).label("cost"),
+            )
+            # created_at 由 SQLite CURRENT_TIMESTAMP 生成，按同一格式做字符串比较才能走索引
+            created_at = type_coerce(LLMUsage.created_at, String)
+            if created_from:
+                query = query.filter(created_at >= created_from.strftime("%Y-%m-%d %H:%M:%S"))
+            if created_to:
+                query = query.filter(created_at < created_to.strftime("%Y-%m-%d %H:%M:%S"))
+            if keys:
+                query = query.group_by(*keys).order_by(*keys)
+            items = []
+            for row in query.all():
+                item = row._asdict()
+                for field in ("cache_hits", "prompt_tokens", "completion_tokens", "cached_tokens"):
+                    item[field] = int(item[field] or 0)
+                if "day" in item and item["day"] is not None:
+                    item["day"] = str(item["day"])
+                items.append(item)
+            return items
+    except Exception as e:
+        logger.error(f"Failed to aggregate llm usage: {e}")
+        raise
@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.db.engine import get_engine
+from app.db.migrations import m001_video_task_history, m002_video_task_projection, m003_llm_usage
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 按版本号顺序执行；新增迁移时在此追加模块，模块需提供 VERSION、DESCRIPTION、upgrade(conn)
+MIGRATIONS = [
+    m001_video_task_history,
+    m002_video_task_projection,
+    m003_llm_usage,
+]
+
+
+def run_migrations(engine: Optional[Engine] = None) -> List[int]:
+    """
+    执行尚未应用的迁移，已应用的版本记录在 schema_migrations 表中。
+    每个迁移在独立事务中执行，失败时回滚该迁移并抛出。
+
+    :param engine: 目标数据库，默认使用全局 engine
+    :return: 本次新应用的版本号列表
+    """
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    newly_applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.VERSION):
+        if migration.VERSION in applied:
+            continue
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                {"version": migration.VERSION, "description": migration.DESCRIPTION},
+            )
+        logger.info(f"Migration applied: {migration.VERSION} {migration.DESCRIPTION}")
+        newly_applied.append(migration.VERSION)
+    return newly_applied
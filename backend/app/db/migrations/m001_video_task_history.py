@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.utils import add_column_if_missing, create_index_if_missing
+
+VERSION = 1
+DESCRIPTION = "video_tasks: status/duration/result_path 列与历史查询索引"
+
+
+def upgrade(conn: Connection) -> None:
+    add_column_if_missing(conn, "video_tasks", "status", "VARCHAR")
+    add_column_if_missing(conn, "video_tasks", "duration", "FLOAT")
+    add_column_if_missing(conn, "video_tasks", "result_path", "VARCHAR")
+    create_index_if_missing(conn, "ix_video_tasks_platform_video_created", "video_tasks",
+                            ["platform", "video_id", "created_at"])
+    create_index_if_missing(conn, "ix_video_tasks_created_id", "video_tasks", ["created_at", "id"])
+    # 旧版本只在任务成功后才写入记录
+    conn.execute(text("UPDATE video_tasks SET status = 'SUCCESS' WHERE status IS NULL"))
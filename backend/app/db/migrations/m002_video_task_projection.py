@@ -0,0 +1,13 @@
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.utils import add_column_if_missing, create_index_if_missing
+
+VERSION = 2
+DESCRIPTION = "video_tasks: title/cover_url 列与按平台、状态筛选的索引"
+
+
+def upgrade(conn: Connection) -> None:
+    add_column_if_missing(conn, "video_tasks", "title", "VARCHAR")
+    add_column_if_missing(conn, "video_tasks", "cover_url", "VARCHAR")
+    create_index_if_missing(conn, "ix_video_tasks_platform_id", "video_tasks", ["platform", "id"])
+    create_index_if_missing(conn, "ix_video_tasks_status_id", "video_tasks", ["status", "id"])
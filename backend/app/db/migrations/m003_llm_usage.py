@@ -0,0 +1,11 @@
+from sqlalchemy.engine import Connection
+
+from app.db.models.llm_usage import LLMUsage
+
+VERSION = 3
+DESCRIPTION = "llm_usage: 每次 LLM 调用的 token 用量、耗时与费用"
+
+
+def upgrade(conn: Connection) -> None:
+    # 新库已由 create_all 建表，checkfirst 时跳过
+    LLMUsage.__table__.create(conn, checkfirst=True)
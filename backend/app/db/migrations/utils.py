@@ -0,0 +1,30 @@
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def add_column_if_missing(conn: Connection, table: str, column: str, ddl_type: str) -> bool:
+    """
+    表中不存在该列时执行 ALTER TABLE ADD COLUMN（新库由 create_all 建好的列会被跳过）
+
+    :return: 是否新增了列
+    """
+    columns = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column in columns:
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    return True
+
+
+def create_index_if_missing(conn: Connection, name: str, table: str, columns: List[str]) -> bool:
+    """
+    索引不存在时创建
+
+    :return: 是否新建了索引
+    """
+    indexes = {i["name"] for i in inspect(conn).get_indexes(table)}
+    if name in indexes:
+        return False
+    conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    return True
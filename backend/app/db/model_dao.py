@@ -1,5 +1,6 @@
 from app.db.engine import get_db
 from app.db.models.models import Model
+from app.db.registry import provider_registry
 
 
 def get_model_by_provider_and_name(provider_id: int, model_name: str):
@@ -25,6 +26,7 @@ def insert_model(provider_id: int, model_name: str):
         db.add(model)
         db.commit()
         db.refresh(model)
+        provider_registry.invalidate()
         return {
             "id": model.id,
             "provider_id": model.provider_id,
@@ -51,6 +53,7 @@ def delete_model(model_id: int):
         if model:
             db.delete(model)
             db.commit()
+            provider_registry.invalidate()
     finally:
         db.close()
 
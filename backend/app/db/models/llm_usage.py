@@ -0,0 +1,28 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String, func
+
+from app.db.engine import Base
+
+
+class LLMUsage(Base):
+    """
+    每次 LLM 调用一条用量记录，按任务查询或按供应商 / 模型 / 日期汇总
+    """
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        Index("ix_llm_usage_task_id", "task_id"),
+        # 汇总接口按时间范围筛选
+        Index("ix_llm_usage_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(String, nullable=False)
+    provider_id = Column(String, nullable=True)
+    model = Column(String, nullable=True)
+    style = Column(String, nullable=True)             # 笔记风格，便于比较不同风格的开销
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cached_tokens = Column(Integer, default=0)        # 命中供应商前缀缓存的输入 token
+    latency_ms = Column(Float, nullable=True)         # 请求耗时（不含限流排队与重试退避）
+    cache_hit = Column(Boolean, default=False)        # 命中本地 LLM 响应缓存，未实际请求
+    cost = Column(Float, nullable=True)               # 按 LLM_PRICES 估算的费用，未配置价格时为空
+    created_at = Column(DateTime, server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index, func
 from sqlalchemy.orm import declarative_base
 
 from app.db.engine import Base
@@ -6,9 +6,23 @@ from app.db.engine import Base
 
 class VideoTask(Base):
     __tablename__ = "video_tasks"
+    __table_args__ = (
+        # 按视频查最新任务（get_task_by_video）
+        Index("ix_video_tasks_platform_video_created", "platform", "video_id", "created_at"),
+        # 任务历史按时间范围筛选
+        Index("ix_video_tasks_created_id", "created_at", "id"),
+        # 按平台 / 状态筛选后仍按 id 倒序分页
+        Index("ix_video_tasks_platform_id", "platform", "id"),
+        Index("ix_video_tasks_status_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     video_id = Column(String, nullable=False)
     platform = Column(String, nullable=False)
     task_id = Column(String, unique=True, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+    status = Column(String, nullable=True)        # TaskStatus 取值
+    duration = Column(Float, nullable=True)       # 视频时长（秒）
+    result_path = Column(String, nullable=True)   # 笔记结果文件路径
+    title = Column(String, nullable=True)         # 视频标题
+    cover_url = Column(String, nullable=True)     # 视频封面
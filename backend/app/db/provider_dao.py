@@ -4,6 +4,7 @@ import sys
 from app.db.models.providers import Provider
 from app.utils.logger import get_logger
 from app.db.engine import get_engine, Base, get_db
+from app.db.registry import provider_registry
 
 logger = get_logger(__name__)
 
@@ -42,6 +43,7 @@ def seed_default_providers():
                 enabled=p.get('enabled', 1)
             ))
         db.commit()
+        provider_registry.invalidate()
         logger.info("Default providers seeded successfully.")
     except Exception as e:
         logger.error(f"Failed to seed default providers: {e}")
@@ -55,6 +57,7 @@ def insert_provider(id: str, name: str, api_key: str, base_url: str, logo: str,
         provider = Provider(id=id, name=name, api_key=api_key, base_url=base_url, logo=logo, type=type_, enabled=enabled)
         db.add(provider)
         db.commit()
+        provider_registry.invalidate()
         logger.info(f"Provider inserted successfully. id: {id}, name: {name}, type: {type_}")
         return id
     except Exception as e:
@@ -108,6 +111,7 @@ def update_provider(id: str, **kwargs):
                 setattr(provider, key, value)
 
         db.commit()
+        provider_registry.invalidate()
         logger.info(f"Provider updated successfully. id: {id}, updated_fields: {list(kwargs.keys())}")
     except Exception as e:
         logger.error(f"Failed to update provider: {e}")
@@ -122,6 +126,7 @@ def delete_provider(id: str):
         if provider:
             db.delete(provider)
             db.commit()
+            provider_registry.invalidate()
             logger.info(f"Provider deleted successfully. id: {id}")
     except Exception as e:
         logger.error(f"Failed to delete provider: {e}")
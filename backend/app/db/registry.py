@@ -0,0 +1,125 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.db.engine import get_db
+from app.db.models.models import Model
+from app.db.models.providers import Provider
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def provider_row_to_dict(p: Provider) -> dict:
+    return {
+        "id": p.id,
+        "name": p.name,
+        "logo": p.logo,
+        "type": p.type,
+        "enabled": p.enabled,
+        "base_url": p.base_url,
+        "api_key": p.api_key,
+        "created_at": jsonable_encoder(p.created_at),
+    }
+
+
+def model_row_to_dict(m: Model) -> dict:
+    return {
+        "id": m.id,
+        "provider_id": m.provider_id,
+        "model_name": m.model_name,
+        "created_at": jsonable_encoder(m.created_at),
+    }
+
+
+class _Snapshot:
+    def __init__(self, providers: List[dict], models: List[dict]):
+        self.providers = providers
+        self.providers_by_id: Dict[str, dict] = {str(p["id"]): p for p in providers}
+        self.providers_by_name: Dict[str, dict] = {}
+        for p in providers:
+            # 与 DAO 的 first() 语义一致：同名时取先出现的记录
+            self.providers_by_name.setdefault(p["name"], p)
+        self.models = models
+        self.models_by_provider: Dict[str, List[dict]] = {}
+        self.models_by_key: Dict[Tuple[str, str], dict] = {}
+        for m in models:
+            self.models_by_provider.setdefault(str(m["provider_id"]), []).append(m)
+            self.models_by_key.setdefault((str(m["provider_id"]), m["model_name"]), m)
+
+
+class ProviderRegistry:
+    """
+    供应商 / 模型的进程内只读缓存。
+
+    - 首次访问（或启动时 load）一次性读取 providers、models 两张表，之后的查询都是字典读取
+    - DAO 的写操作提交后调用 invalidate，下一次读取时重新加载
+    - 快照整体替换，读取无需加锁；加载期间若发生写入（代数变化），本次结果不落入缓存，避免旧数据覆盖
+    - 返回的都是副本，调用方修改不会污染缓存
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0
+
+    def load(self) -> None:
+        """
+        从数据库加载全部供应商与模型
+        """
+        self._get_snapshot(force=True)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def get_all_providers(self) -> List[dict]:
+        return [dict(p) for p in self._get_snapshot().providers]
+
+    def get_enabled_providers(self) -> List[dict]:
+        return [dict(p) for p in self._get_snapshot().providers if p.get("enabled") == 1]
+
+    def get_provider_by_id(self, id) -> Optional[dict]:
+        p = self._get_snapshot().providers_by_id.get(str(id))
+        return dict(p) if p else None
+
+    def get_provider_by_name(self, name: str) -> Optional[dict]:
+        p = self._get_snapshot().providers_by_name.get(name)
+        return dict(p) if p else None
+
+    def get_all_models(self) -> List[dict]:
+        return [dict(m) for m in self._get_snapshot().models]
+
+    def get_models_by_provider(self, provider_id) -> List[dict]:
+        return [dict(m) for m in self._get_snapshot().models_by_provider.get(str(provider_id), [])]
+
+    def get_model_by_provider_and_name(self, provider_id, model_name: str) -> Optional[dict]:
+        m = self._get_snapshot().models_by_key.get((str(provider_id), model_name))
+        return dict(m) if m else None
+
+    # ---------------- 私有方法 ----------------
+
+    def _get_snapshot(self, force: bool = False) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not force:
+            return snapshot
+
+        generation = self._generation
+        db = next(get_db())
+        try:
+            providers = [provider_row_to_dict(p) for p in db.query(Provider).all()]
+            models = [model_row_to_dict(m) for m in db.query(Model).all()]
+        finally:
+            db.close()
+        snapshot = _Snapshot(providers, models)
+
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+        logger.info(f"Provider registry loaded: {len(providers)} providers, {len(models)} models")
+        return snapshot
+
+
+provider_registry = ProviderRegistry()
@@ -1,61 +1,225 @@
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import String, type_coerce
+from sqlalchemy.orm import Session
+
 from app.db.models.video_tasks import VideoTask
-from app.db.engine import get_db
+from app.db.engine import session_or_scope
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 以下函数均接受可选的 db：传入时加入调用方的工作单元（session_scope）一并提交，否则各自独立提交。
+# 失败时记录日志并抛出，由调用方决定是否忽略。
+
 
 # 插入任务
-def insert_video_task(video_id: str, platform: str, task_id: str):
-    db = next(get_db())
+def insert_video_task(video_id: str, platform: str, task_id: str, status: Optional[str] = None,
+                      duration: Optional[float] = None, result_path: Optional[str] = None,
+                      db: Optional[Session] = None):
     try:
-        task = VideoTask(video_id=video_id, platform=platform, task_id=task_id)
-        db.add(task)
-        db.commit()
-        db.refresh(task)
+        with session_or_scope(db) as session:
+            session.add(VideoTask(video_id=video_id, platform=platform, task_id=task_id, status=status,
+                                  duration=duration, result_path=result_path))
         logger.info(f"Video task inserted successfully. video_id: {video_id}, platform: {platform}, task_id: {task_id}")
     except Exception as e:
         logger.error(f"Failed to insert video task: {e}")
-    finally:
-        db.close()
+        raise
 
 
 # 查询任务（最新一条）
-def get_task_by_video(video_id: str, platform: str):
-    db = next(get_db())
+def get_task_by_video(video_id: str, platform: str, db: Optional[Session] = None):
     try:
-        task = (
-            db.query(VideoTask)
-            .filter_by(video_id=video_id, platform=platform)
-            .order_by(VideoTask.created_at.desc())
-            .first()
-        )
-        if task:
-            logger.info(f"Task found for video_id: {video_id} and platform: {platform}")
-            return task.task_id
-        else:
-            logger.info(f"No task found for video_id: {video_id} and platform: {platform}")
-            return None
+        with session_or_scope(db) as session:
+            task = (
+                session.query(VideoTask)
+                .filter_by(video_id=video_id, platform=platform)
+                .order_by(VideoTask.created_at.desc())
+                .first()
+            )
+            if task:
+                logger.info(f"Task found for video_id: {video_id} and platform: {platform}")
+                return task.task_id
+            else:
+                logger.info(f"No task found for video_id: {video_id} and platform: {platform}")
+                return None
     except Exception as e:
         logger.error(f"Failed to get task by video: {e}")
-    finally:
-        db.close()
+        raise
 
 
 # 删除任务
-def delete_task_by_video(video_id: str, platform: str):
-    db = next(get_db())
+def delete_task_by_video(video_id: str, platform: str, db: Optional[Session] = None):
     try:
-        tasks = (
-            db.query(VideoTask)
-            .filter_by(video_id=video_id, platform=platform)
-            .all()
-        )
-        for task in tasks:
-            db.delete(task)
-        db.commit()
-        logger.info(f"Task(s) deleted for video_id: {video_id} and platform: {platform}")
+        with session_or_scope(db) as session:
+            deleted = (
+                session.query(VideoTask)
+                .filter_by(video_id=video_id, platform=platform)
+                .delete(synchronize_session=False)
+            )
+        logger.info(f"{deleted} task(s) deleted for video_id: {video_id} and platform: {platform}")
+        return deleted
     except Exception as e:
         logger.error(f"Failed to delete task by video: {e}")
-    finally:
-        db.close()
\ No newline at end of file
+        raise
+
+
+def encode_cursor(id_: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{id_}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    prefix, id_ = raw.split(":", 1)
+    if prefix != "id":
+        raise ValueError(f"invalid cursor: {cursor}")
+    return int(id_)
+
+
+def task_to_dict(task: VideoTask) -> dict:
+    return {
+        "task_id": task.task_id,
+        "video_id": task.video_id,
+        "platform": task.platform,
+        "status": task.status,
+        "title": task.title,
+        "cover_url": task.cover_url,
+        "duration": task.duration,
+        "result_path": task.result_path,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+    }
+
+
+# 插入或更新任务（按 task_id）
+def save_video_task(task_id: str, video_id: Optional[str] = None, platform: Optional[str] = None,
+                    db: Optional[Session] = None, **fields):
+    """
+    记录不存在时插入，存在时（如重试复用 task_id）更新；fields 中为 None 的字段保持原值
+
+    :param fields: status / title / cover_url / duration / result_path 等列
+    """
+    try:
+        with session_or_scope(db) as session:
+            task = session.query(VideoTask).filter_by(task_id=task_id).first()
+            if task is None:
+                task = VideoTask(task_id=task_id, video_id=video_id or "", platform=platform or "")
+                session.add(task)
+            else:
+                task.video_id = video_id or task.video_id
+                task.platform = platform or task.platform
+            for key, value in fields.items():
+                if value is not None:
+                    setattr(task, key, value)
+    except Exception as e:
+        logger.error(f"Failed to save video task: {e}")
+        raise
+
+
+# 更新已有任务的字段，返回受影响行数（记录不存在时为 0）
+def update_video_task(task_id: str, db: Optional[Session] = None, **fields) -> int:
+    try:
+        with session_or_scope(db) as session:
+            return (
+                session.query(VideoTask)
+                .filter_by(task_id=task_id)
+                .update(fields, synchronize_session=False)
+            )
+    except Exception as e:
+        logger.error(f"Failed to update video task: {e}")
+        raise
+
+
+# 历史列表只取轻量字段，不读取笔记结果文件
+HISTORY_COLUMNS = (
+    VideoTask.id,
+    VideoTask.task_id,
+    VideoTask.video_id,
+    VideoTask.platform,
+    VideoTask.status,
+    VideoTask.title,
+    VideoTask.cover_url,
+    VideoTask.duration,
+    VideoTask.created_at,
+)
+
+
+def _to_db_time(value: datetime) -> str:
+    # created_at 由 SQLite CURRENT_TIMESTAMP 生成（UTC，'YYYY-MM-DD HH:MM:SS'），按同一格式做字符串比较才能走索引且边界准确
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _id_range_for_dates(session: Session, created_from: Optional[datetime],
+                        created_to: Optional[datetime]) -> Optional[Tuple[int, int]]:
+    """
+    把创建时间范围换算成 id 范围：id 与 created_at 同序，两端各一次 (created_at, id) 索引定位即可，
+    之后的筛选与分页都走主键，避免「时间范围 + 按 id 排序」时扫描整个范围
+
+    :return: (最小 id, 最大 id)，范围内没有记录时为 None
+    """
+    created_at = type_coerce(VideoTask.created_at, String)
+    lower = session.query(VideoTask.id)
+    upper = session.query(VideoTask.id)
+    if created_from:
+        lower = lower.filter(created_at >= _to_db_time(created_from))
+        upper = upper.filter(created_at >= _to_db_time(created_from))
+    if created_to:
+        lower = lower.filter(created_at < _to_db_time(created_to))
+        upper = upper.filter(created_at < _to_db_time(created_to))
+    low = lower.order_by(created_at, VideoTask.id).limit(1).scalar()
+    high = upper.order_by(created_at.desc(), VideoTask.id.desc()).limit(1).scalar()
+    if low is None or high is None:
+        return None
+    return low, high
+
+
+# 任务历史（按创建时间倒序，keyset 分页）
+def list_video_tasks(limit: int = 20, cursor: Optional[str] = None,
+                     platform: Optional[str] = None, status: Optional[str] = None,
+                     created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                     db: Optional[Session] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    keyset 分页：自增 id 与插入时间同序，按 id 倒序翻页，翻到任意深度都只需一次主键定位，不随 offset 变慢。
+    （created_at 由数据库按秒生成，同一秒内的记录无法用它稳定排序，因此游标只使用 id）
+
+    :param limit: 每页条数
+    :param cursor: 上一页返回的 next_cursor，首页为空
+    :param platform: 按平台筛选
+    :param status: 按任务状态筛选
+    :param created_from: 创建时间下界（含，UTC）
+    :param created_to: 创建时间上界（不含，UTC）
+    :return: (任务列表, 下一页游标)，没有更多数据时游标为 None
+    """
+    try:
+        with session_or_scope(db) as session:
+            query = session.query(*HISTORY_COLUMNS)
+            if platform:
+                query = query.filter(VideoTask.platform == platform)
+            if status:
+                query = query.filter(VideoTask.status == status)
+            if created_from or created_to:
+                id_range = _id_range_for_dates(session, created_from, created_to)
+                if id_range is None:
+                    return [], None
+                query = query.filter(VideoTask.id.between(*id_range))
+            if cursor:
+                query = query.filter(VideoTask.id < decode_cursor(cursor))
+            rows = (
+                query.order_by(VideoTask.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].id) if has_more else None
+            items = []
+            for row in rows:
+                item = row._asdict()
+                item.pop("id")
+                item["created_at"] = row.created_at.isoformat() if row.created_at else None
+                items.append(item)
+            return items, next_cursor
+    except Exception as e:
+        logger.error(f"Failed to list video tasks: {e}")
+        raise
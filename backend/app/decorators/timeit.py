@@ -1,13 +1,15 @@
-import time
-import functools
-
-def timeit(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        end = time.perf_counter()
-        duration = end - start
-        print(f"{func.__name__} executed in {duration:.4f} seconds")
-        return result
-    return wrapper
+from app.utils.metrics import stage_timer
+
+
+def timeit(stage):
+    """
+    记录函数耗时到 Prometheus 阶段直方图（bilinote_stage_duration_seconds）
+
+        @timeit("transcription")
+        def transcript(...): ...
+
+    兼容旧的无参写法 @timeit，此时以函数名作为阶段名
+    """
+    if callable(stage):
+        return stage_timer(stage.__name__)(stage)
+    return stage_timer(stage)
@@ -1,10 +1,11 @@
 import enum
 
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import Optional, Sequence, Union
 
 from app.enmus.note_enums import DownloadQuality
 from app.models.notes_model import AudioDownloadResult
+from app.models.video_model import VideoStream
 from os import getenv
 QUALITY_MAP = {
     "fast": "32",
@@ -12,8 +13,84 @@ QUALITY_MAP = {
     "slow": "128"
 }
 
+# 各档位的目标音频码率（kbps），None 表示不限制、取最佳音质
+AUDIO_ABR_MAP = {
+    "fast": 64,
+    "medium": 128,
+    "slow": None,
+}
+
+
+def audio_quality(quality: Union[DownloadQuality, str, None]) -> str:
+    '''
+    将 DownloadQuality 映射为 FFmpegExtractAudio 的 preferredquality（kbps），未知取值回退到 fast
+
+    :param quality: fast | medium | slow
+    '''
+    key = getattr(quality, "value", quality)
+    return QUALITY_MAP.get(key, QUALITY_MAP["fast"])
+
+
+def audio_format_opts(quality: Union[DownloadQuality, str, None],
+                      audio_formats: Optional[Sequence[str]] = None) -> dict:
+    '''
+    构造 yt-dlp 的纯音频流选择参数：优先选择转写器可直接读取的封装格式，
+    再按 DownloadQuality 对应的目标码率选出够用且体积最小的音轨。
+
+    :param quality: fast | medium | slow
+    :param audio_formats: 转写器可直接读取的音频扩展名，按优先级排列
+    :return: 可合并进 ydl_opts 的 dict
+    '''
+    key = getattr(quality, "value", quality)
+    abr = AUDIO_ABR_MAP.get(key, AUDIO_ABR_MAP["fast"])
+    selectors = [f"ba[ext={ext}]" for ext in audio_formats or ()] + ["ba", "b"]
+    opts = {'format': '/'.join(selectors)}
+    if abr:
+        opts['format_sort'] = [f'abr:{abr}', '+size']
+    return opts
+
+
+def low_res_video_opts(max_height: int) -> dict:
+    '''
+    构造 yt-dlp 的低清纯视频流选择参数：仅用于抽帧时，优先选择分辨率不超过 max_height 的最大纯视频流，
+    同分辨率下再选体积最小的编码，避免为了几张截图下载完整的高清音视频。
+    回退也只选 mp4：单路流不经过合并，merge_output_format 不生效，webm 会原样落盘，
+    而下载器按 {id}_{h}p.mp4 查找产物。
+
+    :param max_height: 抽帧单元格高度，如 720
+    :return: 可合并进 ydl_opts 的 dict
+    '''
+    return {
+        'format': 'bv[ext=mp4]/b[ext=mp4]',
+        'format_sort': [f'res:{max_height}', '+size', '+br'],
+    }
+
+
+def video_stream_from_info(info: dict) -> Optional[VideoStream]:
+    '''
+    从 yt-dlp extract_info(download=False) 的结果中取出已选中格式的直链信息。
+
+    :param info: yt-dlp 的 info 字典
+    :return: VideoStream，未选中可直连的格式（如需合并的多路流）时返回 None
+    '''
+    url = info.get("url")
+    if not url:
+        return None
+    return VideoStream(
+        url=url,
+        http_headers=dict(info.get("http_headers") or {}),
+        width=info.get("width"),
+        height=info.get("height"),
+        duration=info.get("duration"),
+        filesize=info.get("filesize") or info.get("filesize_approx"),
+    )
+
 
 class Downloader(ABC):
+    # download(need_video=True) 是否会在同一次拉取中保留完整视频并写入 AudioDownloadResult.video_path，
+    # 为 True 时调用方无需再单独调用 download_video
+    bundles_video: bool = False
+
     def __init__(self):
         #TODO 需要修改为可配置
         self.quality = QUALITY_MAP.get('fast')
@@ -21,18 +98,37 @@ class Downloader(ABC):
 
     @abstractmethod
     def download(self, video_url: str, output_dir: str = None,
-                 quality: DownloadQuality = "fast", need_video: Optional[bool] = False) -> AudioDownloadResult:
+                 quality: DownloadQuality = "fast", need_video: Optional[bool] = False,
+                 audio_formats: Optional[Sequence[str]] = None) -> AudioDownloadResult:
         '''
 
         :param need_video:
         :param video_url: 资源链接
         :param output_dir: 输出路径 默认根目录data
         :param quality: 音频质量 fast | medium | slow
+        :param audio_formats: 转写器可直接读取的音频格式，命中时跳过 mp3 转码；为空时统一输出 mp3
         :return:返回一个 AudioDownloadResult 类
         '''
         pass
 
-    @staticmethod
     def download_video(self, video_url: str,
-                       output_dir: Union[str, None] = None) -> str:
+                       output_dir: Union[str, None] = None,
+                       max_height: Optional[int] = None) -> str:
+        '''
+
+        :param video_url: 资源链接
+        :param output_dir: 输出路径 默认根目录data
+        :param max_height: 指定时下载不超过该高度的低清纯视频流（仅抽帧/截图使用），平台不支持时忽略
+        :return: 本地视频文件路径
+        '''
         pass
+
+    def get_video_stream(self, video_url: str, max_height: int = 720) -> Optional[VideoStream]:
+        '''
+        获取可直接按 HTTP Range 抽帧的远程低清视频流，不落盘下载。
+
+        :param video_url: 资源链接
+        :param max_height: 期望的最大视频高度
+        :return: VideoStream，平台不支持时返回 None，由调用方回退到 download_video
+        '''
+        return None
@@ -2,7 +2,7 @@ import datetime
 import json
 import os
 import re
-from typing import Union, Optional
+from typing import Union, Optional, Sequence
 from urllib.parse import quote, urlencode
 
 import httpx
@@ -11,16 +11,17 @@ from pydantic import BaseModel
 
 from app.downloaders.base import Downloader
 from app.downloaders.douyin_helper.abogus import ABogus
+from app.downloaders.segmented_downloader import segmented_downloader
 from app.enmus.note_enums import DownloadQuality
 from app.models.audio_model import AudioDownloadResult
-from app.services.cookie_manager import CookieConfigManager
+from app.services.cookie_manager import cookie_manager
 from app.utils.path_helper import get_data_dir
 from dotenv import load_dotenv
 
 load_dotenv()
 DOUYIN_DOMAIN = "https://www.douyin.com"
 
-cfm=CookieConfigManager()
+
 def get_timestamp(unit: str = "milli"):
     """
     根据给定的单位获取当前时间 (Get the current time based on the given unit)
@@ -113,12 +114,15 @@ class DouyinDownloader(Downloader):
     def __init__(self, cookie=None):
         super().__init__()
         self.headers_config = DouyinConfig.HEADERS.copy()
-        self.headers_config["Cookie"] = cfm.get('douyin')
-        print(self.headers_config)
+        # 订阅 Cookie 配置，前端更新后无需重启即可生效
+        cookie_manager.subscribe('douyin', self._on_cookie_change)
         self.proxies_config = DouyinConfig.PROXIES.copy()
         self.ttwid_config = DouyinConfig.TTWID.copy()
         self.ms_token_config = DouyinConfig.MS_TOKEN.copy()
 
+    def _on_cookie_change(self, cookie: Optional[str]):
+        self.headers_config["Cookie"] = cookie
+
     @staticmethod
     def find_url(string: str) -> list:
         url = re.findall('http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', string)
@@ -212,7 +216,8 @@ class DouyinDownloader(Downloader):
             video_url: str,
             output_dir: Union[str, None] = None,
             quality: DownloadQuality = "fast",
-            need_video: Optional[bool] = False
+            need_video: Optional[bool] = False,
+            audio_formats: Optional[Sequence[str]] = None,
     ) -> AudioDownloadResult:
         try:
             print(
@@ -232,10 +237,8 @@ class DouyinDownloader(Downloader):
                 "ext": "mp3",
             }
             url = video_data['aweme_detail']['music']['play_url']['uri']
-            # 下载音频
-            audio_data = requests.get(url)
-            with open(output_path, 'wb') as f:
-                f.write(audio_data.content)
+            # 下载音频（分片并发、流式写盘）
+            downloaded_bytes = segmented_downloader.download(url, output_path)
             print(url)
             tags = []
             for tag in video_data['aweme_detail']['video_tag']:
@@ -253,12 +256,14 @@ class DouyinDownloader(Downloader):
                 raw_info={
                     'tags': video_data['aweme_detail']['caption'] + ''.join(tags),
                 },
-                video_path=None  # ❗音频下载不包含视频路径
+                video_path=None,  # ❗音频下载不包含视频路径
+                downloaded_bytes=downloaded_bytes,
             )
         except Exception as e:
             raise e
 
-    def download_video(self, video_url: str, output_dir: Union[str, None] = None) -> str:
+    def download_video(self, video_url: str, output_dir: Union[str, None] = None,
+                       max_height: Optional[int] = None) -> str:
 
         try:
 
@@ -283,10 +288,8 @@ class DouyinDownloader(Downloader):
             }
 
             url=video_data['aweme_detail']['video']['download_addr']['url_list'][0]
-            _data = requests.get(url,allow_redirects=True,headers=self.headers_config)
-
-            with open(output_path, 'wb') as f:
-                f.write(_data.content)
+            headers = {k: v for k, v in self.headers_config.items() if v}
+            segmented_downloader.download(url, output_path, headers=headers)
 
             return output_path
         except Exception as e:
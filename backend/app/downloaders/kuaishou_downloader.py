@@ -1,11 +1,13 @@
 import os
 import subprocess
 from abc import ABC
-from typing import Union, Optional
+import time
+from typing import Union, Optional, Sequence
 
 import requests
 
 from app.downloaders.base import Downloader
+from app.downloaders.segmented_downloader import segmented_downloader
 from app.downloaders.kuaishou_helper.kuaishou import KuaiShou
 from app.enmus.note_enums import DownloadQuality
 from app.models.audio_model import AudioDownloadResult
@@ -13,6 +15,9 @@ from app.utils.path_helper import get_data_dir
 
 
 class KuaiShouDownloader(Downloader, ABC):
+    # 快手本身就是先下载 mp4 再本地转 mp3
+    bundles_video = True
+
     def __init__(self):
         super().__init__()
 
@@ -21,7 +26,8 @@ class KuaiShouDownloader(Downloader, ABC):
             video_url: str,
             output_dir: Union[str, None] = None,
             quality: str = "fast",
-            need_video: Optional[bool] = False
+            need_video: Optional[bool] = False,
+            audio_formats: Optional[Sequence[str]] = None,
     ) -> AudioDownloadResult:
         if output_dir is None:
             output_dir = get_data_dir()
@@ -36,12 +42,14 @@ class KuaiShouDownloader(Downloader, ABC):
         video_id = photo_info['id']
         title = photo_info['caption'].strip().replace('\n', '').replace(' ', '_')[:50]
         mp4_path = os.path.join(output_dir, f"{video_id}.mp4")
-        mp3_path = os.path.join(output_dir, f"{video_id}.mp3")
+        # 快手视频音轨为 AAC，转写器可直接读取 m4a 时只做封装拷贝，不重新编码
+        native = "m4a" in (audio_formats or ())
+        audio_path = os.path.join(output_dir, f"{video_id}.{'m4a' if native else 'mp3'}")
 
-        if os.path.exists(mp3_path):
-            print(f"[已存在] 跳过下载: {mp3_path}")
+        if os.path.exists(audio_path):
+            print(f"[已存在] 跳过下载: {audio_path}")
             return AudioDownloadResult(
-                file_path=mp3_path,
+                file_path=audio_path,
                 title=title,
                 duration=photo_info['duration'],
                 cover_url=photo_info['coverUrl'],
@@ -53,25 +61,25 @@ class KuaiShouDownloader(Downloader, ABC):
                 video_path=mp4_path
             )
 
-        # 下载 mp4 视频
-        resp = requests.get(photo_info['photoUrl'], stream=True)
-        if resp.status_code == 200:
-            with open(mp4_path, "wb") as f:
-                for chunk in resp.iter_content(1024 * 1024):
-                    f.write(chunk)
-        else:
-            raise Exception(f"视频下载失败: {resp.status_code}")
+        # 下载 mp4 视频（分片并发、支持断点续传）
+        try:
+            downloaded_bytes = segmented_downloader.download(photo_info['photoUrl'], mp4_path)
+        except requests.RequestException as e:
+            raise Exception(f"视频下载失败: {e}")
 
-        # 使用 ffmpeg 转换为 mp3
+        # 使用 ffmpeg 抽取音轨（m4a 直接拷贝，否则转换为 mp3）
+        codec_args = ["-acodec", "copy"] if native else ["-acodec", "libmp3lame"]
+        started = time.perf_counter()
         try:
             subprocess.run([
-                "ffmpeg", "-y", "-i", mp4_path, "-vn", "-acodec", "libmp3lame", mp3_path
+                "ffmpeg", "-y", "-i", mp4_path, "-vn", *codec_args, audio_path
             ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         except subprocess.CalledProcessError:
-            raise Exception("ffmpeg 转换 MP3 失败")
+            raise Exception("ffmpeg 抽取音频失败")
+        postprocess_seconds = time.perf_counter() - started
 
         return AudioDownloadResult(
-            file_path=mp3_path,
+            file_path=audio_path,
             title=photo_info['caption'],
             duration=photo_info['duration'],
             cover_url=photo_info['coverUrl'],
@@ -80,13 +88,16 @@ class KuaiShouDownloader(Downloader, ABC):
             raw_info={
                 'tags': ','.join(tag['name'] for tag in video_raw_info.get('tags', []) if tag.get('name'))
             },
-            video_path=mp4_path
+            video_path=mp4_path,
+            downloaded_bytes=downloaded_bytes,
+            postprocess_seconds=postprocess_seconds,
         )
 
     def download_video(
             self,
             video_url: str,
             output_dir: Union[str, None] = None,
+            max_height: Optional[int] = None,
     ) -> str:
         print('self.download(video_url, output_dir).video_path',self.download(video_url, output_dir).video_path)
         return self.download(video_url, output_dir).video_path
@@ -5,7 +5,7 @@ import re
 import requests
 from dotenv import load_dotenv
 
-from app.services.cookie_manager import CookieConfigManager
+from app.services.cookie_manager import cookie_manager
 from app.utils.logger import get_logger
 KUAISHOU_API_BASE = 'https://www.kuaishou.com/graphql'
 KUAISHOU_URL = "https://www.kuaishou.com/"
@@ -32,7 +32,7 @@ headers = {
 
 logger = get_logger(__name__)
 
-cfm=CookieConfigManager()
+
 class KuaiShou:
     def __init__(self):
         self.header = headers.copy()
@@ -53,7 +53,7 @@ class KuaiShou:
         return match.group().split('/')[1]
 
     def get_temp_cookies(self):
-        is_exist = cfm.get('kuaishou')
+        is_exist = cookie_manager.get('kuaishou')
         print(is_exist)
         if is_exist:
             return is_exist
@@ -1,7 +1,7 @@
 import os
 import subprocess
 from abc import ABC
-from typing import Optional
+from typing import Optional, Sequence
 
 from app.downloaders.base import Downloader
 from app.enmus.note_enums import DownloadQuality
@@ -85,7 +85,7 @@ class LocalDownloader(Downloader, ABC):
             return output_path
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"mp3 文件生成失败: {output_path}") from e
-    def download_video(self, video_url: str, output_dir: str = None) -> str:
+    def download_video(self, video_url: str, output_dir: str = None, max_height: Optional[int] = None) -> str:
         """
         处理本地文件路径，返回视频文件路径
         """
@@ -102,7 +102,8 @@ class LocalDownloader(Downloader, ABC):
             video_url: str,
             output_dir: str = None,
             quality: DownloadQuality = "fast",
-            need_video: Optional[bool] = False
+            need_video: Optional[bool] = False,
+            audio_formats: Optional[Sequence[str]] = None,
     ) -> AudioDownloadResult:
         """
         处理本地文件路径，返回音频元信息
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 单个下载任务的并发连接数
+DOWNLOAD_CONNECTIONS = int(os.getenv("DOWNLOAD_CONNECTIONS", "4"))
+# 小于该大小的文件不再分片，直接单连接下载
+MIN_SEGMENT_SIZE = 2 * 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+# 断点信息每写入多少字节落盘一次
+STATE_FLUSH_BYTES = 4 * 1024 * 1024
+
+
+class SegmentedDownloader:
+    """
+    基于 HTTP Range 的多连接分片下载器，供不走 yt-dlp 的平台（抖音、快手等直链）使用。
+
+    - 服务端支持 Range 时按 connections 切分为多个分片并行下载，直接写入预分配的 .part 文件对应偏移
+    - 每个分片的进度记录在 .part.json 中，中断后再次调用会从断点继续
+    - 数据按块流式写盘，不会把整个文件读入内存
+    - 同一 host 复用一个 requests.Session，连接池大小与并发连接数一致
+    """
+
+    def __init__(self, connections: int = DOWNLOAD_CONNECTIONS, chunk_size: int = CHUNK_SIZE,
+                 min_segment_size: int = MIN_SEGMENT_SIZE, timeout: float = 30):
+        self.connections = max(1, connections)
+        self.chunk_size = chunk_size
+        self.min_segment_size = min_segment_size
+        self.timeout = timeout
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        """
+        获取 url 所属 host 的共享 Session（按 scheme + host 复用连接池）
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connections)
+                session.mount(f"{parts.scheme}://", adapter)
+                self._sessions[key] = session
+            return session
+
+    def download(self, url: str, output_path: str, headers: Optional[dict] = None) -> int:
+        """
+        下载 url 到 output_path，已存在完整文件时直接返回。
+
+        :param url: 资源直链
+        :param output_path: 目标文件路径
+        :param headers: 额外请求头（Referer、Cookie 等）
+        :return: 文件字节数
+        """
+        part_path = output_path + ".part"
+        state_path = part_path + ".json"
+        if os.path.exists(output_path) and not os.path.exists(part_path):
+            return os.path.getsize(output_path)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        headers = dict(headers or {})
+
+        final_url, total = self._probe(url, headers)
+        if total is None or total < self.min_segment_size or self.connections == 1:
+            if total is None:
+                logger.info(f"服务端不支持 Range，使用单连接下载：{final_url}")
+            self._download_single(final_url, part_path, headers)
+        else:
+            segments = self._load_state(state_path, total) or self._plan_segments(total)
+            self._download_segments(final_url, part_path, state_path, headers, total, segments)
+
+        os.replace(part_path, output_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return os.path.getsize(output_path)
+
+    # ---------------- 私有方法 ----------------
+
+    def _probe(self, url: str, headers: dict) -> Tuple[str, Optional[int]]:
+        """
+        用 Range: bytes=0-0 探测文件大小及是否支持分片，同时解析重定向后的真实地址。
+
+        :return: (最终地址, 文件总大小)，不支持 Range 时大小为 None
+        """
+        session = self.session_for(url)
+        with session.get(url, headers={**headers, "Range": "bytes=0-0"}, stream=True,
+                         allow_redirects=True, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            content_range = resp.headers.get("Content-Range", "")
+            if resp.status_code == 206 and "/" in content_range:
+                size = content_range.rsplit("/", 1)[1]
+                if size.isdigit():
+                    return resp.url, int(size)
+            return resp.url, None
+
+    def _plan_segments(self, total: int) -> List[List[int]]:
+        """
+        按连接数均分为 [start, end, downloaded] 分片，end 为闭区间
+        """
+        count = min(self.connections, max(1, total // self.min_segment_size))
+        size = total // count
+        segments = []
+        for i in range(count):
+            start = i * size
+            end = total - 1 if i == count - 1 else start + size - 1
+            segments.append([start, end, 0])
+        return segments
+
+    @staticmethod
+    def _load_state(state_path: str, total: int) -> Optional[List[List[int]]]:
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("total") == total:
+                logger.info(f"检测到断点信息，继续下载：{state_path}")
+                return state["segments"]
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def _save_state(state_path: str, total: int, segments: List[List[int]]):
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"total": total, "segments": segments}, f)
+        os.replace(tmp_path, state_path)
+
+    def _download_single(self, url: str, part_path: str, headers: dict):
+        session = self.session_for(url)
+        with session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            with open(part_path, "wb") as f:
+                for chunk in resp.iter_content(self.chunk_size):
+                    f.write(chunk)
+
+    def _download_segments(self, url: str, part_path: str, state_path: str, headers: dict,
+                           total: int, segments: List[List[int]]):
+        # 预分配文件，各分片按偏移写入；已存在的 .part 保留已下载内容
+        mode = "r+b" if os.path.exists(part_path) else "wb"
+        with open(part_path, mode) as f:
+            f.truncate(total)
+
+        lock = threading.Lock()
+        self._save_state(state_path, total, segments)
+
+        def worker(segment: List[int]):
+            start, end, _ = segment
+            offset = start + segment[2]
+            if offset > end:
+                return
+            session = self.session_for(url)
+            unflushed = 0
+            with session.get(url, headers={**headers, "Range": f"bytes={offset}-{end}"},
+                             stream=True, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                if resp.status_code != 206:
+                    raise IOError(f"分片请求未返回 206：{resp.status_code}")
+                with open(part_path, "r+b") as f:
+                    f.seek(offset)
+                    for chunk in resp.iter_content(self.chunk_size):
+                        chunk = chunk[:end - offset + 1]
+                        f.write(chunk)
+                        offset += len(chunk)
+                        unflushed += len(chunk)
+                        # 只记录已刷盘的进度，保证断点续传不会跳过未落盘的数据
+                        if unflushed >= STATE_FLUSH_BYTES or offset > end:
+                            f.flush()
+                            with lock:
+                                segment[2] = offset - start
+                                self._save_state(state_path, total, segments)
+                            unflushed = 0
+                        if offset > end:
+                            break
+                    f.flush()
+                    with lock:
+                        segment[2] = offset - start
+            if offset <= end:
+                raise IOError(f"分片下载不完整：{offset}/{end + 1}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+                for future in [pool.submit(worker, seg) for seg in segments]:
+                    future.result()
+        finally:
+            with lock:
+                self._save_state(state_path, total, segments)
+
+
+# 全局共享实例，各下载器复用同一组按 host 划分的连接池
+segmented_downloader = SegmentedDownloader()
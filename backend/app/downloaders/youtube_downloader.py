@@ -1,16 +1,18 @@
 import os
 from abc import ABC
-from typing import Union, Optional
+from typing import Union, Optional, Sequence
 
-import yt_dlp
-
-from app.downloaders.base import Downloader, DownloadQuality
+from app.downloaders.base import Downloader, DownloadQuality, low_res_video_opts, video_stream_from_info
+from app.downloaders.ytdlp_service import ytdlp_service
 from app.models.notes_model import AudioDownloadResult
+from app.models.video_model import VideoStream
 from app.utils.path_helper import get_data_dir
 from app.utils.url_parser import extract_video_id
 
 
 class YoutubeDownloader(Downloader, ABC):
+    bundles_video = True
+
     def __init__(self):
 
         super().__init__()
@@ -20,7 +22,8 @@ class YoutubeDownloader(Downloader, ABC):
         video_url: str,
         output_dir: Union[str, None] = None,
         quality: DownloadQuality = "fast",
-        need_video:Optional[bool]=False
+        need_video:Optional[bool]=False,
+        audio_formats: Optional[Sequence[str]] = None,
     ) -> AudioDownloadResult:
         if output_dir is None:
             output_dir = get_data_dir()
@@ -28,52 +31,45 @@ class YoutubeDownloader(Downloader, ABC):
             output_dir=self.cache_data
         os.makedirs(output_dir, exist_ok=True)
 
-        output_path = os.path.join(output_dir, "%(id)s.%(ext)s")
-
-        ydl_opts = {
-            'format': 'bestaudio[ext=m4a]/bestaudio/best',
-            'outtmpl': output_path,
-            'noplaylist': True,
-            'quiet': False,
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=True)
-            video_id = info.get("id")
-            title = info.get("title")
-            duration = info.get("duration", 0)
-            cover_url = info.get("thumbnail")
-            ext = info.get("ext", "m4a")  # 兜底用 m4a
-            audio_path = os.path.join(output_dir, f"{video_id}.{ext}")
-        print('os.path.join(output_dir, f"{video_id}.{ext}")',os.path.join(output_dir, f"{video_id}.{ext}"))
+        info, audio_path, video_path, stats = ytdlp_service.download_audio(
+            video_url, output_dir, quality=quality, need_video=need_video, audio_formats=audio_formats,
+            video_format='bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]',
+        )
 
         return AudioDownloadResult(
             file_path=audio_path,
-            title=title,
-            duration=duration,
-            cover_url=cover_url,
+            title=info.get("title"),
+            duration=info.get("duration", 0),
+            cover_url=info.get("thumbnail"),
             platform="youtube",
-            video_id=video_id,
+            video_id=info.get("id"),
             raw_info={'tags':info.get('tags')}, #全部返回会报错
-            video_path=None  # ❗音频下载不包含视频路径
+            video_path=video_path,
+            downloaded_bytes=stats.downloaded_bytes,
+            postprocess_seconds=stats.postprocess_seconds,
         )
 
     def download_video(
         self,
         video_url: str,
         output_dir: Union[str, None] = None,
+        max_height: Optional[int] = None,
     ) -> str:
         """
         下载视频，返回视频文件路径
+
+        :param max_height: 指定时只下载与抽帧尺寸匹配的低清纯视频流
         """
         if output_dir is None:
             output_dir = get_data_dir()
         video_id = extract_video_id(video_url, "youtube")
-        video_path = os.path.join(output_dir, f"{video_id}.mp4")
+        # 低清视频与完整视频分开缓存，避免互相覆盖
+        suffix = f"_{max_height}p" if max_height else ""
+        video_path = os.path.join(output_dir, f"{video_id}{suffix}.mp4")
         if os.path.exists(video_path):
             return video_path
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "%(id)s.%(ext)s")
+        output_path = os.path.join(output_dir, f"%(id)s{suffix}.%(ext)s")
 
         ydl_opts = {
             'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]',
@@ -82,13 +78,28 @@ class YoutubeDownloader(Downloader, ABC):
             'quiet': False,
             'merge_output_format': 'mp4',  # 确保合并成 mp4
         }
+        if max_height:
+            ydl_opts.update(low_res_video_opts(max_height))
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=True)
-            video_id = info.get("id")
-            video_path = os.path.join(output_dir, f"{video_id}.mp4")
+        info = ytdlp_service.download(
+            video_url, ydl_opts, lambda i: [os.path.join(output_dir, f"{i['id']}{suffix}.mp4")]
+        )
+        video_id = info.get("id")
+        video_path = os.path.join(output_dir, f"{video_id}{suffix}.mp4")
 
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"视频文件未找到: {video_path}")
 
         return video_path
+
+    def get_video_stream(self, video_url: str, max_height: int = 720) -> Optional[VideoStream]:
+        """
+        解析低清纯视频流直链，供 ffmpeg 按时间点 Range 抽帧，不下载完整视频
+        """
+        ydl_opts = {
+            'noplaylist': True,
+            'quiet': True,
+            **low_res_video_opts(max_height),
+        }
+        info = ytdlp_service.probe(video_url, ydl_opts)
+        return video_stream_from_info(info)
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import yt_dlp
+
+from app.downloaders.base import audio_format_opts, audio_quality
+from app.enmus.note_enums import DownloadQuality
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 分片（HLS/DASH fragment）并发下载数
+YTDLP_CONCURRENT_FRAGMENTS = int(os.getenv("YTDLP_CONCURRENT_FRAGMENTS", "4"))
+# 元信息探测结果的缓存时间（秒）；平台直链会过期，不宜过长
+YTDLP_INFO_TTL = int(os.getenv("YTDLP_INFO_TTL", "300"))
+YTDLP_INFO_CACHE_SIZE = 128
+# 每个线程最多保留的 YoutubeDL 实例数；线程池中的线程常驻，超出时关闭最久未用的实例
+YTDLP_INSTANCES_PER_THREAD = 4
+
+BASE_OPTS = {
+    'concurrent_fragment_downloads': YTDLP_CONCURRENT_FRAGMENTS,
+    'noplaylist': True,
+}
+
+
+def _opts_key(opts: dict) -> str:
+    return json.dumps(opts, sort_keys=True, default=str)
+
+
+@dataclass
+class DownloadStats:
+    downloaded_bytes: int = 0          # 本次实际从网络拉取的字节数（命中本地文件不计）
+    postprocess_seconds: float = 0.0   # 合并、抽取音频等后处理耗时（秒）
+
+
+class YtDlpService:
+    """
+    yt-dlp 的共享调用层，供 Bilibili / YouTube 等下载器使用。
+
+    - 按参数复用 YoutubeDL 实例（提取器、Cookie 等状态只初始化一次）。YoutubeDL 非线程安全，
+      因此实例按线程隔离，后台任务线程池中的每个线程各自复用一份，按 LRU 最多保留
+      YTDLP_INSTANCES_PER_THREAD 个
+    - 默认开启分片并发下载
+    - 先 extract_info(download=False) 只取元信息，目标文件已存在时直接返回，不再进入下载流程；
+      需要下载时复用已提取的 info，避免二次解析
+    - 通过进度 / 后处理钩子统计下载字节数与后处理耗时
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._info_cache: "OrderedDict[Tuple[str, str], Tuple[float, dict]]" = OrderedDict()
+        self._info_lock = threading.Lock()
+
+    def get_ydl(self, opts: dict) -> yt_dlp.YoutubeDL:
+        """
+        获取当前线程中与 opts 对应的 YoutubeDL 实例，不存在时创建；超出上限时关闭最久未用的实例
+        """
+        instances: "OrderedDict[str, yt_dlp.YoutubeDL]" = getattr(self._local, "instances", None)
+        if instances is None:
+            instances = self._local.instances = OrderedDict()
+        key = _opts_key(opts)
+        ydl = instances.get(key)
+        if ydl is not None:
+            instances.move_to_end(key)
+            return ydl
+
+        ydl = yt_dlp.YoutubeDL({**BASE_OPTS, **opts})
+        ydl.add_progress_hook(self._on_progress)
+        ydl.add_postprocessor_hook(self._on_postprocess)
+        instances[key] = ydl
+        while len(instances) > YTDLP_INSTANCES_PER_THREAD:
+            _, evicted = instances.popitem(last=False)
+            try:
+                # 释放 Cookie 文件句柄等资源
+                evicted.close()
+            except Exception as e:
+                logger.warning(f"关闭 YoutubeDL 实例失败：{e}")
+        return ydl
+
+    def probe(self, url: str, opts: dict) -> dict:
+        """
+        只解析元信息（含格式选择结果），不下载。结果按 (url, opts) 短时缓存。
+
+        :param url: 视频链接
+        :param opts: yt-dlp 参数（决定格式选择）
+        :return: info 字典
+        """
+        cache_key = (url, _opts_key(opts))
+        now = time.monotonic()
+        with self._info_lock:
+            cached = self._info_cache.get(cache_key)
+            if cached and now - cached[0] < YTDLP_INFO_TTL:
+                self._info_cache.move_to_end(cache_key)
+                return cached[1]
+
+        info = self.get_ydl(opts).extract_info(url, download=False)
+
+        with self._info_lock:
+            self._info_cache[cache_key] = (now, info)
+            while len(self._info_cache) > YTDLP_INFO_CACHE_SIZE:
+                self._info_cache.popitem(last=False)
+        return info
+
+    def download(self, url: str, opts: dict,
+                 outputs: Optional[Callable[[dict], Iterable[str]]] = None,
+                 stats: Optional[DownloadStats] = None, info: Optional[dict] = None) -> dict:
+        """
+        探测元信息，目标文件均已存在时跳过下载，否则基于已提取的 info 执行下载与后处理。
+
+        :param url: 视频链接
+        :param opts: yt-dlp 参数
+        :param outputs: 根据 info 计算预期产物路径的函数，全部存在则视为命中缓存
+        :param stats: 传入时累计本次下载字节数与后处理耗时
+        :param info: 已用相同格式选择参数探测过的 info，提供时不再重复解析
+        :return: info 字典
+        """
+        if info is None:
+            info = self.probe(url, opts)
+        if outputs is not None:
+            paths = list(outputs(info))
+            if paths and all(os.path.exists(p) for p in paths):
+                logger.info(f"命中本地缓存，跳过下载：{paths}")
+                return info
+
+        ydl = self.get_ydl(opts)
+        self._local.stats = stats
+        self._local.pp_started = {}
+        try:
+            result = ydl.process_ie_result(dict(info), download=True)
+        finally:
+            self._local.stats = None
+        with self._info_lock:
+            self._info_cache.pop((url, _opts_key(opts)), None)
+        return result or info
+
+    def download_audio(self, url: str, output_dir: str,
+                       quality: DownloadQuality = "fast",
+                       need_video: bool = False,
+                       audio_formats: Optional[Sequence[str]] = None,
+                       video_format: str = 'bv*[ext=mp4]+ba/bv*+ba/b') -> Tuple[dict, str, Optional[str], DownloadStats]:
+        """
+        下载用于转写的音频。纯音频时按 DownloadQuality 选择够用的最小音轨，
+        选中的封装格式转写器可直接读取时跳过 mp3 转码。
+
+        :param url: 视频链接
+        :param output_dir: 输出目录
+        :param quality: fast | medium | slow
+        :param need_video: 是否同时保留合并后的 mp4
+        :param audio_formats: 转写器可直接读取的音频扩展名
+        :param video_format: need_video 时使用的音视频格式选择
+        :return: (info, 音频路径, 视频路径或 None, DownloadStats)
+        """
+        audio_formats = tuple(audio_formats or ())
+        opts = {
+            'outtmpl': os.path.join(output_dir, "%(id)s.%(ext)s"),
+            'noplaylist': True,
+            'quiet': False,
+        }
+        info = None
+        if need_video:
+            # 需要视频时一次拉取音视频并合并为 mp4，再从本地 mp4 抽取音频，避免同一视频被下载两次；
+            # 抽取 m4a 时 AAC 音轨直接拷贝，不重新编码
+            codec = 'm4a' if 'm4a' in audio_formats else 'mp3'
+            opts.update({'format': video_format, 'merge_output_format': 'mp4', 'keepvideo': True})
+        else:
+            opts.update(audio_format_opts(quality, audio_formats))
+            info = self.probe(url, opts)
+            codec = None if info.get('ext') in audio_formats else 'mp3'
+
+        if codec:
+            postprocessor = {'key': 'FFmpegExtractAudio', 'preferredcodec': codec}
+            if codec == 'mp3':
+                postprocessor['preferredquality'] = audio_quality(quality)
+            opts['postprocessors'] = [postprocessor]
+
+        def outputs(i: dict):
+            paths = [os.path.join(output_dir, f"{i['id']}.{codec or i.get('ext')}")]
+            if need_video:
+                paths.append(os.path.join(output_dir, f"{i['id']}.mp4"))
+            return paths
+
+        stats = DownloadStats()
+        info = self.download(url, opts, outputs, stats=stats, info=info)
+        paths = outputs(info)
+        video_path = paths[1] if need_video and os.path.exists(paths[1]) else None
+        logger.info(
+            f"音频下载完成：{paths[0]}，下载 {stats.downloaded_bytes} 字节，"
+            f"后处理 {stats.postprocess_seconds:.2f}s，{'转码为 ' + codec if codec else '保留原始音轨'}"
+        )
+        return info, paths[0], video_path, stats
+
+    # ---------------- 钩子 ----------------
+    # 钩子在调用 process_ie_result 的线程中触发，统计写入该线程当前的 DownloadStats
+
+    def _on_progress(self, d: dict):
+        stats = getattr(self._local, "stats", None)
+        if stats is not None and d.get("status") == "finished":
+            # 文件已存在时 yt-dlp 只给出 total_bytes，不计入实际下载量
+            stats.downloaded_bytes += d.get("downloaded_bytes") or 0
+
+    def _on_postprocess(self, d: dict):
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            return
+        started: Dict[str, float] = self._local.pp_started
+        name = d.get("postprocessor")
+        if d.get("status") == "started":
+            started[name] = time.perf_counter()
+        elif d.get("status") == "finished" and name in started:
+            stats.postprocess_seconds += time.perf_counter() - started.pop(name)
+
+
+# 全局共享实例
+ytdlp_service = YtDlpService()
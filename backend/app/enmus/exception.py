@@ -15,6 +15,7 @@ class ProviderErrorEnum(enum.Enum):
 
 class NoteErrorEnum(enum.Enum):
     PLATFORM_NOT_SUPPORTED = (300101 ,"选择的平台不受支持")
+    EMPTY_NOTE = (300102, "笔记生成结果为空")
 
     def __init__(self, code, message):
         self.code = code
@@ -1,7 +1,8 @@
 from typing import List
 from app.gpt.base import GPT
 from openai import OpenAI
-from app.gpt.prompt import BASE_PROMPT, AI_SUM, SCREENSHOT
+from app.gpt.prompt import AI_SUM, SCREENSHOT
+from app.gpt.prompt_builder import generate_base_prompt
 from app.gpt.utils import fix_markdown
 from app.models.gpt_model import GPTSource
 from app.models.transcriber_model import TranscriptSegment
@@ -34,16 +35,18 @@ class DeepSeekGPT(GPT):
         ]
 
     def create_messages(self, segments: List[TranscriptSegment], title: str,tags:str):
-        content = BASE_PROMPT.format(
-            video_title=title,
-            segment_text=self._build_segment_text(segments),
-            tags=tags
-        )
+        extras = ""
         if self.screenshot:
             print(":需要截图")
-            content += SCREENSHOT
+            extras += SCREENSHOT
+        content = generate_base_prompt(
+            title=title,
+            segment_text=self._build_segment_text(segments),
+            tags=tags,
+            extras=extras + AI_SUM
+        )
         print(content)
-        return [{"role": "user", "content": content + AI_SUM}]
+        return [{"role": "user", "content": content}]
 
     def summarize(self, source: GPTSource) -> str:
         self.screenshot = source.screenshot
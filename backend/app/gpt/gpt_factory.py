@@ -1,6 +1,7 @@
 from openai import OpenAI
 
 from app.gpt.base import GPT
+from app.gpt.prompt_cache import supports_cache_control
 from app.gpt.provider.OpenAI_compatible_provider import OpenAICompatibleProvider
 from app.gpt.universal_gpt import UniversalGPT
 from app.models.model_config import ModelConfig
@@ -9,5 +10,7 @@ from app.models.model_config import ModelConfig
 class GPTFactory:
     @staticmethod
     def from_config(config: ModelConfig) -> GPT:
-        client = OpenAICompatibleProvider(api_key=config.api_key, base_url=config.base_url).get_client
-        return UniversalGPT(client=client, model=config.model_name)
\ No newline at end of file
+        # 重试由 llm_scheduler 统一负责（遵守限额与 Retry-After），关闭 SDK 自带的重试
+        client = OpenAICompatibleProvider(api_key=config.api_key, base_url=config.base_url, max_retries=0).get_client
+        return UniversalGPT(client=client, model=config.model_name, provider_id=config.provider_id,
+                            cache_control=supports_cache_control(config.base_url, config.model_name))
\ No newline at end of file
@@ -1,38 +1,48 @@
-BASE_PROMPT = '''
-你是一个专业的笔记助手，擅长将视频转录内容整理成清晰、有条理且信息丰富的笔记。
+LINK='''
+9. **Add time markers**: THIS IS IMPORTANT For every main heading (`##`), append the starting time of that segment using the format ,start with *Content ,eg: `*Content-[mm:ss]`.
 
-语言要求：
-- 笔记必须使用 **中文** 撰写。
-- 专有名词、技术术语、品牌名称和人名应适当保留 **英文**。
 
-视频标题：
-{video_title}
+'''
+AI_SUM='''
+
+🧠 Final Touch:
+At the end of the notes, add a professional **AI Summary** in Chinese – a brief conclusion summarizing the whole video.
 
-视频标签：
-{tags}
 
 
+'''
+
+SCREENSHOT='''
+8. **Screenshot placeholders**: If a section involves **visual demonstrations, code walkthroughs, UI interactions**, or any content where visuals aid understanding, insert a screenshot cue at the end of that section:
+   - Format: `*Screenshot-[mm:ss]`
+   - Only use it when truly helpful.
+'''
+
+# 笔记 prompt 模板版本，修改下面两个模板时递增
+NOTE_PROMPT_VERSION = 2
+
+# 静态说明部分：与视频无关，放在 prompt 最前面，便于服务端前缀缓存命中
+NOTE_PROMPT_INSTRUCTIONS = '''
+你是一个专业的笔记助手，擅长将视频转录内容整理成清晰、有条理且信息丰富的笔记。
+
+语言要求：
+- 笔记必须使用 **中文** 撰写。
+- 专有名词、技术术语、品牌名称和人名应适当保留 **英文**。
 
 输出说明：
 - 仅返回最终的 **Markdown 内容**。
 - **不要**将输出包裹在代码块中（例如：```` ```markdown ````，```` ``` ````）。
 请注意，在生成 Markdown 时，避免将编号标题（如“1. **内容**”）写成有序列表的格式，以免解析错误。
 
-- 如果要加粗并保留编号，应使用 `1\. **内容**`（加反斜杠），防止被误解析为有序列表。
+- 如果要加粗并保留编号，应使用 `1\\. **内容**`（加反斜杠），防止被误解析为有序列表。
 - 或者使用 `## 1. 内容` 的形式作为标题。
 
 请确保以下格式 **不会出现误渲染**：
  `1. **xxx**`
- `1\. **xxx**` 或 `## 1. xxx`
-
-视频分段（格式：开始时间 - 内容）：
-
----
-{segment_text}
----
+ `1\\. **xxx**` 或 `## 1. xxx`
 
 你的任务：
-根据上面的分段转录内容，生成结构化的笔记，遵循以下原则：
+根据下方给出的视频分段转录内容，生成结构化的笔记，遵循以下原则：
 
 1. **完整信息**：记录尽可能多的相关细节，确保内容全面。
 2. **去除无关内容**：省略广告、填充词、问候语和不相关的言论。
@@ -44,26 +54,21 @@ BASE_PROMPT = '''
 请始终遵循此规则。
 
 额外重要的任务如下(每一个都必须严格完成):
-
 '''
 
+# 动态部分：用户补充要求、视频信息，转写内容放在最后
+NOTE_PROMPT_CONTEXT = '''
+{extras}
 
-LINK='''
-9. **Add time markers**: THIS IS IMPORTANT For every main heading (`##`), append the starting time of that segment using the format ,start with *Content ,eg: `*Content-[mm:ss]`.
-
-
-'''
-AI_SUM='''
-
-🧠 Final Touch:
-At the end of the notes, add a professional **AI Summary** in Chinese – a brief conclusion summarizing the whole video.
+视频标题：
+{video_title}
 
+视频标签：
+{tags}
 
+视频分段（格式：开始时间 - 内容）：
 
+---
+{segment_text}
+---
 '''
-
-SCREENSHOT='''
-8. **Screenshot placeholders**: If a section involves **visual demonstrations, code walkthroughs, UI interactions**, or any content where visuals aid understanding, insert a screenshot cue at the end of that section:
-   - Format: `*Screenshot-[mm:ss]`
-   - Only use it when truly helpful.
-'''
\ No newline at end of file
@@ -1,4 +1,8 @@
-from app.gpt.prompt import BASE_PROMPT
+from functools import lru_cache
+from string import Formatter
+from typing import Iterable, List, Optional, Tuple
+
+from app.gpt.prompt import NOTE_PROMPT_CONTEXT, NOTE_PROMPT_INSTRUCTIONS, NOTE_PROMPT_VERSION
 
 note_formats = [
     {'label': '目录', 'value': 'toc'},
@@ -20,47 +24,79 @@ note_styles = [
 ]
 
 
-# 生成 BASE_PROMPT 函数
-def generate_base_prompt(title, segment_text, tags, _format=None, style=None, extras=None):
-    # 生成 Base Prompt 开头部分
-    prompt = BASE_PROMPT.format(
-        video_title=title,
-        segment_text=segment_text,
-        tags=tags
-    )
-
-    # 添加用户选择的格式
-    if _format:
-        prompt += "\n" + "\n".join([get_format_function(f) for f in _format])
-
-    # 根据用户选择的笔记风格添加描述
+class PromptTemplate:
+    """
+    预编译的 prompt 模板：加载时把 str.format 语法解析成 (字面量, 字段名) 片段，渲染时直接拼接
+    """
+
+    def __init__(self, text: str, version: int):
+        self.version = version
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(text)
+        ]
+
+    def render(self, **values) -> str:
+        return "".join(
+            literal + ("" if field is None else str(values.get(field) or ""))
+            for literal, field in self._parts
+        )
+
+
+# 模板只在导入时编译一次
+INSTRUCTIONS_TEMPLATE = PromptTemplate(NOTE_PROMPT_INSTRUCTIONS, NOTE_PROMPT_VERSION)
+CONTEXT_TEMPLATE = PromptTemplate(NOTE_PROMPT_CONTEXT, NOTE_PROMPT_VERSION)
+
+
+def _canonical_formats(formats: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    # 格式按固定顺序去重，勾选顺序不同也能命中同一份静态前缀
+    selected = set(formats or [])
+    return tuple(f["value"] for f in note_formats if f["value"] in selected)
+
+
+@lru_cache(maxsize=256)
+def _static_prefix(version: int, style: Optional[str], formats: Tuple[str, ...]) -> str:
+    prompt = INSTRUCTIONS_TEMPLATE.render()
+    if formats:
+        prompt += "\n" + "\n".join(FORMAT_PROMPTS[f] for f in formats)
     if style:
         prompt += "\n" + get_style_format(style)
-
-    # 添加额外内容
-    if extras:
-        prompt += f"\n{extras}"
     return prompt
 
 
+def get_static_prefix(style: Optional[str] = None, _format: Optional[Iterable[str]] = None) -> str:
+    """
+    与视频无关的静态说明（通用要求 + 格式 + 风格），按 (模板版本, 风格, 格式组合) 缓存
+    """
+    return _static_prefix(INSTRUCTIONS_TEMPLATE.version, style, _canonical_formats(_format))
+
+
+def build_prompt_context(title, segment_text, tags, extras=None) -> str:
+    """
+    随任务变化的部分：补充要求、视频标题与标签，转写内容在最后
+    """
+    return CONTEXT_TEMPLATE.render(extras=extras, video_title=title, tags=tags, segment_text=segment_text)
+
+
+# 生成 BASE_PROMPT 函数：静态说明在前、转写内容在后，最大化 OpenAI 兼容接口的前缀缓存命中
+def generate_base_prompt(title, segment_text, tags, _format=None, style=None, extras=None):
+    return get_static_prefix(style, _format) + build_prompt_context(title, segment_text, tags, extras)
+
+
 # 获取格式函数
 def get_format_function(format_type):
-    format_map = {
-        'toc': get_toc_format,
-        'link': get_link_format,
-        'screenshot': get_screenshot_format,
-        'summary': get_summary_format
-    }
-    return format_map.get(format_type, lambda: '')()
+    return FORMAT_PROMPTS.get(format_type, '')
 
 
 # 风格描述的处理
 def get_style_format(style):
-    style_map = {
-        'minimal': '1. **精简信息**: 仅记录最重要的内容，简洁明了。',
-        'detailed': '2. **详细记录**: 包含完整的内容和每个部分的详细讨论。需要尽可能多的记录视频内容，最好详细的笔记',
-        'academic': '3. **学术风格**: 适合学术报告，正式且结构化。',
-        'xiaohongshu': '''4. **小红书风格**: 
+    return STYLE_PROMPTS.get(style, '')
+
+
+STYLE_PROMPTS = {
+    'minimal': '1. **精简信息**: 仅记录最重要的内容，简洁明了。',
+    'detailed': '2. **详细记录**: 包含完整的内容和每个部分的详细讨论。需要尽可能多的记录视频内容，最好详细的笔记',
+    'academic': '3. **学术风格**: 适合学术报告，正式且结构化。',
+    'xiaohongshu': '''4. **小红书风格**: 
 ### 擅长使用下面的爆款关键词：
 好用到哭，大数据，教科书般，小白必看，宝藏，绝绝子神器，都给我冲,划重点，笑不活了，YYDS，秘方，我不允许，压箱底，建议收藏，停止摆烂，上天在提醒你，挑战全网，手把手，揭秘，普通女生，沉浸式，有手就能做吹爆，好用哭了，搞钱必看，狠狠搞钱，打工人，吐血整理，家人们，隐藏，高级感，治愈，破防了，万万没想到，爆款，永远可以相信被夸爆手残党必备，正确姿势
 
@@ -78,13 +114,12 @@ def get_style_format(style):
 6. 描述具体的成果和效果，强调标题中的关键词，使其更具吸引力，例如“英语底子再差，搞清这些语法你也能拿130+”
 7. 使用吸引人的标题：''',
 
-        'life_journal': '5. **生活向**: 记录个人生活感悟，情感化表达。',
-        'task_oriented': '6. **任务导向**: 强调任务、目标，适合工作和待办事项。',
-        'business': '7. **商业风格**: 适合商业报告、会议纪要，正式且精准。',
-        'meeting_minutes': '8. **会议纪要**: 适合商业报告、会议纪要，正式且精准。',
-        "tutorial":"9.**教程笔记**:尽可能详细的记录教程,特别是关键点和一些重要的结论步骤"
-    }
-    return style_map.get(style, '')
+    'life_journal': '5. **生活向**: 记录个人生活感悟，情感化表达。',
+    'task_oriented': '6. **任务导向**: 强调任务、目标，适合工作和待办事项。',
+    'business': '7. **商业风格**: 适合商业报告、会议纪要，正式且精准。',
+    'meeting_minutes': '8. **会议纪要**: 适合商业报告、会议纪要，正式且精准。',
+    "tutorial":"9.**教程笔记**:尽可能详细的记录教程,特别是关键点和一些重要的结论步骤"
+}
 
 
 # 格式化输出内容
@@ -113,3 +148,11 @@ def get_summary_format():
     return '''
     12. **AI总结**: 在笔记末尾加入简短的AI生成总结,并且二级标题 就是 AI 总结 例如 ## AI 总结。
     '''
+
+
+FORMAT_PROMPTS = {
+    'toc': get_toc_format(),
+    'link': get_link_format(),
+    'screenshot': get_screenshot_format(),
+    'summary': get_summary_format(),
+}
@@ -0,0 +1,70 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 是否在系统消息上添加 cache_control 提示：auto 按供应商地址 / 模型名判断，true / false 强制开关
+LLM_CACHE_CONTROL = os.getenv("LLM_CACHE_CONTROL", "auto").lower()
+
+# 支持显式 cache_control 的 OpenAI 兼容接口（其余供应商如 OpenAI、DeepSeek 为自动前缀缓存，无需提示）
+CACHE_CONTROL_HOSTS = ("openrouter.ai", "dashscope.aliyuncs.com", "anthropic.com")
+CACHE_CONTROL_MODEL_PREFIXES = ("claude", "anthropic/")
+
+
+def supports_cache_control(base_url: Optional[str], model: Optional[str]) -> bool:
+    """
+    判断是否给系统消息加 cache_control 提示；不支持的接口可能直接拒绝未知字段，默认只对已知供应商开启
+    """
+    if LLM_CACHE_CONTROL in ("true", "false"):
+        return LLM_CACHE_CONTROL == "true"
+    host = (urlparse(base_url or "").hostname or "").lower()
+    if any(host == h or host.endswith("." + h) for h in CACHE_CONTROL_HOSTS):
+        return True
+    return (model or "").lower().startswith(CACHE_CONTROL_MODEL_PREFIXES)
+
+
+@dataclass
+class PromptUsage:
+    prompt_tokens: int = 0
+    cached_tokens: int = 0        # 命中供应商前缀缓存的输入 token
+    completion_tokens: int = 0
+
+    @property
+    def uncached_tokens(self) -> int:
+        return max(self.prompt_tokens - self.cached_tokens, 0)
+
+
+def _field(obj, name: str):
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def extract_usage(response) -> Optional[PromptUsage]:
+    """
+    从响应的 usage 中提取输入 / 缓存命中 / 输出 token 数，兼容各家 OpenAI 兼容接口的字段：
+
+    - OpenAI、通义千问：usage.prompt_tokens_details.cached_tokens
+    - DeepSeek：usage.prompt_cache_hit_tokens
+    - Anthropic 风格：usage.cache_read_input_tokens
+    """
+    usage = _field(response, "usage")
+    if usage is None:
+        return None
+    cached = (
+        _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+        or _field(usage, "prompt_cache_hit_tokens")
+        or _field(usage, "cache_read_input_tokens")
+        or 0
+    )
+    return PromptUsage(
+        prompt_tokens=_field(usage, "prompt_tokens") or 0,
+        cached_tokens=cached,
+        completion_tokens=_field(usage, "completion_tokens") or 0,
+    )
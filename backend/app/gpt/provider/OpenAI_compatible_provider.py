@@ -6,8 +6,8 @@ from app.utils.logger import get_logger
 
 logging= get_logger(__name__)
 class OpenAICompatibleProvider:
-    def __init__(self, api_key: str, base_url: str, model: Union[str, None]=None):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+    def __init__(self, api_key: str, base_url: str, model: Union[str, None]=None, max_retries: int = 2):
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries)
         self.model = model
 
     @property
@@ -0,0 +1,208 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from dotenv import load_dotenv
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# 默认每个供应商每分钟的请求数 / token 数上限，0 表示不限制
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))
+# 按供应商覆盖的限额，JSON：{"<provider_id>": {"rpm": 60, "tpm": 90000}}
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "")
+# 预估一次总结输出占用的 token 数，计入 TPM
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1024"))
+# 429 / 5xx / 超时的最大重试次数与退避参数（秒）
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+
+_CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算 token 数：中日韩字符按 1 字 1 token，其余按 4 字符 1 token
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@dataclass
+class RateLimit:
+    rpm: int = 0
+    tpm: int = 0
+
+
+@dataclass
+class CallStats:
+    queue_wait: float = 0.0      # 为满足限额排队等待的时间（秒）
+    retry_wait: float = 0.0      # 重试退避等待的时间（秒）
+    retries: int = 0
+    estimated_tokens: int = 0
+
+
+class TokenBucket:
+    """
+    按分钟额度匀速补充的令牌桶。预占令牌允许为负（记账），调用方按返回的秒数等待，
+    先预占的先获得额度，相当于一个 FIFO 队列
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        预占 amount 个令牌，返回需要等待的秒数
+        """
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 单次请求超过整桶容量时按整桶计，否则永远等不到
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def _load_limits(raw: str) -> Dict[str, RateLimit]:
+    if not raw:
+        return {}
+    try:
+        return {str(k): RateLimit(rpm=int(v.get("rpm", 0)), tpm=int(v.get("tpm", 0)))
+                for k, v in json.loads(raw).items()}
+    except Exception as e:
+        logger.warning(f"Invalid LLM_RATE_LIMITS, ignored: {e}")
+        return {}
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """
+    从响应头 Retry-After（秒数或 HTTP 日期）解析等待时间
+    """
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (RateLimitError, APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+class LLMScheduler:
+    """
+    按供应商的 LLM 调用调度：
+
+    - 每个供应商一组令牌桶（RPM、TPM），调用前按预估 token 数预占额度，超额时排队等待
+    - 429 / 5xx / 超时按指数退避加随机抖动重试，响应带 Retry-After 时以其为准
+    - 返回每次调用的排队与重试等待时间，供任务记录
+    """
+
+    def __init__(self, default: RateLimit = None, overrides: Optional[Dict[str, RateLimit]] = None,
+                 max_retries: int = LLM_MAX_RETRIES, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.default = default or RateLimit(rpm=LLM_RPM, tpm=LLM_TPM)
+        self.overrides = overrides if overrides is not None else _load_limits(LLM_RATE_LIMITS)
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, provider_id, tokens: int) -> float:
+        """
+        为一次请求预占额度并等待，返回实际等待秒数
+        """
+        requests_bucket, tokens_bucket = self._get_buckets(provider_id)
+        wait = max(
+            requests_bucket.reserve(1) if requests_bucket else 0.0,
+            tokens_bucket.reserve(tokens) if tokens_bucket else 0.0,
+        )
+        if wait > 0:
+            logger.info(f"LLM rate limit for provider {provider_id}: queued {wait:.2f}s")
+            self._sleep(wait)
+        return wait
+
+    def call(self, provider_id, tokens: int, fn: Callable[[], T]) -> Tuple[T, CallStats]:
+        """
+        在限额内执行 fn，可重试的错误按退避重试
+
+        :param provider_id: 供应商 ID，决定使用哪组限额
+        :param tokens: 预估的 token 数（输入 + 输出）
+        :param fn: 实际发起请求的函数
+        """
+        stats = CallStats(estimated_tokens=tokens)
+        attempt = 0
+        while True:
+            stats.queue_wait += self.acquire(provider_id, tokens)
+            try:
+                return fn(), stats
+            except Exception as exc:
+                if attempt >= self.max_retries or not is_retryable(exc):
+                    raise
+                delay = self._backoff(attempt, exc)
+                attempt += 1
+                stats.retries = attempt
+                stats.retry_wait += delay
+                logger.warning(f"LLM call to provider {provider_id} failed ({exc}), "
+                               f"retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                self._sleep(delay)
+
+    # ---------------- 私有方法 ----------------
+
+    @staticmethod
+    def _backoff(attempt: int, exc: Exception) -> float:
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return min(retry_after, LLM_BACKOFF_MAX) + random.uniform(0, LLM_BACKOFF_BASE)
+        # full jitter：在 [0, base * 2^attempt] 内随机，避免并发任务同时重试
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+    def _get_buckets(self, provider_id) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        key = str(provider_id)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            with self._lock:
+                buckets = self._buckets.get(key)
+                if buckets is None:
+                    limit = self.overrides.get(key, self.default)
+                    buckets = (
+                        TokenBucket(limit.rpm, self._clock) if limit.rpm > 0 else None,
+                        TokenBucket(limit.tpm, self._clock) if limit.tpm > 0 else None,
+                    )
+                    self._buckets[key] = buckets
+        return buckets
+
+
+# 全局共享实例，所有任务共用同一份限额
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+from app.utils.path_helper import get_app_dir
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 是否启用 LLM 响应缓存
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# 缓存目录，默认 data/llm_cache
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")
+# 缓存有效期（秒），默认 7 天
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# 最多保留的条目数，超出后按最近最少使用淘汰
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+
+
+def make_cache_key(model: str, temperature: float, messages: list) -> str:
+    """
+    对 (模型, temperature, messages) 做规范化序列化（键排序）后取 sha256
+    """
+    payload = orjson.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ResponseCache:
+    """
+    LLM 响应的磁盘缓存，每条一个 JSON 文件 {key}.json。
+
+    - 首次使用时扫描目录建立索引，文件 mtime 即最近访问时间，命中时刷新，重启后 LRU 顺序不丢失
+    - 读取时检查创建时间，超过 TTL 的条目删除并视为未命中
+    - 条目数超过上限时淘汰最久未访问的条目
+    """
+
+    def __init__(self, directory: Optional[str] = None, ttl: int = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, enabled: bool = LLM_CACHE_ENABLED):
+        self._directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._index: Optional["OrderedDict[str, None]"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        if not self._directory:
+            self._directory = LLM_CACHE_DIR or get_app_dir("llm_cache")
+        return Path(self._directory)
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            try:
+                entry = orjson.loads(path.read_bytes())
+            except Exception:
+                self._remove(key)
+                return None
+            if time.time() - entry.get("created_at", 0) >= self.ttl:
+                self._remove(key)
+                return None
+            index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["content"]
+
+    def put(self, key: str, content: str, model: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        data = orjson.dumps({"created_at": time.time(), "model": model, "content": content})
+        tmp = directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self._path(key))
+        with self._lock:
+            index = self._load_index()
+            index[key] = None
+            index.move_to_end(key)
+            while len(index) > self.max_entries:
+                oldest = next(iter(index))
+                self._remove(oldest)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+
+    # ---------------- 私有方法 ----------------
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self) -> "OrderedDict[str, None]":
+        if self._index is None:
+            entries = []
+            if self.directory.exists():
+                for p in self.directory.glob("*.json"):
+                    try:
+                        entries.append((p.stat().st_mtime, p.stem))
+                    except FileNotFoundError:
+                        continue
+            self._index = OrderedDict((key, None) for _, key in sorted(entries))
+        return self._index
+
+    def _remove(self, key: str) -> None:
+        self._index.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# 全局共享实例
+llm_response_cache = ResponseCache()
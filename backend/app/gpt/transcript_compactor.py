@@ -0,0 +1,248 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.gpt.rate_limiter import estimate_tokens
+from app.models.transcriber_model import TranscriptSegment
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 合并相邻分段的时间粒度（秒），默认 0 保持 Whisper 原始分段（截图 / 链接标记的时间戳最精确），
+# 只有超出预算时才自动放大
+TRANSCRIPT_BUCKET_SECONDS = int(os.getenv("TRANSCRIPT_BUCKET_SECONDS", "0"))
+# 超出预算时逐级放大合并粒度的上限（秒）
+TRANSCRIPT_MAX_BUCKET_SECONDS = int(os.getenv("TRANSCRIPT_MAX_BUCKET_SECONDS", "300"))
+# 是否去除重复行与 Whisper 常见的幻觉文本
+TRANSCRIPT_DEDUP = os.getenv("TRANSCRIPT_DEDUP", "true").lower() == "true"
+# 未知模型的上下文窗口（token）
+LLM_DEFAULT_CONTEXT_TOKENS = int(os.getenv("LLM_DEFAULT_CONTEXT_TOKENS", "32000"))
+# 按模型名前缀覆盖上下文窗口，JSON：{"gpt-4o": 128000}
+LLM_CONTEXT_TOKENS = os.getenv("LLM_CONTEXT_TOKENS", "")
+
+# 常见模型的上下文窗口，按最长前缀匹配
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1000000,
+    "o1": 200000,
+    "o3": 200000,
+    "o4": 200000,
+    "deepseek": 64000,
+    "qwen": 32000,
+    "qwen-plus": 131072,
+    "qwen-turbo": 1000000,
+    "qwen-long": 1000000,
+    "claude": 200000,
+    "gemini": 1000000,
+    "glm-4": 128000,
+    "moonshot-v1-8k": 8192,
+    "moonshot-v1-32k": 32768,
+    "moonshot-v1-128k": 131072,
+    "kimi": 131072,
+    "doubao": 32000,
+}
+
+# Whisper 在静音、片尾处常见的幻觉文本（按归一化后的整行匹配）
+HALLUCINATION_PATTERNS = [
+    re.compile(p) for p in (
+        r"amara\.?org",
+        r"^请不吝点赞订阅转发打赏支持明镜与点点栏目$",
+        r"^明镜需要您的支持欢迎订阅明镜$",
+        r"^中文字幕志愿者",
+        r"^优优独播剧场",
+        r"^(谢谢|感谢)(大家|您的)?(观看|收看|收听)$",
+        r"^(thank you|thanks) (so much )?for watching$",
+        r"^please subscribe",
+    )
+]
+
+_PUNCT_RE = re.compile(r"[\s\W_]+", re.UNICODE)
+# 同一短语（至少两个非数字字符）连续重复 4 次及以上（Whisper 复读）折叠为一次
+_REPEAT_RE = re.compile(r"(\D{2,12}?)(?:[\s,，、。.!！?？]*\1){3,}")
+
+
+@dataclass
+class CompactionReport:
+    original_segments: int = 0
+    compacted_segments: int = 0
+    original_tokens: int = 0
+    compacted_tokens: int = 0
+    dropped_lines: int = 0        # 去重 / 幻觉过滤删除的行数
+    bucket_seconds: int = 0       # 最终使用的合并粒度
+    truncated: bool = False       # 放大粒度后仍超出预算，按比例截断了文本
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+
+def _load_context_overrides(raw: str) -> Dict[str, int]:
+    if not raw:
+        return {}
+    try:
+        return {str(k).lower(): int(v) for k, v in json.loads(raw).items()}
+    except Exception as e:
+        logger.warning(f"Invalid LLM_CONTEXT_TOKENS, ignored: {e}")
+        return {}
+
+
+_CONTEXT_TOKENS = {**MODEL_CONTEXT_TOKENS, **_load_context_overrides(LLM_CONTEXT_TOKENS)}
+
+
+def context_tokens_for(model: Optional[str]) -> int:
+    """
+    按模型名（忽略大小写与 "vendor/" 前缀）最长前缀匹配上下文窗口
+    """
+    name = (model or "").strip().lower().rsplit("/", 1)[-1]
+    best = None
+    for prefix in _CONTEXT_TOKENS:
+        if name.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return _CONTEXT_TOKENS[best] if best else LLM_DEFAULT_CONTEXT_TOKENS
+
+
+def format_time(seconds: float) -> str:
+    """
+    秒数格式化为 mm:ss，超过一小时时分钟数继续累加（如 75:30），与截图标记格式一致
+    """
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def render_segments(segments: List[TranscriptSegment]) -> str:
+    return "\n".join(f"{format_time(seg.start)} - {seg.text.strip()}" for seg in segments)
+
+
+def _is_noise(normalized: str) -> bool:
+    return not normalized or any(p.search(normalized) for p in HALLUCINATION_PATTERNS)
+
+
+def dedup_segments(segments: List[TranscriptSegment]) -> Tuple[List[TranscriptSegment], int]:
+    """
+    去掉空行、幻觉文本与和上一行相同的重复行，并折叠行内复读
+
+    :return: (保留的分段, 删除的行数)
+    """
+    kept: List[TranscriptSegment] = []
+    previous = None
+    for seg in segments:
+        text = _REPEAT_RE.sub(r"\1", seg.text.strip())
+        normalized = _PUNCT_RE.sub(" ", text).strip().lower()
+        if _is_noise(normalized) or _is_noise(normalized.replace(" ", "")) or normalized == previous:
+            continue
+        previous = normalized
+        kept.append(TranscriptSegment(start=seg.start, end=seg.end, text=text))
+    return kept, len(segments) - len(kept)
+
+
+def merge_segments(segments: List[TranscriptSegment], bucket_seconds: int) -> List[TranscriptSegment]:
+    """
+    把起始时间落在同一时间窗口内的相邻分段合并为一行，时间戳取窗口内第一段的开始时间
+    """
+    if bucket_seconds <= 0 or not segments:
+        return list(segments)
+    merged: List[TranscriptSegment] = []
+    current = None
+    texts: List[str] = []
+    for seg in segments:
+        if current is not None and seg.start - current.start < bucket_seconds:
+            texts.append(seg.text.strip())
+            current.end = seg.end
+            continue
+        if current is not None:
+            current.text = " ".join(texts)
+            merged.append(current)
+        current = TranscriptSegment(start=seg.start, end=seg.end, text="")
+        texts = [seg.text.strip()]
+    current.text = " ".join(texts)
+    merged.append(current)
+    return merged
+
+
+def _truncate(segments: List[TranscriptSegment], ratio: float) -> List[TranscriptSegment]:
+    # 每行按相同比例保留开头部分，保证时间轴仍覆盖整段视频
+    return [
+        TranscriptSegment(start=seg.start, end=seg.end, text=seg.text[:int(len(seg.text) * ratio)])
+        for seg in segments
+    ]
+
+
+def _sample(segments: List[TranscriptSegment], count: int) -> List[TranscriptSegment]:
+    # 沿时间轴均匀保留 count 个整段
+    if count >= len(segments):
+        return list(segments)
+    step = len(segments) / count
+    return [segments[int(i * step)] for i in range(count)]
+
+
+def compact_transcript(
+    segments: List[TranscriptSegment],
+    token_budget: Optional[int] = None,
+    bucket_seconds: int = TRANSCRIPT_BUCKET_SECONDS,
+    dedup: bool = TRANSCRIPT_DEDUP,
+) -> Tuple[str, CompactionReport]:
+    """
+    压缩转写文本后再放入 prompt：去重 → 按时间窗口合并 → 超出预算时放大窗口，仍超出则按比例截断
+
+    :param segments: 原始转写分段
+    :param token_budget: 转写文本可占用的 token 上限，None 表示不限制
+    :param bucket_seconds: 合并粒度（秒），0 表示不合并
+    :param dedup: 是否去重与过滤幻觉文本
+    :return: (渲染后的转写文本, 压缩报告)
+    """
+    original_text = render_segments(segments)
+    report = CompactionReport(
+        original_segments=len(segments),
+        original_tokens=estimate_tokens(original_text),
+        bucket_seconds=max(bucket_seconds, 0),
+    )
+
+    if dedup:
+        segments, report.dropped_lines = dedup_segments(segments)
+    compacted = merge_segments(segments, report.bucket_seconds)
+    text = render_segments(compacted)
+    tokens = estimate_tokens(text)
+
+    if token_budget is not None and tokens > token_budget:
+        bucket = report.bucket_seconds or 10
+        while tokens > token_budget and bucket < TRANSCRIPT_MAX_BUCKET_SECONDS:
+            bucket = min(bucket * 2, TRANSCRIPT_MAX_BUCKET_SECONDS)
+            compacted = merge_segments(segments, bucket)
+            text = render_segments(compacted)
+            tokens = estimate_tokens(text)
+        report.bucket_seconds = bucket
+        if tokens > token_budget:
+            full = compacted
+            overhead = estimate_tokens(render_segments(_truncate(full, 0)))
+            if overhead >= token_budget:
+                # 仅时间戳前缀就超出预算，按比例截断只会剩下时间戳；
+                # 先沿时间轴均匀丢弃整段，使时间戳只占一半预算，余下留给正文
+                logger.warning(
+                    f"Transcript timestamps alone ({overhead} tokens, {len(full)} segments) exceed budget "
+                    f"{token_budget}, dropping whole segments"
+                )
+                full = _sample(full, max(1, len(full) * token_budget // (2 * overhead)))
+                overhead = estimate_tokens(render_segments(_truncate(full, 0)))
+                tokens = estimate_tokens(render_segments(full))
+            # 时间戳前缀不可截断，只按比例缩减正文；估算有取整误差，必要时再缩一轮
+            ratio = max(token_budget - overhead, 0) / max(tokens - overhead, 1)
+            for _ in range(3):
+                compacted = _truncate(full, ratio)
+                text = render_segments(compacted)
+                tokens = estimate_tokens(text)
+                if tokens <= token_budget:
+                    break
+                ratio *= 0.95
+            report.truncated = True
+
+    report.compacted_segments = len(compacted)
+    report.compacted_tokens = tokens
+    return text, report
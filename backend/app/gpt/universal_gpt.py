@@ -1,41 +1,67 @@
 from app.gpt.base import GPT
-from app.gpt.prompt_builder import generate_base_prompt
+from app.gpt.prompt_builder import build_prompt_context, get_static_prefix
+from app.gpt.prompt_cache import PromptUsage, extract_usage
 from app.models.gpt_model import GPTSource
-from app.gpt.prompt import BASE_PROMPT, AI_SUM, SCREENSHOT, LINK
+from app.gpt.prompt import AI_SUM, SCREENSHOT, LINK
+from app.gpt.response_cache import llm_response_cache, make_cache_key
+from app.gpt.rate_limiter import CallStats, LLM_EXPECTED_OUTPUT_TOKENS, estimate_tokens, llm_scheduler
+from app.gpt.transcript_compactor import CompactionReport, compact_transcript, context_tokens_for, format_time
 from app.gpt.utils import fix_markdown
 from app.models.transcriber_model import TranscriptSegment
-from datetime import timedelta
-from typing import List
+from app.utils.metrics import record_cache
+from typing import List, Optional
+import time
 
 
 class UniversalGPT(GPT):
-    def __init__(self, client, model: str, temperature: float = 0.7):
+    def __init__(self, client, model: str, temperature: float = 0.7, provider_id: Optional[str] = None,
+                 cache_control: bool = False):
         self.client = client
         self.model = model
         self.temperature = temperature
+        self.provider_id = provider_id
+        self.cache_control = cache_control
         self.screenshot = False
         self.link = False
+        self.last_call_stats: Optional[CallStats] = None
+        self.cache_hit = False
+        self.last_compaction: Optional[CompactionReport] = None
+        self.last_usage: Optional[PromptUsage] = None
+        self.last_latency: Optional[float] = None
 
     def _format_time(self, seconds: float) -> str:
-        return str(timedelta(seconds=int(seconds)))[2:]
+        return format_time(seconds)
 
-    def _build_segment_text(self, segments: List[TranscriptSegment]) -> str:
-        return "\n".join(
-            f"{self._format_time(seg.start)} - {seg.text.strip()}"
-            for seg in segments
-        )
+    def _build_segment_text(self, segments: List[TranscriptSegment], token_budget: Optional[int] = None) -> str:
+        # 合并短分段、去重并按模型上下文裁剪，压缩报告留给调用方记录
+        text, self.last_compaction = compact_transcript(segments, token_budget=token_budget)
+        return text
 
     def ensure_segments_type(self, segments) -> List[TranscriptSegment]:
         return [TranscriptSegment(**seg) if isinstance(seg, dict) else seg for seg in segments]
 
+    def _transcript_budget(self, prefix: str, **kwargs) -> int:
+        # 模型上下文扣除预留输出与 prompt 其余部分后，剩下的才是转写文本可用的 token 数
+        prompt_overhead = estimate_tokens(prefix) + estimate_tokens(build_prompt_context(
+            title=kwargs.get('title'),
+            segment_text="",
+            tags=kwargs.get('tags'),
+            extras=kwargs.get('extras'),
+        ))
+        return context_tokens_for(self.model) - LLM_EXPECTED_OUTPUT_TOKENS - prompt_overhead
+
     def create_messages(self, segments: List[TranscriptSegment], **kwargs):
+        # 系统消息只放与视频无关的静态说明，跨任务保持字节级一致，供应商才能复用前缀缓存
+        prefix = get_static_prefix(style=kwargs.get('style'), _format=kwargs.get('_format'))
+        if self.cache_control:
+            system_content = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+        else:
+            system_content = prefix
 
-        content_text = generate_base_prompt(
+        content_text = build_prompt_context(
             title=kwargs.get('title'),
-            segment_text=self._build_segment_text(segments),
+            segment_text=self._build_segment_text(segments, self._transcript_budget(prefix, **kwargs)),
             tags=kwargs.get('tags'),
-            _format=kwargs.get('_format'),
-            style=kwargs.get('style'),
             extras=kwargs.get('extras'),
         )
 
@@ -52,14 +78,23 @@ class UniversalGPT(GPT):
                 }
             })
 
-        #  正确格式：整体包在一个 message 里，role + content array
-        messages = [{
-            "role": "user",
-            "content": content
-        }]
+        messages = [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": content},
+        ]
 
         return messages
 
+    @staticmethod
+    def _prompt_text(messages) -> str:
+        parts = []
+        for m in messages:
+            if isinstance(m["content"], str):
+                parts.append(m["content"])
+            else:
+                parts.extend(part["text"] for part in m["content"] if part.get("type") == "text")
+        return "".join(parts)
+
     def list_models(self):
         return self.client.models.list()
 
@@ -77,9 +112,36 @@ class UniversalGPT(GPT):
             style=source.style,
             extras=source.extras
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7
+        # 相同 (messages, 模型, temperature) 直接复用缓存的结果；bypass_cache 时跳过读取但刷新缓存
+        cache_key = make_cache_key(self.model, self.temperature, messages)
+        self.last_call_stats = None
+        self.last_usage = None
+        self.last_latency = None
+        self.cache_hit = False
+        if not source.bypass_cache:
+            cached = llm_response_cache.get(cache_key)
+            record_cache("llm_response", cached is not None)
+            if cached is not None:
+                self.cache_hit = True
+                return cached
+
+        def request():
+            # 只计成功那次请求本身的耗时，排队与退避等待记在 last_call_stats 中
+            started = time.perf_counter()
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature
+            )
+            self.last_latency = time.perf_counter() - started
+            return response
+
+        response, self.last_call_stats = llm_scheduler.call(
+            self.provider_id or "default",
+            estimate_tokens(self._prompt_text(messages)) + LLM_EXPECTED_OUTPUT_TOKENS,
+            request,
         )
-        return response.choices[0].message.content.strip()
+        self.last_usage = extract_usage(response)
+        content = response.choices[0].message.content.strip()
+        llm_response_cache.put(cache_key, content, model=self.model)
+        return content
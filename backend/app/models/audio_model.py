@@ -12,4 +12,6 @@ class AudioDownloadResult:
     video_id: str                # 唯一视频ID
     raw_info: dict               # yt-dlp 的原始 info 字典
     video_path: Optional[str] = None  #  新增字段：可选视频文件路径
+    downloaded_bytes: Optional[int] = None       # 本次下载实际拉取的字节数，命中缓存或平台未统计时为 None
+    postprocess_seconds: Optional[float] = None  # 转码 / 合并等后处理耗时（秒）
 
@@ -15,4 +15,5 @@ class GPTSource:
     extras: Optional[str] = None
     _format: Optional[list] = None
     video_img_urls:  Optional[list] = None
+    bypass_cache: Optional[bool] = False  # 跳过 LLM 响应缓存，强制重新生成
 
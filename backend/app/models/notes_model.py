@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 from app.models.audio_model import AudioDownloadResult
 from app.models.transcriber_model import TranscriptResult
@@ -9,4 +9,5 @@ from app.models.transcriber_model import TranscriptResult
 class NoteResult:
     markdown: str                  # GPT 总结的 Markdown 内容
     transcript: TranscriptResult                # Whisper 转写结果
-    audio_meta: AudioDownloadResult  # 音频下载的元信息（title、duration、封面等）
\ No newline at end of file
+    audio_meta: AudioDownloadResult  # 音频下载的元信息（title、duration、封面等）
+    variants: Optional[List[dict]] = None  # 多变体生成时每个变体的 {style, format, markdown, error}
\ No newline at end of file
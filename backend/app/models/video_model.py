@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class VideoStream:
+    url: str                                          # 远程视频流直链（可直接 HTTP Range 读取）
+    http_headers: dict = field(default_factory=dict)  # 请求直链时必须携带的请求头（Referer、User-Agent 等）
+    width: Optional[int] = None                       # 视频宽度
+    height: Optional[int] = None                      # 视频高度
+    duration: Optional[float] = None                  # 视频时长（秒），用于跳过 ffprobe
+    filesize: Optional[int] = None                    # 视频流大小（字节），平台未提供时为 None
@@ -3,11 +3,10 @@ from pydantic import BaseModel
 from typing import Optional
 from app.utils.response import ResponseWrapper as R
 
-from app.services.cookie_manager import CookieConfigManager
+from app.services.cookie_manager import cookie_manager
 from ffmpeg_helper import ensure_ffmpeg_or_raise
 
 router = APIRouter()
-cookie_manager = CookieConfigManager()
 
 
 class CookieUpdateRequest(BaseModel):
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import METRICS_CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus 抓取接口：各阶段耗时直方图、活跃数、队列深度、缓存命中与错误计数
+    """
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
@@ -35,6 +35,11 @@ def model_list(provider_id):
     return R.success(modelService.get_all_models_by_id(provider_id))
 
 
+@router.get("/model_catalog/status")
+def model_catalog_status():
+    return R.success(modelService.get_catalog_status())
+
+
 @router.post("/models")
 def create_model(data: CreateModelRequest):
     success = ModelService.add_new_model(data.provider_id, data.model_name)
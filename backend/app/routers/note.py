@@ -1,24 +1,27 @@
 # app/routers/note.py
+import hashlib
 import json
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import urlparse
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File
 from pydantic import BaseModel, validator, field_validator
-from dataclasses import asdict
 
 from app.db.video_task_dao import get_task_by_video
 from app.enmus.exception import NoteErrorEnum
 from app.enmus.note_enums import DownloadQuality
 from app.exceptions.note import NoteError
 from app.services.note import NoteGenerator, logger
+from app.services.result_store import parse_fields, result_store
+from app.utils.metrics import stage_timer
 from app.utils.response import ResponseWrapper as R
+from app.utils.trace import TaskTrace, current_trace
 from app.utils.url_parser import extract_video_id
 from app.validators.video_url_validator import is_supported_video_url
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 import httpx
 from app.enmus.task_status_enums import TaskStatus
@@ -34,6 +37,12 @@ class RecordRequest(BaseModel):
     platform: str
 
 
+class NoteVariant(BaseModel):
+    style: Optional[str] = None
+    format: Optional[list] = None
+    extras: Optional[str] = None
+
+
 class VideoRequest(BaseModel):
     video_url: str
     platform: str
@@ -49,6 +58,9 @@ class VideoRequest(BaseModel):
     video_understanding: Optional[bool] = False
     video_interval: Optional[int] = 0
     grid_size: Optional[list] = []
+    bypass_llm_cache: Optional[bool] = False
+    # 同一视频一次生成多个风格 / 格式的笔记，共用下载与转写
+    variants: Optional[List[NoteVariant]] = None
 
     @field_validator("video_url")
     def validate_supported_url(cls, v):
@@ -68,41 +80,52 @@ UPLOAD_DIR = "uploads"
 
 
 def save_note_to_file(task_id: str, note):
-    os.makedirs(NOTE_OUTPUT_DIR, exist_ok=True)
-    with open(os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
-        json.dump(asdict(note), f, ensure_ascii=False, indent=2)
+    result_store.save(task_id, note)
 
 
 def run_note_task(task_id: str, video_url: str, platform: str, quality: DownloadQuality,
                   link: bool = False, screenshot: bool = False, model_name: str = None, provider_id: str = None,
                   _format: list = None, style: str = None, extras: str = None, video_understanding: bool = False,
-                  video_interval=0, grid_size=[]
+                  video_interval=0, grid_size=[], bypass_llm_cache: bool = False,
+                  variants: Optional[List[dict]] = None
                   ):
 
     if not model_name or not provider_id:
         raise HTTPException(status_code=400, detail="请选择模型和提供者")
 
-    note = NoteGenerator().generate(
-        video_url=video_url,
-        platform=platform,
-        quality=quality,
-        task_id=task_id,
-        model_name=model_name,
-        provider_id=provider_id,
-        link=link,
-        _format=_format,
-        style=style,
-        extras=extras,
-        screenshot=screenshot
-        , video_understanding=video_understanding,
-        video_interval=video_interval,
-        grid_size=grid_size
-    )
-    logger.info(f"Note generated: {task_id}")
-    if not note or not note.markdown:
-        logger.warning(f"任务 {task_id} 执行失败，跳过保存")
-        return
-    save_note_to_file(task_id, note)
+    # 时间线在这里创建，generate 沿用，task / save 两个 span 也能写入
+    trace = TaskTrace(task_id)
+    current_trace.set(trace)
+    try:
+        # stage="task" 的活跃数即正在执行的任务数
+        with stage_timer("task", platform):
+            note = NoteGenerator().generate(
+                video_url=video_url,
+                platform=platform,
+                quality=quality,
+                task_id=task_id,
+                model_name=model_name,
+                provider_id=provider_id,
+                link=link,
+                _format=_format,
+                style=style,
+                extras=extras,
+                screenshot=screenshot
+                , video_understanding=video_understanding,
+                video_interval=video_interval,
+                grid_size=grid_size,
+                bypass_llm_cache=bypass_llm_cache,
+                variants=variants,
+            )
+            logger.info(f"Note generated: {task_id}")
+            if not note or not note.markdown:
+                logger.warning(f"任务 {task_id} 执行失败，跳过保存")
+                return
+            with stage_timer("save", platform):
+                save_note_to_file(task_id, note)
+    finally:
+        # task / save 在 generate 最后一次写出时间线之后才结束，补写一次
+        trace.save(NOTE_OUTPUT_DIR)
 
 
 
@@ -153,16 +176,60 @@ def generate_note(data: VideoRequest, background_tasks: BackgroundTasks):
 
         background_tasks.add_task(run_note_task, task_id, data.video_url, data.platform, data.quality, data.link,
                                   data.screenshot, data.model_name, data.provider_id, data.format, data.style,
-                                  data.extras, data.video_understanding, data.video_interval, data.grid_size)
+                                  data.extras, data.video_understanding, data.video_interval, data.grid_size,
+                                  bypass_llm_cache=bool(data.bypass_llm_cache),
+                                  variants=[v.model_dump() for v in data.variants] if data.variants else None)
         return R.success({"task_id": task_id})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _result_etag(task_id: str, status_path: str, fields: Optional[str]) -> Optional[str]:
+    """
+    由结果、状态文件的版本（mtime/大小）与字段选择计算 ETag，不读取文件内容
+    """
+    version = result_store.version_tag(task_id)
+    if version is None:
+        return None
+    try:
+        status_version = os.stat(status_path).st_mtime_ns
+    except FileNotFoundError:
+        status_version = 0
+    digest = hashlib.sha1(f"{version}|{status_version}|{fields or ''}".encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _success_result(task_id: str, status: str, fields: Optional[str], etag: Optional[str], message=None):
+    result_content = result_store.load_fields(task_id, parse_fields(fields))
+    if result_content is None:
+        return None
+    data = {"status": status, "result": result_content}
+    if message is not None:
+        data["message"] = message
+    data["task_id"] = task_id
+    response = R.success(data)
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @router.get("/task_status/{task_id}")
-def get_task_status(task_id: str):
+def get_task_status(task_id: str, request: Request,
+                    fields: Optional[str] = Query(None, description="只返回指定字段，如 markdown,audio_meta.title")):
     status_path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.status.json")
-    result_path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json")
+
+    # 结果未变化时直接返回 304，不再读取状态与结果文件
+    etag = _result_etag(task_id, status_path, fields)
+    if etag and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
     # 优先读状态文件
     if os.path.exists(status_path):
@@ -174,15 +241,9 @@ def get_task_status(task_id: str):
 
         if status == TaskStatus.SUCCESS.value:
             # 成功状态的话，继续读取最终笔记内容
-            if os.path.exists(result_path):
-                with open(result_path, "r", encoding="utf-8") as rf:
-                    result_content = json.load(rf)
-                return R.success({
-                    "status": status,
-                    "result": result_content,
-                    "message": message,
-                    "task_id": task_id
-                })
+            response = _success_result(task_id, status, fields, etag, message=message)
+            if response is not None:
+                return response
             else:
                 # 理论上不会出现，保险处理
                 return R.success({
@@ -202,14 +263,9 @@ def get_task_status(task_id: str):
         })
 
     # 没有状态文件，但有结果
-    if os.path.exists(result_path):
-        with open(result_path, "r", encoding="utf-8") as f:
-            result_content = json.load(f)
-        return R.success({
-            "status": TaskStatus.SUCCESS.value,
-            "result": result_content,
-            "task_id": task_id
-        })
+    response = _success_result(task_id, TaskStatus.SUCCESS.value, fields, etag)
+    if response is not None:
+        return response
 
     # 什么都没有，默认PENDING
     return R.success({
@@ -7,6 +7,7 @@ from app.models.model_config import ModelConfig
 from app.services.model import ModelService
 from app.utils.response import ResponseWrapper as R
 from app.services.provider import ProviderService
+from app.services.provider_health import provider_health
 
 router = APIRouter()
 
@@ -90,3 +91,8 @@ def update_provider(data: ProviderUpdateRequest):
 def gpt_connect_test(data: TestRequest):
     ModelService().connect_test(data.id)
     return R.success(msg='连接成功')
+
+
+@router.get('/provider_health')
+def get_provider_health():
+    return R.success(provider_health.all_stats())
@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.db.llm_usage_dao import GROUP_COLUMNS
+from app.db.video_task_dao import list_video_tasks
+from app.enmus.task_status_enums import TaskStatus
+from app.services.usage import UsageService
+from app.utils.logger import get_logger
+from app.utils.response import ResponseWrapper as R
+from app.utils.trace import load_trace
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/tasks")
+def list_tasks(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    platform: Optional[str] = None,
+    status: Optional[TaskStatus] = None,
+    date_from: Optional[date] = Query(None, description="创建日期下界（含，UTC）"),
+    date_to: Optional[date] = Query(None, description="创建日期上界（含，UTC）"),
+):
+    """
+    任务历史，按创建时间倒序；翻页时传入上一页返回的 next_cursor。
+    只返回标题、封面、状态等轻量字段，笔记内容通过 task_status 单独获取
+    """
+    try:
+        items, next_cursor = list_video_tasks(
+            limit=limit,
+            cursor=cursor,
+            platform=platform,
+            status=status.value if status else None,
+            created_from=datetime.combine(date_from, time.min) if date_from else None,
+            created_to=datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None,
+        )
+    except ValueError:
+        return R.error(msg="无效的分页游标", code=400)
+    except Exception as e:
+        logger.error(f"获取任务历史失败：{e}")
+        return R.error(msg=e)
+    return R.success({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/tasks/{task_id}/usage")
+def get_task_usage(task_id: str):
+    """
+    任务内每次 LLM 调用的 token、耗时与费用明细及合计
+    """
+    try:
+        return R.success(UsageService.get_task_usage(task_id))
+    except Exception as e:
+        logger.error(f"获取任务用量失败：{e}")
+        return R.error(msg=e)
+
+
+@router.get("/tasks/{task_id}/trace")
+def get_task_trace(task_id: str):
+    """
+    任务的阶段时间线（瀑布图数据）：各阶段起止时间、所在线程、字节数、缓存命中、后端与重试次数
+    """
+    try:
+        trace = load_trace(task_id)
+    except Exception as e:
+        logger.error(f"读取任务时间线失败：{e}")
+        return R.error(msg=e)
+    if trace is None:
+        return R.error(msg="未找到任务时间线", code=404)
+    return R.success(trace)
+
+
+@router.get("/usage")
+def get_usage_summary(
+    group_by: str = Query("provider,model,day", description=f"逗号分隔：{', '.join(GROUP_COLUMNS)}"),
+    date_from: Optional[date] = Query(None, description="创建日期下界（含，UTC）"),
+    date_to: Optional[date] = Query(None, description="创建日期上界（含，UTC）"),
+):
+    """
+    按供应商 / 模型 / 风格 / 日期汇总 LLM 调用次数、token、平均耗时与费用
+    """
+    keys = [g.strip() for g in group_by.split(",") if g.strip()]
+    unknown = [g for g in keys if g not in GROUP_COLUMNS]
+    if unknown:
+        return R.error(msg=f"不支持的分组维度：{', '.join(unknown)}", code=400)
+    try:
+        items = UsageService.get_summary(
+            group_by=keys,
+            created_from=datetime.combine(date_from, time.min) if date_from else None,
+            created_to=datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None,
+        )
+    except Exception as e:
+        logger.error(f"获取用量汇总失败：{e}")
+        return R.error(msg=e)
+    return R.success({"items": items})
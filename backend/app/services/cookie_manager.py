@@ -1,44 +1,134 @@
 import json
+import os
+import tempfile
+import threading
+import weakref
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CookieListener = Callable[[Optional[str]], None]
 
 
 class CookieConfigManager:
+    """
+    平台 Cookie 配置（config/downloader.json）。
+
+    - 解析结果缓存在内存中，读取时只 stat 文件，mtime / 大小变化（如手动编辑）才重新解析
+    - 写入在锁内完成读-改-写，先写临时文件再原子替换，避免并发写丢失或读到半个文件
+    - 下载器可通过 subscribe 订阅某平台的 Cookie，更新后推送到存活的实例
+    """
+
     def __init__(self, filepath: str = "config/downloader.json"):
         self.path = Path(filepath)
+        self._lock = threading.RLock()
+        self._data: Dict[str, Dict[str, str]] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._listeners: Dict[str, List[weakref.ref]] = {}
         self.path.parent.mkdir(parents=True, exist_ok=True)
         if not self.path.exists():
             self._write({})
 
-    def _read(self) -> Dict[str, Dict[str, str]]:
-        try:
-            with self.path.open("r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-
-    def _write(self, data: Dict[str, Dict[str, str]]):
-        with self.path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
     def get(self, platform: str) -> Optional[str]:
-        data = self._read()
-        return data.get(platform, {}).get("cookie")
+        return self._read().get(platform, {}).get("cookie")
 
     def set(self, platform: str, cookie: str):
-        data = self._read()
-        data[platform] = {"cookie": cookie}
-        self._write(data)
+        with self._lock:
+            data = dict(self._read())
+            data[platform] = {"cookie": cookie}
+            self._write(data)
+        self._notify(platform, cookie)
 
     def delete(self, platform: str):
-        data = self._read()
-        if platform in data:
+        with self._lock:
+            data = dict(self._read())
+            if platform not in data:
+                return
             del data[platform]
             self._write(data)
+        self._notify(platform, None)
 
     def list_all(self) -> Dict[str, str]:
         data = self._read()
         return {k: v.get("cookie", "") for k, v in data.items()}
 
     def exists(self, platform: str) -> bool:
-        return self.get(platform) is not None
\ No newline at end of file
+        return self.get(platform) is not None
+
+    def subscribe(self, platform: str, callback: CookieListener) -> None:
+        """
+        订阅平台 Cookie 的变化，并立即以当前值回调一次。
+        绑定方法以弱引用保存，实例被回收后自动失效
+
+        :param platform: 平台名，如 douyin
+        :param callback: 接收新 Cookie（删除时为 None）的回调
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else weakref.ref(callback)
+        with self._lock:
+            self._listeners.setdefault(platform, []).append(ref)
+        callback(self.get(platform))
+
+    # ---------------- 私有方法 ----------------
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return self._data
+
+        changed = []
+        with self._lock:
+            stamp = self._stat()
+            if stamp != self._stamp:
+                try:
+                    with self.path.open("r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except Exception:
+                    data = {}
+                old = self._data
+                changed = [p for p in set(old) | set(data)
+                           if old.get(p, {}).get("cookie") != data.get(p, {}).get("cookie")]
+                self._data, self._stamp = data, stamp
+            data = self._data
+        # 文件在进程外被修改：把变化推送给订阅者
+        for platform in changed:
+            self._notify(platform, data.get(platform, {}).get("cookie"))
+        return data
+
+    def _write(self, data: Dict[str, Dict[str, str]]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._data, self._stamp = data, self._stat()
+
+    def _notify(self, platform: str, cookie: Optional[str]):
+        with self._lock:
+            refs = self._listeners.get(platform, [])
+            callbacks = [r() for r in refs]
+            self._listeners[platform] = [r for r, cb in zip(refs, callbacks) if cb is not None]
+        for callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(cookie)
+            except Exception as e:
+                logger.warning(f"Cookie listener for {platform} failed: {e}")
+
+
+# 全局共享实例，下载器与配置接口共用同一份缓存
+cookie_manager = CookieConfigManager()
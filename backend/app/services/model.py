@@ -1,13 +1,17 @@
 
 
-from app.db.model_dao import insert_model, get_all_models, get_model_by_provider_and_name, delete_model
-from app.db.provider_dao import get_enabled_providers
+import time
+
+from app.db.model_dao import insert_model, delete_model
+from app.db.registry import provider_registry
 from app.enmus.exception import ProviderErrorEnum
 from app.exceptions.provider import ProviderError
 from app.gpt.gpt_factory import GPTFactory
 from app.gpt.provider.OpenAI_compatible_provider import OpenAICompatibleProvider
 from app.models.model_config import ModelConfig
+from app.services.model_catalog import model_catalog
 from app.services.provider import ProviderService
+from app.services.provider_health import provider_health
 from app.utils.logger import get_logger
 
 logger=get_logger(__name__)
@@ -43,7 +47,7 @@ class ModelService:
     @staticmethod
     def get_all_models(verbose: bool = False):
         try:
-            raw_models = get_all_models()
+            raw_models = provider_registry.get_all_models()
             if verbose:
                 print(f"所有模型列表: {raw_models}")
             return ModelService._format_models(raw_models)
@@ -53,7 +57,7 @@ class ModelService:
     @staticmethod
     def get_all_models_safe(verbose: bool = False):
         try:
-            raw_models = get_all_models()
+            raw_models = provider_registry.get_all_models()
             if verbose:
                 print(f"所有模型列表: {raw_models}")
             return ModelService._format_models(raw_models)
@@ -76,29 +80,30 @@ class ModelService:
         return formatted
     @staticmethod
     def get_enabled_models_by_provider( provider_id: str|int,):
-        from app.db.model_dao import get_models_by_provider
-
-        all_models = get_models_by_provider(provider_id)
+        all_models = provider_registry.get_models_by_provider(provider_id)
         enabled_models = all_models
         return enabled_models
     @staticmethod
     def get_all_models_by_id(provider_id: str, verbose: bool = False):
-        try:
-            provider = ProviderService.get_provider_by_id(provider_id)
-
-            models = ModelService.get_model_list(provider["id"], verbose=verbose)
-            print(type(models))
-            serializable_models = [m.dict() for m in models.data]
-            model_list = {
-                "models": serializable_models
-            }
-
-            logger.info(f"[{provider['name']}] 获取模型成功")
-            return model_list
-        except Exception as e:
-            # print(f"[{provider_id}] 获取模型失败: {e}")
-            logger.error(f"[{provider_id}] 获取模型失败: {e}")
+        """
+        供应商远程可用的模型列表，由 model_catalog 缓存，附带缓存时间与最近一次错误
+        """
+        entry = model_catalog.get(provider_id)
+        if entry is None:
+            logger.error(f"[{provider_id}] 获取模型失败: 供应商不存在")
             return []
+        if verbose:
+            logger.info(f"[{provider_id}] 模型列表: {len(entry.models)} 个")
+        return {
+            "models": entry.models,
+            "fetched_at": entry.fetched_at,
+            "stale": entry.is_stale(model_catalog.ttl),
+            "last_error": entry.last_error,
+        }
+
+    @staticmethod
+    def get_catalog_status():
+        return model_catalog.status()
     @staticmethod
     def connect_test(id: str) -> bool:
 
@@ -107,10 +112,13 @@ class ModelService:
         if provider:
             if not provider.get('api_key'):
                 raise ProviderError(code=ProviderErrorEnum.NOT_FOUND.code, message=ProviderErrorEnum.NOT_FOUND.message)
+            started = time.perf_counter()
             result =  OpenAICompatibleProvider.test_connection(
                 api_key=provider.get('api_key'),
                 base_url=provider.get('base_url')
             )
+            provider_health.record(provider["id"], time.perf_counter() - started, result,
+                                   None if result else "connect test failed")
             if result:
                 return True
             else:
@@ -138,7 +146,7 @@ class ModelService:
                 return False
 
             # 查询是否已存在同名模型
-            existing = get_model_by_provider_and_name(provider_id, model_name)
+            existing = provider_registry.get_model_by_provider_and_name(provider_id, model_name)
             if existing:
                 print(f"模型 {model_name} 已存在于供应商ID {provider_id} 下，跳过插入")
                 return False
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from app.db.registry import provider_registry
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 模型目录缓存时间（秒），过期后先返回旧数据再在后台刷新
+MODEL_CATALOG_TTL = int(os.getenv("MODEL_CATALOG_TTL", "600"))
+# 单个供应商 models.list() 的超时时间（秒）
+MODEL_CATALOG_TIMEOUT = float(os.getenv("MODEL_CATALOG_TIMEOUT", "10"))
+# 并发拉取的线程数
+MODEL_CATALOG_WORKERS = int(os.getenv("MODEL_CATALOG_WORKERS", "8"))
+# 是否在启动后定时刷新所有启用供应商的模型目录
+MODEL_CATALOG_BACKGROUND = os.getenv("MODEL_CATALOG_BACKGROUND", "true").lower() == "true"
+
+
+def _fetch_models(provider: dict) -> List[dict]:
+    client = OpenAI(api_key=provider["api_key"], base_url=provider["base_url"],
+                    timeout=MODEL_CATALOG_TIMEOUT, max_retries=0)
+    return [m.model_dump() for m in client.models.list().data]
+
+
+def _fingerprint(provider: dict) -> tuple:
+    # 地址或密钥变更后旧目录不再可信
+    return provider.get("base_url"), provider.get("api_key")
+
+
+@dataclass
+class CatalogEntry:
+    models: List[dict] = field(default_factory=list)
+    fetched_at: Optional[float] = None    # 最近一次成功拉取的时间戳
+    last_error: Optional[str] = None      # 最近一次失败的原因，成功后清空
+    last_error_at: Optional[float] = None
+    fingerprint: Optional[tuple] = None
+
+    def is_stale(self, ttl: int) -> bool:
+        return self.fetched_at is None or time.time() - self.fetched_at >= ttl
+
+
+class ModelCatalog:
+    """
+    各供应商远程模型列表（models.list()）的缓存。
+
+    - refresh_all 并发拉取所有启用的供应商，单个供应商超时或失败不影响其他供应商
+    - get 优先返回缓存；过期时返回旧数据并在后台刷新，没有任何缓存时同步拉取一次
+    - 同一供应商同一时间只有一个拉取在进行
+    - status 给出每个供应商的缓存时间、是否过期及最近一次错误
+    """
+
+    def __init__(self, fetcher: Callable[[dict], List[dict]] = _fetch_models,
+                 ttl: int = MODEL_CATALOG_TTL, timeout: float = MODEL_CATALOG_TIMEOUT,
+                 workers: int = MODEL_CATALOG_WORKERS):
+        self._fetcher = fetcher
+        self.ttl = ttl
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-catalog")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, provider_id) -> Optional[CatalogEntry]:
+        """
+        获取供应商的模型目录；供应商不存在时返回 None
+        """
+        provider = provider_registry.get_provider_by_id(provider_id)
+        if not provider:
+            return None
+        key = str(provider["id"])
+        fingerprint = _fingerprint(provider)
+        entry = self._entries.get(key)
+        if entry is None or entry.fingerprint != fingerprint or entry.fetched_at is None:
+            wait([self._submit(provider)], timeout=self.timeout)
+            entry = self._entries.get(key)
+            if entry is None or entry.fingerprint != fingerprint:
+                return CatalogEntry(last_error="获取模型列表超时", fingerprint=fingerprint)
+            return entry
+        if entry.is_stale(self.ttl):
+            self._submit(provider)
+        return entry
+
+    def cached_models(self, provider_id) -> List[dict]:
+        """
+        只读缓存中的模型列表，不触发拉取
+        """
+        entry = self._entries.get(str(provider_id))
+        return entry.models if entry else []
+
+    def refresh_all(self) -> None:
+        """
+        并发刷新所有启用的供应商，最多等待一个超时时间
+        """
+        futures = [self._submit(p) for p in provider_registry.get_enabled_providers()]
+        if futures:
+            wait(futures, timeout=self.timeout)
+
+    def status(self) -> List[dict]:
+        now = time.time()
+        result = []
+        for provider in provider_registry.get_all_providers():
+            entry = self._entries.get(str(provider["id"])) or CatalogEntry()
+            result.append({
+                "provider_id": provider["id"],
+                "name": provider["name"],
+                "enabled": provider.get("enabled"),
+                "model_count": len(entry.models),
+                "fetched_at": entry.fetched_at,
+                "age_seconds": round(now - entry.fetched_at, 1) if entry.fetched_at else None,
+                "stale": entry.is_stale(self.ttl),
+                "last_error": entry.last_error,
+                "last_error_at": entry.last_error_at,
+            })
+        return result
+
+    def start(self, interval: Optional[int] = None) -> None:
+        """
+        启动后台定时刷新线程，默认每个 TTL 刷新一次
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        interval = interval or self.ttl
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="model-catalog-refresher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---------------- 私有方法 ----------------
+
+    def _run(self, interval: int):
+        while not self._stop.is_set():
+            try:
+                self.refresh_all()
+            except Exception as e:
+                logger.warning(f"Model catalog refresh failed: {e}")
+            self._stop.wait(interval)
+
+    def _submit(self, provider: dict) -> Future:
+        key = str(provider["id"])
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._refresh_one, provider)
+                self._inflight[key] = future
+        return future
+
+    def _refresh_one(self, provider: dict) -> None:
+        key = str(provider["id"])
+        fingerprint = _fingerprint(provider)
+        try:
+            models = self._fetcher(provider)
+            entry = CatalogEntry(models=models, fetched_at=time.time(), fingerprint=fingerprint)
+            logger.info(f"[{provider['name']}] Fetched {len(models)} models")
+        except Exception as e:
+            old = self._entries.get(key)
+            # 保留上次成功的目录，仅记录错误
+            keep = old is not None and old.fingerprint == fingerprint
+            entry = CatalogEntry(
+                models=old.models if keep else [],
+                fetched_at=old.fetched_at if keep else None,
+                last_error=str(e),
+                last_error_at=time.time(),
+                fingerprint=fingerprint,
+            )
+            logger.warning(f"[{provider['name']}] Failed to fetch models: {e}")
+        with self._lock:
+            self._entries[key] = entry
+            self._inflight.pop(key, None)
+
+
+# 全局共享实例
+model_catalog = ModelCatalog()
@@ -2,12 +2,16 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
 from dataclasses import asdict
 from pathlib import Path
 from typing import List, Optional, Tuple, Union, Any
 
+import orjson
 from fastapi import HTTPException
 from pydantic import HttpUrl
+from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
 from app.downloaders.base import Downloader
@@ -15,7 +19,8 @@ from app.downloaders.bilibili_downloader import BilibiliDownloader
 from app.downloaders.douyin_downloader import DouyinDownloader
 from app.downloaders.local_downloader import LocalDownloader
 from app.downloaders.youtube_downloader import YoutubeDownloader
-from app.db.video_task_dao import delete_task_by_video, insert_video_task
+from app.db.engine import session_scope
+from app.db.video_task_dao import delete_task_by_video, save_video_task, update_video_task
 from app.enmus.exception import NoteErrorEnum, ProviderErrorEnum
 from app.enmus.task_status_enums import TaskStatus
 from app.enmus.note_enums import DownloadQuality
@@ -27,14 +32,21 @@ from app.models.audio_model import AudioDownloadResult
 from app.models.gpt_model import GPTSource
 from app.models.model_config import ModelConfig
 from app.models.notes_model import AudioDownloadResult, NoteResult
-from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.models.transcriber_model import TranscriptResult
 from app.services.constant import SUPPORT_PLATFORM_MAP
 from app.services.provider import ProviderService
+from app.services.provider_health import LLM_FAILOVER, provider_health
+from app.services.result_store import compact_raw_info, dump_transcript, load_transcript, result_store
+from app.services.usage import UsageService
 from app.transcriber.base import Transcriber
 from app.transcriber.transcriber_provider import get_transcriber, _transcribers
 from app.utils.note_helper import replace_content_markers
 from app.utils.status_code import StatusCode
 from app.utils.video_helper import generate_screenshot
+from app.utils.url_parser import extract_video_id
+from app.utils.image_budget import ImageBudget, ImagePayloadReport, image_budget_for
+from app.utils.metrics import current_platform, observe_stage, record_cache, record_task, register_queue, stage_timer
+from app.utils.trace import TaskTrace, current_trace, trace_annotate, trace_event
 from app.utils.video_reader import VideoReader
 
 # ------------------ 环境变量与全局配置 ------------------
@@ -54,6 +66,22 @@ IMAGE_OUTPUT_DIR = os.getenv("OUT_DIR", "./static/screenshots")
 # 图片基础 URL（用于生成 Markdown 中的图片链接，需前端静态目录对应）
 IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "/static/screenshots")
 
+# 截图/视频理解所需视频的获取方式：
+#   download：下载完整视频（默认）
+#   low_res ：只下载与网格单元尺寸匹配的低清纯视频流
+#   stream  ：不下载，ffmpeg 按时间点对远程视频流做 HTTP Range 抽帧；平台不支持时回退到 low_res
+VIDEO_FRAME_SOURCE = os.getenv("VIDEO_FRAME_SOURCE", "download").lower()
+# 网格拼图中单张帧的尺寸
+FRAME_UNIT_WIDTH = 1280
+FRAME_UNIT_HEIGHT = 720
+
+# 视频下载/抽帧与音频下载、转写并行执行的线程池
+_video_executor = ThreadPoolExecutor(max_workers=int(os.getenv("VIDEO_WORKERS", "2")), thread_name_prefix="video")
+# 多变体笔记并发总结的线程池（实际请求速率仍受 llm_scheduler 限额约束）
+_summary_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SUMMARY_WORKERS", "4")), thread_name_prefix="summary")
+register_queue("video", lambda: _video_executor._work_queue.qsize())
+register_queue("summary", lambda: _summary_executor._work_queue.qsize())
+
 # 日志配置
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -70,8 +98,14 @@ class NoteGenerator:
         self.device: Optional[str] = None
         self.transcriber_type: str = os.getenv("TRANSCRIBER_TYPE", "fast-whisper")
         self.transcriber: Transcriber = self._init_transcriber()
-        self.video_path: Optional[Path] = None
+        self.video_path: Optional[Union[Path, str]] = None
+        self.video_headers: Optional[dict] = None
         self.video_img_urls=[]
+        self.image_budget: Optional[ImageBudget] = None
+        self.image_payload: Optional[ImagePayloadReport] = None
+        self.platform: Optional[str] = None
+        self.trace: Optional[TaskTrace] = None
+        self._video_future: Optional[Future] = None
         logger.info("NoteGenerator 初始化完成")
 
 
@@ -94,6 +128,8 @@ class NoteGenerator:
         video_understanding: bool = False,
         video_interval: int = 0,
         grid_size: Optional[List[int]] = None,
+        bypass_llm_cache: bool = False,
+        variants: Optional[List[dict]] = None,
     ) -> NoteResult | None:
         """
         主流程：按步骤依次下载、转写、GPT 总结、截图/链接处理、存库、返回 NoteResult。
@@ -113,19 +149,45 @@ class NoteGenerator:
         :param video_understanding: 是否需要视频拼图理解（生成缩略图）
         :param video_interval: 视频帧截取间隔（秒），仅在 video_understanding 为 True 时生效
         :param grid_size: 生成缩略图时的网格大小，如 [3, 3]
+        :param bypass_llm_cache: 是否跳过 LLM 响应缓存，强制重新总结
+        :param variants: 多个笔记变体 [{"style": ..., "format": [...], "extras": ...}]，共用一次下载与转写，
+                         并发总结；未给出的字段沿用 style / _format / extras
         :return: NoteResult 对象，包含 markdown 文本、转写结果和音频元信息
         """
         if grid_size is None:
             grid_size = []
-
+        if variants:
+            variants = [
+                {
+                    "style": v.get("style") or style,
+                    "format": v.get("format") if v.get("format") is not None else (_format or []),
+                    "extras": v.get("extras") or extras,
+                }
+                for v in variants
+            ]
+            # 任一变体需要截图都要准备视频
+            screenshot = screenshot or any("screenshot" in v["format"] for v in variants)
+
+        # 各阶段指标按平台打标签；转写器上的 @timeit 通过 current_platform 取得
+        self.platform = platform
+        current_platform.set(platform)
+        # 阶段时间线随状态文件一起写入 {task_id}.trace.json；调用方（run_note_task）已创建时沿用
+        trace = current_trace.get()
+        if trace is None or trace.task_id != task_id:
+            trace = TaskTrace(task_id) if task_id else None
+            current_trace.set(trace)
+        self.trace = trace
         try:
             logger.info(f"开始生成笔记 (task_id={task_id})")
-            self._update_status(task_id, TaskStatus.PARSING)
+            self._save_task_state(task_id, TaskStatus.PARSING, platform=platform,
+                                  video_id=self._safe_video_id(video_url, platform))
 
             # 获取下载器与 GPT 实例
 
             downloader = self._get_downloader(platform)
             gpt = self._get_gpt(model_name, provider_id)
+            # 网格图按实际使用的供应商（可能已故障转移）的图片预算生成
+            self.image_budget = image_budget_for(getattr(gpt, "provider_id", None) or provider_id)
 
             # 缓存文件路径
             audio_cache_file = NOTE_OUTPUT_DIR / f"{task_id}_audio.json"
@@ -147,6 +209,8 @@ class NoteGenerator:
                 grid_size=grid_size,
             )
 
+            self._save_metadata(task_id=task_id, platform=platform, audio_meta=audio_meta)
+
             # 2. 转写文字
             transcript = self._transcribe_audio(
                 audio_file=audio_meta.file_path,
@@ -154,22 +218,42 @@ class NoteGenerator:
                 status_phase=TaskStatus.TRANSCRIBING,
             )
 
-            # 3. GPT 总结
-            markdown = self._summarize_text(
-                audio_meta=audio_meta,
-                transcript=transcript,
-                gpt=gpt,
-                markdown_cache_file=markdown_cache_file,
-                link=link,
-                screenshot=screenshot,
-                formats=_format or [],
-                style=style,
-                extras=extras,
-                video_img_urls=self.video_img_urls,
-            )
+            # 视频抽帧与转写并行，总结前等待其完成
+            self._wait_for_video(task_id)
+
+            # 3. GPT 总结（多变体时共用同一份转写并发总结，并各自完成截图 & 链接替换）
+            variant_results = None
+            if variants:
+                variant_results = self._summarize_variants(
+                    task_id=task_id,
+                    audio_meta=audio_meta,
+                    transcript=transcript,
+                    gpt=gpt,
+                    variants=variants,
+                    platform=platform,
+                    bypass_cache=bypass_llm_cache,
+                )
+                markdown = next((v["markdown"] for v in variant_results if v["markdown"]), None)
+                if markdown is None:
+                    raise NoteError(code=NoteErrorEnum.EMPTY_NOTE.code,
+                                    message=f"{NoteErrorEnum.EMPTY_NOTE.message}：所有笔记变体均未生成内容")
+            else:
+                markdown = self._summarize_text(
+                    audio_meta=audio_meta,
+                    transcript=transcript,
+                    gpt=gpt,
+                    markdown_cache_file=markdown_cache_file,
+                    link=link,
+                    screenshot=screenshot,
+                    formats=_format or [],
+                    style=style,
+                    extras=extras,
+                    video_img_urls=self.video_img_urls,
+                    bypass_cache=bypass_llm_cache,
+                )
 
             # 4. 截图 & 链接替换
-            if _format:
+            if _format and not variants:
                 markdown = self._post_process_markdown(
                     markdown=markdown,
                     video_path=self.video_path,
@@ -180,16 +264,22 @@ class NoteGenerator:
 
             # 5. 保存记录到数据库
             self._update_status(task_id, TaskStatus.SAVING)
-            self._save_metadata(video_id=audio_meta.video_id, platform=platform, task_id=task_id)
 
-            # 6. 完成
-            self._update_status(task_id, TaskStatus.SUCCESS)
+            # 6. 完成：结果位置与 SUCCESS 状态一并提交
+            self._save_task_state(task_id, TaskStatus.SUCCESS, platform=platform, audio_meta=audio_meta,
+                                  result_path=str(result_store.path_for(task_id)))
             logger.info(f"笔记生成成功 (task_id={task_id})")
-            return NoteResult(markdown=markdown, transcript=transcript, audio_meta=audio_meta)
+            record_task(platform, "success")
+            self._save_trace()
+            return NoteResult(markdown=markdown, transcript=transcript, audio_meta=audio_meta,
+                              variants=variant_results)
 
         except Exception as exc:
             logger.error(f"生成笔记流程异常 (task_id={task_id})：{exc}", exc_info=True)
             self._update_status(task_id, TaskStatus.FAILED, message=str(exc))
+            record_task(platform, "failed")
+            self._discard_video(task_id)
+            self._save_trace()
             return None
 
     @staticmethod
@@ -217,17 +307,23 @@ class NoteGenerator:
         logger.info(f"使用转写器：{self.transcriber_type}")
         return get_transcriber(transcriber_type=self.transcriber_type)
 
-    def _get_gpt(self, model_name: Optional[str], provider_id: Optional[str]) -> GPT:
+    def _get_gpt(self, model_name: Optional[str], provider_id: Optional[str], failover: bool = LLM_FAILOVER) -> GPT:
         """
         根据 provider_id 获取对应的 GPT 实例
         :param model_name: GPT 模型名称
         :param provider_id: 供应商 ID
+        :param failover: 供应商降级时，是否改用提供等价模型且最快的健康供应商
         :return: GPT 实例
         """
         provider = ProviderService.get_provider_by_id(provider_id)
         if not provider:
             logger.error(f"[get_gpt] 未找到模型供应商: provider_id={provider_id}")
             raise ProviderError(code=ProviderErrorEnum.NOT_FOUND,message=ProviderErrorEnum.NOT_FOUND.message)
+        if failover:
+            alternative = provider_health.pick_failover(provider_id, model_name)
+            if alternative:
+                provider, model_name = alternative
+                logger.warning(f"供应商 {provider_id} 已降级，切换到 {provider['name']} / {model_name}")
         logger.info(f"创建 GPT 实例 {provider_id}")
         config = ModelConfig(
             api_key=provider["api_key"],
@@ -235,6 +331,7 @@ class NoteGenerator:
             model_name=model_name,
             provider=provider["type"],
             name=provider["name"],
+            provider_id=str(provider["id"]),
         )
         return GPTFactory().from_config(config)
 
@@ -261,13 +358,15 @@ class NoteGenerator:
         logger.info(f"使用下载器：{downloader_cls.__class__}")
         return instance
 
-    def _update_status(self, task_id: Optional[str], status: Union[str, TaskStatus], message: Optional[str] = None):
+    def _update_status(self, task_id: Optional[str], status: Union[str, TaskStatus], message: Optional[str] = None,
+                       db: Optional[Session] = None):
         """
         创建或更新 {task_id}.status.json，记录当前任务状态
 
         :param task_id: 任务唯一 ID
         :param status: TaskStatus 枚举或自定义状态字符串
         :param message: 可选消息，用于记录失败原因等
+        :param db: 外层工作单元（session_scope），传入时任务记录的状态随其一并提交
         """
         if not task_id:
             return
@@ -300,6 +399,46 @@ class NoteGenerator:
             except:
                 logger.error(f"写入错误  {e}")
 
+        # 同步任务记录中的状态，供任务历史筛选
+        try:
+            update_video_task(task_id, status=data["status"], db=db)
+        except Exception as e:
+            logger.warning(f"更新任务记录状态失败 (task_id={task_id})：{e}")
+
+        self._save_trace()
+
+    def _save_task_state(
+        self,
+        task_id: Optional[str],
+        status: TaskStatus,
+        platform: str,
+        audio_meta: Optional[AudioDownloadResult] = None,
+        video_id: Optional[str] = None,
+        result_path: Optional[str] = None,
+    ) -> None:
+        """
+        任务记录与状态在同一工作单元中写入，只提交一次（任务登记 + PARSING、结果位置 + SUCCESS）。
+        提交失败只记录日志，与单独写入时一致，不影响任务本身
+        """
+        if not task_id:
+            return
+        try:
+            with session_scope() as db:
+                self._save_metadata(task_id=task_id, platform=platform, audio_meta=audio_meta, video_id=video_id,
+                                    result_path=result_path, db=db)
+                # 会话未开启 autoflush，新登记的记录需先 flush，状态的批量 UPDATE 才能命中
+                db.flush()
+                self._update_status(task_id, status, db=db)
+        except Exception as e:
+            logger.error(f"提交任务记录失败 (task_id={task_id})：{e}")
+
+    def _save_trace(self) -> None:
+        """
+        写出当前任务的阶段时间线；每次状态变化时刷新，进行中的任务也能查看已完成的阶段
+        """
+        if self.trace is not None:
+            self.trace.save(str(NOTE_OUTPUT_DIR))
+
     def _handle_exception(self, task_id, exc):
         logger.error(f"任务异常 (task_id={task_id})", exc_info=True)
         error_message = getattr(exc, 'detail', str(exc))
@@ -325,9 +464,9 @@ class NoteGenerator:
         grid_size: List[int],
     ) -> AudioDownloadResult | None:
         """
-        1. 检查音频缓存；若不存在，则根据需要下载音频或视频（若需截图/可视化）。
-        2. 如果需要视频，则先下载视频并生成缩略图集，再下载音频。
-        3. 返回 AudioDownloadResult
+        1. 若需要视频（截图/可视化），视频获取与抽帧在后台线程中进行，与音频下载、转写并行。
+        2. 平台支持一次拉取音视频（downloader.bundles_video）时，音频从本地 mp4 抽取，视频不再重复下载。
+        3. 检查音频缓存；若不存在则下载音频，返回 AudioDownloadResult
 
         :param downloader: Downloader 实例
         :param video_url: 视频/音频链接
@@ -345,53 +484,84 @@ class NoteGenerator:
         task_id = audio_cache_file.stem.split("_")[0]
         self._update_status(task_id, status_phase)
 
-
-
         # 判断是否需要下载视频
         need_video = screenshot or video_understanding
-        if need_video:
-            try:
-                logger.info("开始下载视频")
-                video_path_str = downloader.download_video(video_url)
-                self.video_path = Path(video_path_str)
-                logger.info(f"视频下载完成：{self.video_path}")
-
-                # 若指定了 grid_size，则生成缩略图
-                if grid_size:
-                    self.video_img_urls=VideoReader(
-                        video_path=str(self.video_path),
-                        grid_size=tuple(grid_size),
-                        frame_interval=video_interval,
-                        unit_width=1280,
-                        unit_height=720,
-                        save_quality=90,
-                    ).run()
-                else:
-                    logger.info("未指定 grid_size，跳过缩略图生成")
-            except Exception as exc:
-                logger.error(f"视频下载失败：{exc}")
+        # 完整视频能随音频一次拉取时，等音频下载完成后直接复用本地 mp4
+        bundled = need_video and VIDEO_FRAME_SOURCE == "download" and downloader.bundles_video
+        if need_video and not bundled:
+            self._video_future = _video_executor.submit(
+                copy_context().run, self._prepare_video, downloader, video_url, grid_size, video_interval
+            )
 
-                self._handle_exception(task_id, exc)
-                raise
+        audio = self._load_or_download_audio(
+            downloader=downloader,
+            video_url=video_url,
+            quality=quality,
+            audio_cache_file=audio_cache_file,
+            output_path=output_path,
+            need_video=bundled,
+            task_id=task_id,
+        )
+
+        if bundled:
+            local_video = audio.video_path if audio.video_path and os.path.exists(audio.video_path) else None
+            if not local_video:
+                logger.info("音频结果中未包含本地视频，单独下载视频")
+            self._video_future = _video_executor.submit(
+                copy_context().run, self._prepare_video, downloader, video_url, grid_size, video_interval, local_video
+            )
+        return audio
+
+    def _load_or_download_audio(
+        self,
+        downloader: Downloader,
+        video_url: Union[str, HttpUrl],
+        quality: DownloadQuality,
+        audio_cache_file: Path,
+        output_path: Optional[str],
+        need_video: bool,
+        task_id: str,
+    ) -> AudioDownloadResult:
+        """
+        读取音频缓存，缓存不存在或损坏时调用下载器下载音频并写入缓存。
+
+        :param need_video: 是否让下载器在同一次拉取中保留视频
+        :return: AudioDownloadResult 对象
+        """
         # 已有缓存，尝试加载
         if audio_cache_file.exists():
             logger.info(f"检测到音频缓存 ({audio_cache_file})，直接读取")
             try:
-                data = json.loads(audio_cache_file.read_text(encoding="utf-8"))
-                return AudioDownloadResult(**data)
+                audio = AudioDownloadResult(**orjson.loads(audio_cache_file.read_bytes()))
+                record_cache("audio", True)
+                trace_event("download", cache="hit")
+                return audio
             except Exception as e:
                 logger.warning(f"读取音频缓存失败，将重新下载：{e}")
+        record_cache("audio", False)
         # 下载音频
         try:
             logger.info("开始下载音频")
-            audio = downloader.download(
-                video_url=video_url,
-                quality=quality,
-                output_dir=output_path,
-                need_video=need_video,
-            )
-            # 缓存 audio 元信息到本地 JSON
-            audio_cache_file.write_text(json.dumps(asdict(audio), ensure_ascii=False, indent=2), encoding="utf-8")
+            with stage_timer("download", self.platform) as span:
+                span.set(cache="miss", backend=type(downloader).__name__)
+                audio = downloader.download(
+                    video_url=video_url,
+                    quality=quality,
+                    output_dir=output_path,
+                    need_video=need_video,
+                    audio_formats=self.transcriber.native_audio_formats,
+                )
+                span.set(bytes=audio.downloaded_bytes)
+            if audio.postprocess_seconds is not None:
+                observe_stage("audio_extract", audio.postprocess_seconds, self.platform)
+            if audio.downloaded_bytes is not None:
+                logger.info(
+                    f"音频下载统计：{audio.downloaded_bytes} 字节，后处理 {audio.postprocess_seconds or 0:.2f}s"
+                )
+            # 缓存 audio 元信息到本地 JSON（raw_info 按配置裁剪）
+            cached = asdict(audio)
+            cached["raw_info"] = compact_raw_info(cached.get("raw_info"))
+            audio_cache_file.write_bytes(orjson.dumps(cached))
             logger.info(f"音频下载并缓存成功 ({audio_cache_file})")
             return audio
         except Exception as exc:
@@ -399,6 +569,119 @@ class NoteGenerator:
             self._handle_exception(task_id, exc)
             raise
 
+    def _prepare_video(
+        self,
+        downloader: Downloader,
+        video_url: Union[str, HttpUrl],
+        grid_size: List[int],
+        video_interval: int,
+        local_video: Optional[str] = None,
+    ) -> None:
+        """
+        在后台线程中获取视频并生成缩略图网格，结果写入 self.video_path / self.video_img_urls。
+
+        :param local_video: 已随音频下载到本地的视频路径，提供时跳过视频下载
+        """
+        if local_video:
+            self.video_path = Path(local_video)
+            self.video_headers = None
+            video_duration = None
+            logger.info(f"复用随音频下载的视频：{self.video_path}")
+        else:
+            video_duration = self._fetch_video(downloader, video_url)
+
+        # 若指定了 grid_size，则生成缩略图
+        if grid_size:
+            reader = VideoReader(
+                video_path=str(self.video_path),
+                grid_size=tuple(grid_size),
+                frame_interval=video_interval,
+                unit_width=FRAME_UNIT_WIDTH,
+                unit_height=FRAME_UNIT_HEIGHT,
+                save_quality=90,
+                http_headers=self.video_headers,
+                duration=video_duration,
+                budget=self.image_budget or image_budget_for(None),
+            )
+            with stage_timer("frame_extract", self.platform) as span:
+                self.video_img_urls = reader.run()
+                report = reader.payload_report
+                if report is not None:
+                    span.set(images=report.images, bytes=report.payload_bytes)
+            self.image_payload = reader.payload_report
+        else:
+            logger.info("未指定 grid_size，跳过缩略图生成")
+
+    def _discard_video(self, task_id: Optional[str]) -> None:
+        """
+        任务在等待视频前失败（如转写异常）时收尾后台视频任务：尚未开始的直接取消，
+        已在执行的等待其结束并忽略错误，避免任务结束后仍占用视频线程、写入本实例的状态
+        """
+        future, self._video_future = self._video_future, None
+        if future is None or future.cancel():
+            return
+        try:
+            future.result()
+        except Exception as exc:
+            logger.info(f"任务已失败，忽略后台视频任务的错误 (task_id={task_id})：{exc}")
+
+    def _wait_for_video(self, task_id: Optional[str]) -> None:
+        """
+        等待后台视频任务完成；视频下载或抽帧失败时标记任务失败并抛出异常。
+        """
+        if self._video_future is None:
+            return
+        try:
+            self._video_future.result()
+        except Exception as exc:
+            logger.error(f"视频下载失败：{exc}")
+            self._handle_exception(task_id, exc)
+            raise
+        finally:
+            self._video_future = None
+        report = self.image_payload
+        if report is not None and report.images:
+            logger.info(
+                f"视频理解图片 (task_id={task_id})：{report.images} 张 {report.width}x{report.height}，"
+                f"丢弃 {report.skipped} 张，请求体图片 {report.payload_bytes / 1024:.0f} KB"
+            )
+
+    def _fetch_video(self, downloader: Downloader, video_url: Union[str, HttpUrl]) -> Optional[float]:
+        """
+        按 VIDEO_FRAME_SOURCE 获取抽帧/截图用的视频，结果写入 self.video_path（本地路径或远程直链）
+        与 self.video_headers（远程直链所需请求头）。
+
+        :param downloader: Downloader 实例
+        :param video_url: 视频链接
+        :return: 平台已知的视频时长（秒），未知时为 None
+        """
+        if VIDEO_FRAME_SOURCE == "stream":
+            try:
+                stream = downloader.get_video_stream(video_url, max_height=FRAME_UNIT_HEIGHT)
+            except Exception as e:
+                logger.warning(f"解析远程视频流失败，回退到低清下载：{e}")
+                stream = None
+            if stream:
+                self.video_path = stream.url
+                self.video_headers = stream.http_headers
+                trace_event("video_download", backend="stream")
+                logger.info(f"使用远程视频流抽帧：{stream.width}x{stream.height}")
+                return stream.duration
+
+        with stage_timer("video_download", self.platform) as span:
+            span.set(backend=f"{type(downloader).__name__}:{VIDEO_FRAME_SOURCE}")
+            if VIDEO_FRAME_SOURCE in ("stream", "low_res"):
+                logger.info(f"开始下载低清视频（<= {FRAME_UNIT_HEIGHT}p）")
+                video_path_str = downloader.download_video(video_url, max_height=FRAME_UNIT_HEIGHT)
+            else:
+                logger.info("开始下载视频")
+                video_path_str = downloader.download_video(video_url)
+            if video_path_str and os.path.exists(video_path_str):
+                span.set(bytes=os.path.getsize(video_path_str))
+        self.video_path = Path(video_path_str)
+        self.video_headers = None
+        logger.info(f"视频下载完成：{self.video_path}")
+        return None
 
     def _transcribe_audio(
         self,
@@ -422,17 +705,22 @@ class NoteGenerator:
         if transcript_cache_file.exists():
             logger.info(f"检测到转写缓存 ({transcript_cache_file})，尝试读取")
             try:
-                data = json.loads(transcript_cache_file.read_text(encoding="utf-8"))
-                segments = [TranscriptSegment(**seg) for seg in data.get("segments", [])]
-                return TranscriptResult(language=data["language"], full_text=data["full_text"], segments=segments)
+                transcript = load_transcript(transcript_cache_file.read_bytes())
+                record_cache("transcript", True)
+                trace_event("transcription", cache="hit")
+                return transcript
             except Exception as e:
                 logger.warning(f"加载转写缓存失败，将重新转写：{e}")
+        record_cache("transcript", False)
 
         # 调用转写器
         try:
             logger.info("开始转写音频")
             transcript = self.transcriber.transcript(file_path=audio_file)
-            transcript_cache_file.write_text(json.dumps(asdict(transcript), ensure_ascii=False, indent=2), encoding="utf-8")
+            # 转写计时在转写器的 @timeit 中完成，这里补充后端信息
+            trace_annotate("transcription", cache="miss", backend=self.transcriber_type,
+                           segments=len(transcript.segments))
+            transcript_cache_file.write_bytes(dump_transcript(transcript))
             logger.info(f"转写并缓存成功 ({transcript_cache_file})")
             return transcript
         except Exception as exc:
@@ -452,6 +740,7 @@ class NoteGenerator:
         style: Optional[str],
         extras: Optional[str],
             video_img_urls: List[str],
+        bypass_cache: bool = False,
     ) -> str | None:
         """
         调用 GPT 对转写结果进行总结，生成 Markdown 文本并缓存。
@@ -465,9 +754,10 @@ class NoteGenerator:
         :param formats: 包含 'link' 或 'screenshot' 的列表
         :param style: GPT 输出风格
         :param extras: GPT 额外参数
+        :param bypass_cache: 是否跳过 LLM 响应缓存
         :return: 生成的 Markdown 字符串
         """
-        task_id = markdown_cache_file.stem
+        task_id = markdown_cache_file.stem.split("_")[0]
         self._update_status(task_id, TaskStatus.SUMMARIZING)
 
         source = GPTSource(
@@ -480,10 +770,17 @@ class NoteGenerator:
             _format=formats,
             style=style,
             extras=extras,
+            bypass_cache=bypass_cache,
         )
 
         try:
-            markdown = gpt.summarize(source)
+            with stage_timer("llm", self.platform) as span:
+                try:
+                    markdown = gpt.summarize(source)
+                finally:
+                    span.set(**self._llm_trace_attrs(gpt, style))
+            self._log_summary_stats(task_id, gpt)
+            UsageService.record(task_id, gpt, style=style)
             markdown_cache_file.write_text(markdown, encoding="utf-8")
             logger.info(f"GPT 总结并缓存成功 ({markdown_cache_file})")
             return markdown
@@ -492,10 +789,131 @@ class NoteGenerator:
             self._handle_exception(task_id, exc)
             raise
 
+    @staticmethod
+    def _log_summary_stats(task_id: str, gpt: GPT) -> None:
+        """
+        记录一次总结的转写压缩效果、缓存命中、限流/重试统计与 token 用量
+        """
+        report = getattr(gpt, "last_compaction", None)
+        if report is not None and report.original_tokens:
+            logger.info(
+                f"转写压缩 (task_id={task_id})：{report.original_segments} → {report.compacted_segments} 段，"
+                f"{report.original_tokens} → {report.compacted_tokens} tokens，"
+                f"节省 {report.saved_tokens}（{report.saved_tokens / report.original_tokens:.0%}），"
+                f"去除 {report.dropped_lines} 行，合并粒度 {report.bucket_seconds}s"
+                + ("，超出模型上下文已截断" if report.truncated else "")
+            )
+        if getattr(gpt, "cache_hit", False):
+            logger.info(f"命中 LLM 响应缓存 (task_id={task_id})")
+        call_stats = getattr(gpt, "last_call_stats", None)
+        if call_stats is not None:
+            logger.info(
+                f"LLM 调用统计 (task_id={task_id})：排队 {call_stats.queue_wait:.2f}s，"
+                f"重试 {call_stats.retries} 次（退避 {call_stats.retry_wait:.2f}s），"
+                f"预估 {call_stats.estimated_tokens} tokens"
+            )
+        usage = getattr(gpt, "last_usage", None)
+        if usage is not None:
+            logger.info(
+                f"LLM 用量 (task_id={task_id})：输入 {usage.prompt_tokens} tokens"
+                f"（前缀缓存命中 {usage.cached_tokens}，未命中 {usage.uncached_tokens}），输出 {usage.completion_tokens} tokens"
+            )
+
+    @staticmethod
+    def _llm_trace_attrs(gpt: GPT, style: Optional[str]) -> dict:
+        """
+        一次总结写入时间线的属性：实际使用的供应商 / 模型、响应缓存命中、排队与重试、token 用量
+        """
+        attrs = {
+            "backend": f"{getattr(gpt, 'provider_id', None)}/{getattr(gpt, 'model', None)}",
+            "style": style,
+            "cache": "hit" if getattr(gpt, "cache_hit", False) else "miss",
+        }
+        call_stats = getattr(gpt, "last_call_stats", None)
+        if call_stats is not None:
+            attrs.update(retries=call_stats.retries, queue_wait=round(call_stats.queue_wait, 3))
+        usage = getattr(gpt, "last_usage", None)
+        if usage is not None:
+            attrs.update(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        return attrs
+
+    def _summarize_variants(
+        self,
+        task_id: str,
+        audio_meta: AudioDownloadResult,
+        transcript: TranscriptResult,
+        gpt: GPT,
+        variants: List[dict],
+        platform: str,
+        bypass_cache: bool = False,
+    ) -> List[dict]:
+        """
+        基于同一份转写并发生成多个风格 / 格式的笔记。单个变体失败只记录错误，全部失败时抛出第一个异常。
+
+        :param gpt: 本任务已选定的 GPT 实例（含故障转移结果），各变体使用同一供应商与模型
+        :param variants: [{"style": ..., "format": [...], "extras": ...}]
+        :return: [{"style", "format", "markdown", "error"}]，顺序与 variants 一致
+        """
+        self._update_status(task_id, TaskStatus.SUMMARIZING)
+
+        variant_provider, variant_model = gpt.provider_id, gpt.model
+
+        def run(index: int, variant: dict) -> str:
+            # GPT 实例在 summarize 中保存调用状态，每个变体各用一个；供应商在任务开始时已确定，不再各自故障转移
+            gpt = self._get_gpt(variant_model, variant_provider, failover=False)
+            formats = variant["format"]
+            source = GPTSource(
+                title=audio_meta.title,
+                segment=transcript.segments,
+                tags=audio_meta.raw_info.get("tags", []),
+                screenshot="screenshot" in formats,
+                video_img_urls=self.video_img_urls,
+                link="link" in formats,
+                _format=formats,
+                style=variant["style"],
+                extras=variant["extras"],
+                bypass_cache=bypass_cache,
+            )
+            with stage_timer("llm", self.platform) as span:
+                try:
+                    markdown = gpt.summarize(source)
+                finally:
+                    span.set(**self._llm_trace_attrs(gpt, variant["style"]))
+            self._log_summary_stats(task_id, gpt)
+            UsageService.record(task_id, gpt, style=variant["style"])
+            (NOTE_OUTPUT_DIR / f"{task_id}_markdown_{index}.md").write_text(markdown, encoding="utf-8")
+            if formats:
+                markdown = self._post_process_markdown(
+                    markdown=markdown,
+                    video_path=self.video_path,
+                    formats=formats,
+                    audio_meta=audio_meta,
+                    platform=platform,
+                )
+            return markdown
+
+        futures = [_summary_executor.submit(copy_context().run, run, i, v) for i, v in enumerate(variants)]
+        results, errors = [], []
+        for variant, future in zip(variants, futures):
+            result = {"style": variant["style"], "format": variant["format"], "markdown": None, "error": None}
+            try:
+                result["markdown"] = future.result()
+            except Exception as exc:
+                logger.error(f"笔记变体生成失败 (task_id={task_id}, style={variant['style']})：{exc}")
+                result["error"] = str(exc)
+                errors.append(exc)
+            results.append(result)
+
+        if len(errors) == len(variants):
+            self._handle_exception(task_id, errors[0])
+            raise errors[0]
+        logger.info(f"多变体笔记生成完成 (task_id={task_id})：成功 {len(variants) - len(errors)}/{len(variants)}")
+        return results
+
     def _post_process_markdown(
         self,
         markdown: str,
-        video_path: Optional[Path],
+        video_path: Optional[Union[Path, str]],
         formats: List[str],
         audio_meta: AudioDownloadResult,
         platform: str,
@@ -504,38 +922,40 @@ class NoteGenerator:
         对生成的 Markdown 做后期处理：插入截图和/或插入链接。
 
         :param markdown: 原始 Markdown 字符串
-        :param video_path: 本地视频路径（可为 None）
+        :param video_path: 本地视频路径或远程视频流直链（可为 None）
         :param formats: 包含 'link' 或 'screenshot' 的列表
         :param audio_meta: AudioDownloadResult 元信息，用于链接替换
         :param platform: 平台标识，用于链接替换
         :return: 处理后的 Markdown 字符串
         """
-        if "screenshot" in formats and video_path:
-            try:
-                markdown = self._insert_screenshots(markdown, video_path)
-            except Exception as exc:
-                logger.warning("截图插入失败，跳过该步骤")
-
-        if "link" in formats:
-            try:
-                markdown = replace_content_markers(markdown, video_id=audio_meta.video_id, platform=platform)
-            except Exception as e:
-                logger.warning(f"链接插入失败，跳过该步骤：{e}")
+        with stage_timer("post_process", platform):
+            if "screenshot" in formats and video_path:
+                try:
+                    markdown = self._insert_screenshots(markdown, video_path)
+                except Exception as exc:
+                    logger.warning("截图插入失败，跳过该步骤")
+
+            if "link" in formats:
+                try:
+                    markdown = replace_content_markers(markdown, video_id=audio_meta.video_id, platform=platform)
+                except Exception as e:
+                    logger.warning(f"链接插入失败，跳过该步骤：{e}")
 
         return markdown
 
-    def _insert_screenshots(self, markdown: str, video_path: Path) -> str | None | Any:
+    def _insert_screenshots(self, markdown: str, video_path: Union[Path, str]) -> str | None | Any:
         """
         扫描 Markdown 文本中所有 Screenshot 标记，并替换为实际生成的截图链接。
 
         :param markdown: 含有 *Screenshot-mm:ss 或 Screenshot-[mm:ss] 标记的 Markdown 文本
-        :param video_path: 本地视频文件路径
+        :param video_path: 本地视频文件路径或远程视频流直链
         :return: 替换后的 Markdown 字符串
         """
         matches: List[Tuple[str, int]] = self._extract_screenshot_timestamps(markdown)
         for idx, (marker, ts) in enumerate(matches):
             try:
-                img_path = generate_screenshot(str(video_path), str(IMAGE_OUTPUT_DIR), ts, idx)
+                img_path = generate_screenshot(str(video_path), str(IMAGE_OUTPUT_DIR), ts, idx,
+                                               http_headers=self.video_headers)
                 filename = Path(img_path).name
                 # 构建前端可访问的 URL，例如 /static/screenshots/{filename}
                 img_url = f"{IMAGE_BASE_URL.rstrip('/')}/{filename}"
@@ -564,16 +984,44 @@ class NoteGenerator:
             results.append((match.group(0), total_seconds))
         return results
 
-    def _save_metadata(self, video_id: str, platform: str, task_id: str) -> None:
+    def _save_metadata(
+        self,
+        task_id: Optional[str],
+        platform: str,
+        audio_meta: Optional[AudioDownloadResult] = None,
+        video_id: Optional[str] = None,
+        result_path: Optional[str] = None,
+        db: Optional[Session] = None,
+    ) -> None:
         """
-        将生成的笔记任务记录插入数据库
+        插入或更新任务记录：任务开始时先登记，下载完成后补充标题、封面、时长，保存时记录结果位置
 
-        :param video_id: 视频 ID
-        :param platform: 平台标识
         :param task_id: 任务 ID
+        :param platform: 平台标识
+        :param audio_meta: 音频下载元信息
+        :param video_id: 视频 ID（audio_meta 提供时以其为准）
+        :param result_path: 笔记结果文件路径
+        :param db: 外层工作单元（session_scope），传入时随其一并提交
         """
+        if not task_id:
+            return
         try:
-            insert_video_task(video_id=video_id, platform=platform, task_id=task_id)
-            logger.info(f"已保存任务记录到数据库 (video_id={video_id}, platform={platform}, task_id={task_id})")
+            save_video_task(
+                task_id=task_id,
+                video_id=audio_meta.video_id if audio_meta else video_id,
+                platform=platform,
+                title=audio_meta.title if audio_meta else None,
+                cover_url=audio_meta.cover_url if audio_meta else None,
+                duration=audio_meta.duration if audio_meta else None,
+                result_path=result_path,
+                db=db,
+            )
         except Exception as e:
-            logger.error(f"保存任务记录失败：{e}")
\ No newline at end of file
+            logger.error(f"保存任务记录失败：{e}")
+
+    @staticmethod
+    def _safe_video_id(video_url: Union[str, HttpUrl], platform: str) -> Optional[str]:
+        try:
+            return extract_video_id(str(video_url), platform)
+        except Exception:
+            return None
@@ -4,12 +4,10 @@ from kombu import uuid
 from app.db.models.providers import Provider
 from app.db.provider_dao import (
     insert_provider,
-    get_all_providers,
-    get_provider_by_name,
-    get_provider_by_id,
     update_provider,
-    delete_provider, get_enabled_providers,
+    delete_provider,
 )
+from app.db.registry import provider_registry
 from app.gpt.gpt_factory import GPTFactory
 from app.models.model_config import ModelConfig
 
@@ -88,32 +86,28 @@ class ProviderService:
             "enabled": p.enabled,
             "created_at": p.created_at,
         }
+    # 查询走进程内注册表（已是序列化后的 dict），写操作由 DAO 负责失效
     @staticmethod
     def get_all_providers():
-        rows = get_all_providers()
-        if rows is None:
-            return []
-
-        return [ProviderService.serialize_provider(row) for row in rows] if rows else []
+        return provider_registry.get_all_providers()
     @staticmethod
     def get_all_providers_safe():
-        rows = get_all_providers()
-
-        return [ProviderService.serialize_provider(row) for row in rows] if (rows) else []
+        return provider_registry.get_all_providers()
     @staticmethod
     def get_provider_by_name(name: str):
-        row = get_provider_by_name(name)
-        return ProviderService.serialize_provider(row)
+        return provider_registry.get_provider_by_name(name)
 
     @staticmethod
     def get_provider_by_id(id: str):  # 已改为 str 类型
-        row = get_provider_by_id(id)
-        return ProviderService.serialize_provider(row)
+        return provider_registry.get_provider_by_id(id)
 
     @staticmethod
     def get_provider_by_id_safe(id: str):  # 已改为 str 类型
-        row = get_provider_by_id(id)
-        return ProviderService.serialize_provider_safe(row)
+        provider = provider_registry.get_provider_by_id(id)
+        if not provider:
+            return None
+        provider["api_key"] = ProviderService.mask_key(provider.get("api_key"))
+        return provider
             # all_models.extend(provider['models'])
 
     @staticmethod
@@ -0,0 +1,227 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from app.db.registry import provider_registry
+from app.services.model_catalog import model_catalog
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 探测间隔（秒），0 表示不做后台探测
+PROVIDER_PROBE_INTERVAL = int(os.getenv("PROVIDER_PROBE_INTERVAL", "60"))
+# 单次探测超时（秒）
+PROVIDER_PROBE_TIMEOUT = float(os.getenv("PROVIDER_PROBE_TIMEOUT", "10"))
+# 每个供应商保留的最近样本数
+PROVIDER_HEALTH_WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+# 窗口内错误率达到该值即视为降级
+PROVIDER_DEGRADED_ERROR_RATE = float(os.getenv("PROVIDER_DEGRADED_ERROR_RATE", "0.5"))
+# p95 延迟超过该值（毫秒）视为降级，0 表示不按延迟判断
+PROVIDER_DEGRADED_P95_MS = float(os.getenv("PROVIDER_DEGRADED_P95_MS", "0"))
+# 请求的供应商降级时，是否把任务路由到提供同款模型且最快的健康供应商
+LLM_FAILOVER = os.getenv("LLM_FAILOVER", "false").lower() == "true"
+
+# 样本少于该数量时不判定降级，避免一次偶发失败就切换
+MIN_SAMPLES = 3
+# 连续失败达到该次数直接视为降级
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+class Sample(NamedTuple):
+    at: float
+    latency: float
+    ok: bool
+
+
+def _probe(provider: dict) -> None:
+    client = OpenAI(api_key=provider["api_key"], base_url=provider["base_url"],
+                    timeout=PROVIDER_PROBE_TIMEOUT, max_retries=0)
+    client.models.list()
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # nearest-rank 百分位
+    index = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[index]
+
+
+def normalize_model_name(name: str) -> str:
+    """
+    模型名归一化，用于判断不同供应商上的模型是否等价：忽略大小写与 "vendor/" 前缀
+    """
+    return (name or "").strip().lower().rsplit("/", 1)[-1]
+
+
+class ProviderHealthMonitor:
+    """
+    供应商健康度监控。
+
+    - 后台线程定期并发调用各启用供应商的 models.list() 作为轻量探测
+    - 每个供应商保留最近 PROVIDER_HEALTH_WINDOW 个样本，统计 p50 / p95 延迟与错误率
+    - 错误率、连续失败次数或 p95 延迟超过阈值时判定为降级
+    - pick_failover 为降级的供应商挑选提供等价模型、p50 最低的健康供应商
+    """
+
+    def __init__(self, prober: Callable[[dict], None] = _probe, window: int = PROVIDER_HEALTH_WINDOW,
+                 timeout: float = PROVIDER_PROBE_TIMEOUT):
+        self._prober = prober
+        self.window = window
+        self.timeout = timeout
+        self._samples: Dict[str, Deque[Sample]] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="provider-probe")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, provider_id, latency: float, ok: bool, error: Optional[str] = None) -> None:
+        """
+        记录一次调用结果（探测或真实请求均可）
+
+        :param latency: 耗时（秒）
+        :param ok: 是否成功
+        :param error: 失败原因
+        """
+        key = str(provider_id)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(Sample(time.time(), latency, ok))
+            if not ok:
+                self._errors[key] = error or "unknown error"
+
+    def stats(self, provider_id) -> dict:
+        key = str(provider_id)
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+            last_error = self._errors.get(key)
+        latencies = [s.latency for s in samples if s.ok]
+        failures = sum(1 for s in samples if not s.ok)
+        consecutive = 0
+        for s in reversed(samples):
+            if s.ok:
+                break
+            consecutive += 1
+        p50, p95 = _percentile(latencies, 0.5), _percentile(latencies, 0.95)
+        error_rate = failures / len(samples) if samples else None
+        return {
+            "provider_id": provider_id,
+            "samples": len(samples),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(error_rate, 3) if error_rate is not None else None,
+            "consecutive_failures": consecutive,
+            "last_ok_at": next((s.at for s in reversed(samples) if s.ok), None),
+            "last_error": last_error,
+            "degraded": self._is_degraded(samples, error_rate, consecutive, p95),
+        }
+
+    def is_degraded(self, provider_id) -> bool:
+        return self.stats(provider_id)["degraded"]
+
+    def all_stats(self) -> List[dict]:
+        result = []
+        for provider in provider_registry.get_all_providers():
+            stats = self.stats(provider["id"])
+            stats["name"] = provider["name"]
+            stats["enabled"] = provider.get("enabled")
+            result.append(stats)
+        return result
+
+    def pick_failover(self, provider_id, model_name: str) -> Optional[Tuple[dict, str]]:
+        """
+        请求的供应商降级时，返回 (替代供应商, 该供应商上的等价模型名)；未降级或没有可用替代时返回 None
+        """
+        if not self.is_degraded(provider_id):
+            return None
+        target = normalize_model_name(model_name)
+        candidates = []
+        for provider in provider_registry.get_enabled_providers():
+            if str(provider["id"]) == str(provider_id):
+                continue
+            stats = self.stats(provider["id"])
+            if stats["degraded"] or stats["p50_ms"] is None:
+                continue
+            equivalent = self._find_equivalent_model(provider["id"], target)
+            if equivalent:
+                candidates.append((stats["p50_ms"], provider, equivalent))
+        if not candidates:
+            return None
+        _, provider, equivalent = min(candidates, key=lambda c: c[0])
+        return provider, equivalent
+
+    def probe_all(self) -> None:
+        """
+        并发探测所有启用的供应商，最多等待一个超时时间
+        """
+        futures = [self._executor.submit(self._probe_one, p) for p in provider_registry.get_enabled_providers()]
+        if futures:
+            wait(futures, timeout=self.timeout + 1)
+
+    def start(self, interval: int = PROVIDER_PROBE_INTERVAL) -> None:
+        if interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="provider-health-monitor",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---------------- 私有方法 ----------------
+
+    @staticmethod
+    def _is_degraded(samples: List[Sample], error_rate: Optional[float], consecutive: int,
+                     p95: Optional[float]) -> bool:
+        if consecutive >= MAX_CONSECUTIVE_FAILURES:
+            return True
+        if len(samples) < MIN_SAMPLES:
+            return False
+        if error_rate is not None and error_rate >= PROVIDER_DEGRADED_ERROR_RATE:
+            return True
+        return bool(PROVIDER_DEGRADED_P95_MS and p95 is not None and p95 * 1000 >= PROVIDER_DEGRADED_P95_MS)
+
+    @staticmethod
+    def _find_equivalent_model(provider_id, target: str) -> Optional[str]:
+        # 优先使用用户已添加的模型，其次使用模型目录缓存中的远程模型
+        for m in provider_registry.get_models_by_provider(provider_id):
+            if normalize_model_name(m["model_name"]) == target:
+                return m["model_name"]
+        for m in model_catalog.cached_models(provider_id):
+            if normalize_model_name(m.get("id")) == target:
+                return m["id"]
+        return None
+
+    def _probe_one(self, provider: dict) -> None:
+        started = time.perf_counter()
+        try:
+            self._prober(provider)
+            self.record(provider["id"], time.perf_counter() - started, True)
+        except Exception as e:
+            self.record(provider["id"], time.perf_counter() - started, False, str(e))
+            logger.warning(f"[{provider['name']}] Health probe failed: {e}")
+
+    def _run(self, interval: int):
+        while not self._stop.is_set():
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.warning(f"Provider health probe failed: {e}")
+            self._stop.wait(interval)
+
+
+# 全局共享实例
+provider_health = ProviderHealthMonitor()
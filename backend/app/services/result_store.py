@@ -0,0 +1,403 @@
+import gzip
+import os
+import shutil
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+from dotenv import load_dotenv
+
+from app.models.notes_model import NoteResult
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖，未安装时使用 gzip
+    zstandard = None
+
+load_dotenv()
+logger = get_logger(__name__)
+
+NOTE_OUTPUT_DIR = os.getenv("NOTE_OUTPUT_DIR", "note_results")
+# 结果压缩算法：gzip（默认）/ zstd（需另行安装 zstandard，未安装时自动退回 gzip）/ none
+RESULT_COMPRESSION = os.getenv("RESULT_COMPRESSION", "gzip").lower()
+# 是否完整保留下载器返回的 raw_info（Bilibili 为整个 yt-dlp info 字典，体积很大）
+RESULT_KEEP_RAW_INFO = os.getenv("RESULT_KEEP_RAW_INFO", "false").lower() == "true"
+# 转写分段按块存储，每块的分段数；按时间范围读取时只解压命中的块
+RESULT_SEGMENT_BLOCK = int(os.getenv("RESULT_SEGMENT_BLOCK", "256"))
+
+# 不保留完整 raw_info 时留下的字段（总结时会用到 tags）
+RAW_INFO_KEEP_KEYS = ("id", "title", "tags", "uploader", "upload_date", "webpage_url", "duration")
+
+FORMAT_VERSION = 1
+RESULT_DIR_SUFFIX = ".note"
+META_FILE = "meta.json"
+
+_Codec = Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]
+
+
+def _codecs() -> Dict[str, _Codec]:
+    codecs: Dict[str, _Codec] = {
+        "gzip": (".gz", lambda b: gzip.compress(b, compresslevel=6), gzip.decompress),
+        "none": ("", lambda b: b, lambda b: b),
+    }
+    if zstandard is not None:
+        codecs["zstd"] = (
+            ".zst",
+            lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+            lambda b: zstandard.ZstdDecompressor().decompress(b),
+        )
+    return codecs
+
+
+CODECS = _codecs()
+
+
+def compact_raw_info(raw_info: Optional[dict]) -> dict:
+    """
+    按 RESULT_KEEP_RAW_INFO 裁剪 raw_info，默认只保留 RAW_INFO_KEEP_KEYS 中的字段
+    """
+    if not raw_info:
+        return {}
+    if RESULT_KEEP_RAW_INFO:
+        return raw_info
+    return {k: raw_info[k] for k in RAW_INFO_KEEP_KEYS if k in raw_info}
+
+
+def dump_transcript(transcript: TranscriptResult) -> bytes:
+    """
+    以列式结构序列化转写结果：start / end 两个浮点数组 + text 数组，不含 raw
+    """
+    segments = transcript.segments or []
+    return orjson.dumps({
+        "language": transcript.language,
+        "full_text": transcript.full_text,
+        "start": [s.start for s in segments],
+        "end": [s.end for s in segments],
+        "text": [s.text for s in segments],
+    })
+
+
+def load_transcript(data: bytes) -> TranscriptResult:
+    """
+    反序列化 dump_transcript 的输出，同时兼容旧版按行存储的 segments 列表
+    """
+    obj = orjson.loads(data)
+    if "segments" in obj:
+        segments = [TranscriptSegment(**seg) for seg in obj["segments"]]
+    else:
+        segments = [TranscriptSegment(start=s, end=e, text=t)
+                    for s, e, t in zip(obj["start"], obj["end"], obj["text"])]
+    return TranscriptResult(language=obj.get("language"), full_text=obj["full_text"], segments=segments)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[dict]:
+    """
+    解析字段选择参数，如 "markdown,audio_meta.title" -> {"markdown": None, "audio_meta": {"title": None}}；
+    值为 None 表示取整个字段。参数为空时返回 None（取全部）
+    """
+    if not fields:
+        return None
+    tree: dict = {}
+    for path in fields.split(","):
+        keys = [k for k in path.strip().split(".") if k]
+        node = tree
+        for i, key in enumerate(keys):
+            if i == len(keys) - 1:
+                node[key] = None
+            elif key in node and node[key] is None:
+                break  # 已选择整个父字段
+            else:
+                node = node.setdefault(key, {})
+    return tree or None
+
+
+def project(value: Any, tree: Optional[dict]) -> Any:
+    """
+    按 parse_fields 的结果裁剪数据；列表逐个元素裁剪，不存在的字段直接省略
+    """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(v, tree) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {k: project(value[k], sub) for k, sub in tree.items() if k in value}
+
+
+def _overlaps(seg_start: float, seg_end: float, start: Optional[float], end: Optional[float]) -> bool:
+    return (start is None or seg_end > start) and (end is None or seg_start < end)
+
+
+class ResultStore:
+    """
+    笔记结果的紧凑存储。每个任务一个目录 {task_id}.note/：
+
+    - meta.json：audio_meta（raw_info 已裁剪）、语言、各部分文件名及分段块索引（每块的起止时间）
+    - markdown / full_text：单独压缩，可只读取 Markdown
+    - segments-N：转写分段按 RESULT_SEGMENT_BLOCK 切块，列式存储后压缩；按时间范围读取时只解压命中的块
+    - variant-N：多变体生成时每个变体的 Markdown
+
+    写入先落到临时目录再整体替换，读取时兼容旧版 {task_id}.json。
+    """
+
+    def __init__(self, base_dir: str = NOTE_OUTPUT_DIR, compression: str = RESULT_COMPRESSION,
+                 block_size: int = RESULT_SEGMENT_BLOCK):
+        self.base_dir = Path(base_dir)
+        if compression not in CODECS:
+            logger.warning(f"Compression '{compression}' unavailable, falling back to gzip")
+            compression = "gzip"
+        self.compression = compression
+        self.block_size = max(1, block_size)
+
+    def path_for(self, task_id: str) -> Path:
+        return self.base_dir / f"{task_id}{RESULT_DIR_SUFFIX}"
+
+    def legacy_path_for(self, task_id: str) -> Path:
+        return self.base_dir / f"{task_id}.json"
+
+    def exists(self, task_id: str) -> bool:
+        return (self.path_for(task_id) / META_FILE).exists() or self.legacy_path_for(task_id).exists()
+
+    def save(self, task_id: str, note: NoteResult) -> Path:
+        """
+        写入笔记结果，返回结果目录
+        """
+        ext, compress, _ = CODECS[self.compression]
+        audio_meta = asdict(note.audio_meta)
+        audio_meta["raw_info"] = compact_raw_info(audio_meta.get("raw_info"))
+
+        parts: Dict[str, bytes] = {f"markdown{ext}": compress((note.markdown or "").encode("utf-8"))}
+        transcript_meta = None
+        if note.transcript is not None:
+            segments = note.transcript.segments or []
+            parts[f"full_text{ext}"] = compress((note.transcript.full_text or "").encode("utf-8"))
+            blocks = []
+            for i in range(0, len(segments), self.block_size):
+                chunk = segments[i:i + self.block_size]
+                name = f"segments-{len(blocks)}{ext}"
+                parts[name] = compress(orjson.dumps({
+                    "start": [s.start for s in chunk],
+                    "end": [s.end for s in chunk],
+                    "text": [s.text for s in chunk],
+                }))
+                blocks.append({
+                    "file": name,
+                    "count": len(chunk),
+                    "start": min(s.start for s in chunk),
+                    "end": max(s.end for s in chunk),
+                })
+            transcript_meta = {
+                "language": note.transcript.language,
+                "full_text": f"full_text{ext}",
+                "segment_count": len(segments),
+                "blocks": blocks,
+            }
+
+        variants_meta = None
+        if note.variants:
+            variants_meta = []
+            for i, variant in enumerate(note.variants):
+                name = None
+                if variant.get("markdown") is not None:
+                    name = f"variant-{i}{ext}"
+                    parts[name] = compress(variant["markdown"].encode("utf-8"))
+                variants_meta.append({**variant, "markdown": name})
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "codec": self.compression,
+            "markdown": f"markdown{ext}",
+            "audio_meta": audio_meta,
+            "transcript": transcript_meta,
+        }
+        if variants_meta is not None:
+            meta["variants"] = variants_meta
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        target = self.path_for(task_id)
+        tmp = self.base_dir / f".{task_id}.{uuid.uuid4().hex}.tmp"
+        tmp.mkdir()
+        try:
+            for name, data in parts.items():
+                (tmp / name).write_bytes(data)
+            (tmp / META_FILE).write_bytes(orjson.dumps(meta))
+            self._replace_dir(tmp, target)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        legacy = self.legacy_path_for(task_id)
+        if legacy.exists():
+            legacy.unlink()
+        logger.info(f"Saved note result {task_id} ({sum(len(d) for d in parts.values())} bytes, {self.compression})")
+        return target
+
+    def load(self, task_id: str) -> Optional[dict]:
+        """
+        读取完整结果，结构与 asdict(NoteResult) 一致；不存在时返回 None
+        """
+        meta = self._read_meta(task_id)
+        if meta is None:
+            return self._read_legacy(task_id)
+        transcript = None
+        if meta.get("transcript") is not None:
+            transcript = {
+                "language": meta["transcript"]["language"],
+                "full_text": self._read_text(task_id, meta, meta["transcript"]["full_text"]),
+                "segments": self._read_segments(task_id, meta),
+                "raw": None,
+            }
+        result = {
+            "markdown": self._read_text(task_id, meta, meta["markdown"]),
+            "transcript": transcript,
+            "audio_meta": meta["audio_meta"],
+        }
+        if "variants" in meta:
+            result["variants"] = self._read_variants(task_id, meta)
+        return result
+
+    def load_fields(self, task_id: str, fields: Optional[dict] = None) -> Optional[dict]:
+        """
+        只读取选中的字段：未选中 transcript 时不解压转写分段，只选 audio_meta 时只读 meta.json
+
+        :param fields: parse_fields 的结果，None 表示全部
+        """
+        if fields is None:
+            return self.load(task_id)
+        meta = self._read_meta(task_id)
+        if meta is None:
+            return project(self._read_legacy(task_id), fields)
+
+        result = {}
+        if "markdown" in fields:
+            result["markdown"] = self._read_text(task_id, meta, meta["markdown"])
+        if "audio_meta" in fields:
+            result["audio_meta"] = project(meta["audio_meta"], fields["audio_meta"])
+        if "transcript" in fields:
+            tmeta, sub = meta.get("transcript"), fields["transcript"]
+            if tmeta is None:
+                result["transcript"] = None
+            else:
+                getters = {
+                    "language": lambda: tmeta["language"],
+                    "full_text": lambda: self._read_text(task_id, meta, tmeta["full_text"]),
+                    "segments": lambda: self._read_segments(task_id, meta),
+                    "raw": lambda: None,
+                }
+                keys = getters.keys() if sub is None else [k for k in sub if k in getters]
+                result["transcript"] = {k: project(getters[k](), sub and sub[k]) for k in keys}
+        if "variants" in fields and "variants" in meta:
+            sub = fields["variants"]
+            # 未选择 markdown 时只读 meta.json 中的风格、格式与错误信息
+            read_markdown = sub is None or "markdown" in sub
+            result["variants"] = project(self._read_variants(task_id, meta, read_markdown), sub)
+        return result
+
+    def version_tag(self, task_id: str) -> Optional[str]:
+        """
+        结果的版本标识（基于 meta.json / 旧版文件的 mtime 与大小），不读取文件内容；结果不存在时返回 None
+        """
+        for path in (self.path_for(task_id) / META_FILE, self.legacy_path_for(task_id)):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+        return None
+
+    def load_markdown(self, task_id: str) -> Optional[str]:
+        meta = self._read_meta(task_id)
+        if meta is None:
+            legacy = self._read_legacy(task_id)
+            return legacy.get("markdown") if legacy else None
+        return self._read_text(task_id, meta, meta["markdown"])
+
+    def load_audio_meta(self, task_id: str) -> Optional[dict]:
+        meta = self._read_meta(task_id)
+        if meta is None:
+            legacy = self._read_legacy(task_id)
+            return legacy.get("audio_meta") if legacy else None
+        return meta["audio_meta"]
+
+    def load_segments(self, task_id: str, start: Optional[float] = None,
+                      end: Optional[float] = None) -> Optional[List[dict]]:
+        """
+        读取与 [start, end) 时间范围有交集的转写分段，只解压命中的块
+
+        :param start: 起始秒数，None 表示不限
+        :param end: 结束秒数，None 表示不限
+        """
+        meta = self._read_meta(task_id)
+        if meta is None:
+            legacy = self._read_legacy(task_id)
+            if legacy is None:
+                return None
+            segments = (legacy.get("transcript") or {}).get("segments") or []
+            return [s for s in segments if _overlaps(s["start"], s["end"], start, end)]
+        return self._read_segments(task_id, meta, start, end)
+
+    def delete(self, task_id: str) -> None:
+        shutil.rmtree(self.path_for(task_id), ignore_errors=True)
+        legacy = self.legacy_path_for(task_id)
+        if legacy.exists():
+            legacy.unlink()
+
+    # ---------------- 私有方法 ----------------
+
+    def _read_meta(self, task_id: str) -> Optional[dict]:
+        path = self.path_for(task_id) / META_FILE
+        if not path.exists():
+            return None
+        return orjson.loads(path.read_bytes())
+
+    def _read_legacy(self, task_id: str) -> Optional[dict]:
+        path = self.legacy_path_for(task_id)
+        if not path.exists():
+            return None
+        return orjson.loads(path.read_bytes())
+
+    def _read_part(self, task_id: str, meta: dict, name: str) -> bytes:
+        _, _, decompress = CODECS[meta["codec"]]
+        return decompress((self.path_for(task_id) / name).read_bytes())
+
+    def _read_text(self, task_id: str, meta: dict, name: str) -> str:
+        return self._read_part(task_id, meta, name).decode("utf-8")
+
+    def _read_segments(self, task_id: str, meta: dict, start: Optional[float] = None,
+                       end: Optional[float] = None) -> List[dict]:
+        segments = []
+        for block in (meta.get("transcript") or {}).get("blocks", []):
+            if not _overlaps(block["start"], block["end"], start, end):
+                continue
+            cols = orjson.loads(self._read_part(task_id, meta, block["file"]))
+            for s, e, t in zip(cols["start"], cols["end"], cols["text"]):
+                if _overlaps(s, e, start, end):
+                    segments.append({"start": s, "end": e, "text": t})
+        return segments
+
+    def _read_variants(self, task_id: str, meta: dict, read_markdown: bool = True) -> List[dict]:
+        variants = []
+        for variant in meta["variants"]:
+            name = variant.get("markdown")
+            text = self._read_text(task_id, meta, name) if name and read_markdown else None
+            variants.append({**variant, "markdown": text})
+        return variants
+
+    @staticmethod
+    def _replace_dir(src: Path, target: Path) -> None:
+        if not target.exists():
+            os.replace(src, target)
+            return
+        # 目录不能直接覆盖非空目录：先把旧目录挪开，换入新目录后再删除
+        old = target.with_name(f".{target.name}.{uuid.uuid4().hex}.old")
+        os.replace(target, old)
+        os.replace(src, target)
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# 全局共享实例
+result_store = ResultStore()
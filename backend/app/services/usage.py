@@ -0,0 +1,103 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from app.db.llm_usage_dao import aggregate_llm_usage, insert_llm_usage, list_task_usage
+from app.gpt.base import GPT
+from app.gpt.prompt_cache import PromptUsage
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 模型单价（每百万 token），按模型名前缀匹配，JSON：{"gpt-4o": {"prompt": 2.5, "completion": 10, "cached": 1.25}}
+LLM_PRICES = os.getenv("LLM_PRICES", "")
+
+
+def _load_prices(raw: str) -> Dict[str, dict]:
+    if not raw:
+        return {}
+    try:
+        return {str(k).lower(): dict(v) for k, v in json.loads(raw).items()}
+    except Exception as e:
+        logger.warning(f"Invalid LLM_PRICES, ignored: {e}")
+        return {}
+
+
+_PRICES = _load_prices(LLM_PRICES)
+
+
+def estimate_cost(model: Optional[str], usage: PromptUsage, prices: Optional[Dict[str, dict]] = None) -> Optional[float]:
+    """
+    按模型单价估算一次调用的费用；缓存命中的输入 token 使用 cached 单价（未配置时按 prompt 计）
+
+    :return: 费用，模型未配置价格时为 None
+    """
+    prices = _PRICES if prices is None else prices
+    name = (model or "").strip().lower().rsplit("/", 1)[-1]
+    matches = [prefix for prefix in prices if name.startswith(prefix)]
+    if not matches:
+        return None
+    price = prices[max(matches, key=len)]
+    prompt_price = float(price.get("prompt", 0))
+    cached_price = float(price.get("cached", prompt_price))
+    completion_price = float(price.get("completion", 0))
+    return (
+        usage.uncached_tokens * prompt_price
+        + usage.cached_tokens * cached_price
+        + usage.completion_tokens * completion_price
+    ) / 1_000_000
+
+
+class UsageService:
+
+    @staticmethod
+    def record(task_id: str, gpt: GPT, style: Optional[str] = None) -> None:
+        """
+        记录一次 summarize 的用量；命中本地响应缓存时也记一条（token 为 0），便于统计缓存效果。
+        记录失败只打日志，不影响笔记生成
+        """
+        usage: Optional[PromptUsage] = getattr(gpt, "last_usage", None)
+        cache_hit = bool(getattr(gpt, "cache_hit", False))
+        if usage is None and not cache_hit:
+            return
+        usage = usage or PromptUsage()
+        model = getattr(gpt, "model", None)
+        latency = getattr(gpt, "last_latency", None)
+        try:
+            insert_llm_usage(
+                task_id=task_id,
+                provider_id=getattr(gpt, "provider_id", None),
+                model=model,
+                style=style,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                cached_tokens=usage.cached_tokens,
+                latency_ms=latency * 1000 if latency is not None else None,
+                cache_hit=cache_hit,
+                cost=0.0 if cache_hit else estimate_cost(model, usage),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record llm usage for task {task_id}: {e}")
+
+    @staticmethod
+    def get_task_usage(task_id: str) -> dict:
+        calls = list_task_usage(task_id)
+        costs = [c["cost"] for c in calls if c["cost"] is not None]
+        return {
+            "calls": calls,
+            "total": {
+                "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+                "completion_tokens": sum(c["completion_tokens"] for c in calls),
+                "cached_tokens": sum(c["cached_tokens"] for c in calls),
+                "cost": sum(costs) if costs else None,
+            },
+        }
+
+    @staticmethod
+    def get_summary(group_by: Sequence[str], created_from: Optional[datetime] = None,
+                    created_to: Optional[datetime] = None) -> List[dict]:
+        return aggregate_llm_usage(group_by=group_by, created_from=created_from, created_to=created_to)
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
+from typing import Tuple
 
 from app.models.transcriber_model import TranscriptResult
 
 
 class Transcriber(ABC):
+    # 可直接读取的音频封装格式（扩展名），下载器命中其中之一时跳过 mp3 转码；为空表示只接受 mp3
+    native_audio_formats: Tuple[str, ...] = ()
+
     @abstractmethod
     def transcript(self,file_path:str)->TranscriptResult:
         '''
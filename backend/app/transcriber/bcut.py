@@ -166,7 +166,7 @@ class BcutTranscriber(Transcriber):
             
         return resp["data"]
 
-    @timeit
+    @timeit("transcription")
     def transcript(self, file_path: str) -> TranscriptResult:
         """执行识别过程，符合 Transcriber 接口"""
         try:
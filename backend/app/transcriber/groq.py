@@ -19,9 +19,10 @@ def compress_audio(input_path: str, target_bitrate='64k') -> str:
     return output_path
 
 class GroqTranscriber(Transcriber, ABC):
+    # Groq 接口支持的上传格式
+    native_audio_formats = ("m4a", "webm", "mp3")
 
-
-    @timeit
+    @timeit("transcription")
     def transcript(self, file_path: str) -> TranscriptResult:
         file_size = os.path.getsize(file_path)
         if file_size > MAX_SIZE_BYTES:
@@ -60,7 +60,7 @@ class KuaishouTranscriber(Transcriber):
             logger.error(error_msg)
             raise
 
-    @timeit
+    @timeit("transcription")
     def transcript(self, file_path: str) -> TranscriptResult:
         """执行转录过程，符合 Transcriber 接口"""
         try:
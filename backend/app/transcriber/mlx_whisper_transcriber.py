@@ -14,6 +14,9 @@ from events import transcription_finished
 logger = get_logger(__name__)
 
 class MLXWhisperTranscriber(Transcriber):
+    # mlx_whisper 通过 ffmpeg 解码，可直接读取原始音频流
+    native_audio_formats = ("m4a", "webm", "opus", "aac", "mp3")
+
     def __init__(
             self,
             model_size: str = "base"
@@ -45,7 +48,7 @@ class MLXWhisperTranscriber(Transcriber):
         
         logger.info(f"初始化 MLX Whisper 转录器，模型：{self.model_name}")
 
-    @timeit
+    @timeit("transcription")
     def transcript(self, file_path: str) -> TranscriptResult:
         try:
             # 使用 MLX Whisper 进行转录
@@ -31,6 +31,9 @@ MODEL_MAP={
 }
 
 class WhisperTranscriber(Transcriber):
+    # faster-whisper 通过 PyAV 解码，可直接读取原始音频流
+    native_audio_formats = ("m4a", "webm", "opus", "aac", "mp3")
+
     # TODO:修改为可配置
     def __init__(
             self,
@@ -90,7 +93,7 @@ class WhisperTranscriber(Transcriber):
         except ImportError:
             return False
 
-    @timeit
+    @timeit("transcription")
     def transcript(self, file_path: str) -> TranscriptResult:
         try:
 
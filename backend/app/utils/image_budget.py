@@ -0,0 +1,78 @@
+import json
+import os
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 发送给多模态模型的网格图最长边（像素），0 表示保持原尺寸
+VIDEO_IMAGE_MAX_EDGE = int(os.getenv("VIDEO_IMAGE_MAX_EDGE", "2048"))
+# 网格图编码格式（webp / jpeg）与质量
+VIDEO_IMAGE_FORMAT = os.getenv("VIDEO_IMAGE_FORMAT", "webp").lower()
+VIDEO_IMAGE_QUALITY = int(os.getenv("VIDEO_IMAGE_QUALITY", "75"))
+# 每次请求最多附带的网格图数量，0 表示不限制
+VIDEO_IMAGE_MAX_COUNT = int(os.getenv("VIDEO_IMAGE_MAX_COUNT", "8"))
+# 按供应商覆盖，JSON：{"<provider_id>": {"max_edge": 1536, "format": "jpeg", "quality": 70, "max_images": 4}}
+VIDEO_IMAGE_BUDGETS = os.getenv("VIDEO_IMAGE_BUDGETS", "")
+
+IMAGE_FORMATS = {
+    # 格式名: (PIL 格式, 扩展名, MIME)
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+
+
+@dataclass(frozen=True)
+class ImageBudget:
+    max_edge: int = VIDEO_IMAGE_MAX_EDGE
+    format: str = VIDEO_IMAGE_FORMAT
+    quality: int = VIDEO_IMAGE_QUALITY
+    max_images: int = VIDEO_IMAGE_MAX_COUNT
+
+    @property
+    def pil_format(self) -> str:
+        return IMAGE_FORMATS.get(self.format, IMAGE_FORMATS["jpeg"])[0]
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_FORMATS.get(self.format, IMAGE_FORMATS["jpeg"])[1]
+
+    @property
+    def mime(self) -> str:
+        return IMAGE_FORMATS.get(self.format, IMAGE_FORMATS["jpeg"])[2]
+
+
+@dataclass
+class ImagePayloadReport:
+    images: int = 0           # 实际发送的图片数
+    skipped: int = 0          # 超出数量上限被丢弃的网格数
+    width: int = 0            # 单张网格图尺寸
+    height: int = 0
+    payload_bytes: int = 0    # data URI 总字节数，即请求体中图片部分的大小
+
+
+def _load_overrides(raw: str) -> Dict[str, dict]:
+    if not raw:
+        return {}
+    try:
+        return {str(k): dict(v) for k, v in json.loads(raw).items()}
+    except Exception as e:
+        logger.warning(f"Invalid VIDEO_IMAGE_BUDGETS, ignored: {e}")
+        return {}
+
+
+_OVERRIDES = _load_overrides(VIDEO_IMAGE_BUDGETS)
+
+
+def image_budget_for(provider_id: Optional[str]) -> ImageBudget:
+    """
+    获取供应商的图片预算，未单独配置的字段使用全局默认值
+    """
+    override = _OVERRIDES.get(str(provider_id), {})
+    fields = {k: override[k] for k in ("max_edge", "format", "quality", "max_images") if k in override}
+    return replace(ImageBudget(), **fields)
@@ -0,0 +1,123 @@
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from app.utils.logger import get_logger
+from app.utils.trace import current_trace
+
+logger = get_logger(__name__)
+
+# 笔记流水线各阶段：download / video_download / audio_extract / frame_extract / transcription / llm /
+# post_process / save
+STAGE_SECONDS = Histogram(
+    "bilinote_stage_duration_seconds",
+    "Duration of note pipeline stages",
+    ["stage", "platform"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+STAGE_ACTIVE = Gauge("bilinote_stage_active", "Tasks currently running a pipeline stage", ["stage"])
+STAGE_ERRORS = Counter("bilinote_stage_errors_total", "Pipeline stage failures", ["stage", "platform"])
+TASKS_TOTAL = Counter("bilinote_tasks_total", "Finished note tasks", ["platform", "status"])
+CACHE_REQUESTS = Counter("bilinote_cache_requests_total", "Cache lookups", ["cache", "result"])
+QUEUE_DEPTH = Gauge("bilinote_queue_depth", "Pending jobs in worker pools", ["queue"])
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# 作为指标标签的平台，与 app.services.constant.SUPPORT_PLATFORM_MAP 的键保持一致；
+# platform 来自请求体，其他取值一律记为 other，避免标签基数无限增长
+METRIC_PLATFORMS = frozenset({"youtube", "bilibili", "tiktok", "kuaishou", "douyin", "local"})
+
+# 当前任务的平台，未显式传 platform 的计时（如转写器上的 @timeit）从这里取标签
+current_platform: ContextVar[Optional[str]] = ContextVar("current_platform", default=None)
+
+
+def platform_label(platform: Optional[str]) -> str:
+    if not platform:
+        return "unknown"
+    return platform if platform in METRIC_PLATFORMS else "other"
+
+
+class stage_timer(ContextDecorator):
+    """
+    记录一个阶段的耗时：进入时活跃数 +1，退出时写入直方图，抛出异常时计入错误数；
+    存在当前任务时间线（current_trace）时同时追加一个 span，属性可在阶段内通过 set() 补充。
+    既可作上下文管理器，也可作装饰器：
+
+        with stage_timer("transcription", platform="bilibili"):
+            ...
+
+        @stage_timer("transcription")
+        def transcript(...): ...
+    """
+
+    def __init__(self, stage: str, platform: Optional[str] = None):
+        self.stage = stage
+        self._platform = platform
+        self.platform = platform_label(platform)
+        self.elapsed: Optional[float] = None
+        self.attrs: dict = {}
+        self._started = 0.0
+
+    def set(self, **attrs) -> "stage_timer":
+        """
+        补充写入时间线的属性，如 bytes / cache / backend / retries
+        """
+        self.attrs.update(attrs)
+        return self
+
+    def _recreate_cm(self):
+        # 作装饰器时每次调用使用独立实例，并发调用互不干扰
+        return type(self)(self.stage, self._platform)
+
+    def __enter__(self):
+        self.platform = platform_label(self._platform or current_platform.get())
+        STAGE_ACTIVE.labels(self.stage).inc()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = time.perf_counter()
+        self.elapsed = ended - self._started
+        STAGE_ACTIVE.labels(self.stage).dec()
+        STAGE_SECONDS.labels(self.stage, self.platform).observe(self.elapsed)
+        if exc_type is not None:
+            STAGE_ERRORS.labels(self.stage, self.platform).inc()
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add_span(self.stage, self._started, ended,
+                           error=f"{exc_type.__name__}: {exc}" if exc_type is not None else None, **self.attrs)
+        logger.debug(f"Stage {self.stage} ({self.platform}) took {self.elapsed:.3f}s")
+        return False
+
+
+def observe_stage(stage: str, seconds: float, platform: Optional[str] = None, **attrs) -> None:
+    """
+    记录由其他组件自行测得的阶段耗时（如下载器回报的音频抽取时间），时间线上按刚刚结束处理
+    """
+    STAGE_SECONDS.labels(stage, platform_label(platform)).observe(seconds)
+    trace = current_trace.get()
+    if trace is not None:
+        ended = time.perf_counter()
+        trace.add_span(stage, ended - seconds, ended, **attrs)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_task(platform: Optional[str], status: str) -> None:
+    TASKS_TOTAL.labels(platform_label(platform), status).inc()
+
+
+def register_queue(name: str, depth: Callable[[], float]) -> None:
+    """
+    注册一个队列深度来源，抓取 /metrics 时实时读取
+    """
+    QUEUE_DEPTH.labels(name).set_function(depth)
+
+
+def render_metrics() -> bytes:
+    return generate_latest()
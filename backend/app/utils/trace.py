@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+import orjson
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+NOTE_OUTPUT_DIR = os.getenv("NOTE_OUTPUT_DIR", "note_results")
+
+
+class TaskTrace:
+    """
+    单个任务的阶段时间线：每个 span 记录阶段名、相对任务开始的起止时间（秒）、所在线程，
+    以及字节数、缓存命中、使用的后端、重试次数等属性。视频线程与总结线程会并发写入，追加时加锁。
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._spans: List[dict] = []
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def offset(self, perf_time: float) -> float:
+        return round(perf_time - self._origin, 4)
+
+    def add_span(self, name: str, start: float, end: float, error: Optional[str] = None, **attrs) -> dict:
+        """
+        :param start: time.perf_counter() 取得的开始时间
+        :param end: time.perf_counter() 取得的结束时间
+        """
+        span = {
+            "name": name,
+            "start": self.offset(start),
+            "end": self.offset(end),
+            "duration": round(end - start, 4),
+            "thread": threading.current_thread().name,
+        }
+        span.update({k: v for k, v in attrs.items() if v is not None})
+        if error:
+            span["error"] = error
+        with self._lock:
+            self._spans.append(span)
+        return span
+
+    def event(self, name: str, **attrs) -> dict:
+        """
+        记录零耗时的 span，如命中缓存而跳过的阶段
+        """
+        now = time.perf_counter()
+        return self.add_span(name, now, now, **attrs)
+
+    def annotate(self, name: str, **attrs) -> None:
+        """
+        给最近一个同名 span 补充属性，用于计时发生在下层组件（如转写器上的 @timeit）时由调用方补充后端等信息
+        """
+        with self._lock:
+            for span in reversed(self._spans):
+                if span["name"] == name:
+                    span.update({k: v for k, v in attrs.items() if v is not None})
+                    return
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            # 同时开始时外层 span（耗时更长）排在前面
+            spans = sorted(self._spans, key=lambda s: (s["start"], -s["duration"]))
+        return {
+            "task_id": self.task_id,
+            "started_at": self.started_at,
+            "duration": self.offset(time.perf_counter()),
+            "spans": spans,
+        }
+
+    def save(self, base_dir: str = NOTE_OUTPUT_DIR) -> None:
+        """
+        原子写入 {task_id}.trace.json；写入失败只打日志，不影响任务本身
+        """
+        path = Path(base_dir) / f"{self.task_id}.trace.json"
+        try:
+            with self._save_lock:
+                tmp = path.with_name(path.name + ".tmp")
+                tmp.write_bytes(orjson.dumps(self.to_dict()))
+                tmp.replace(path)
+        except Exception as e:
+            logger.warning(f"Failed to write trace for task {self.task_id}: {e}")
+
+
+# 当前任务的时间线；stage_timer 退出时写入，后台线程需通过 contextvars.copy_context() 继承
+current_trace: ContextVar[Optional[TaskTrace]] = ContextVar("current_trace", default=None)
+
+
+def trace_event(name: str, **attrs) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.event(name, **attrs)
+
+
+def trace_annotate(name: str, **attrs) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.annotate(name, **attrs)
+
+
+def load_trace(task_id: str, base_dir: str = NOTE_OUTPUT_DIR) -> Optional[dict]:
+    path = Path(base_dir) / f"{task_id}.trace.json"
+    if not path.exists():
+        return None
+    return orjson.loads(path.read_bytes())
@@ -12,9 +12,21 @@ BACKEND_PORT= os.getenv("BACKEND_PORT", 8483)
 BACKEND_BASE_URL = f"{api_path}:{BACKEND_PORT}"
 
 from typing import Optional
-def generate_screenshot(video_path: str, output_dir: str, timestamp: int, index: int) -> str:
+
+
+def format_http_headers(http_headers: Optional[dict]) -> str:
+    """
+    将请求头字典转换为 ffmpeg/ffprobe -headers 参数需要的 CRLF 分隔字符串
+    """
+    return "".join(f"{k}: {v}\r\n" for k, v in (http_headers or {}).items())
+
+
+def generate_screenshot(video_path: str, output_dir: str, timestamp: int, index: int,
+                        http_headers: Optional[dict] = None) -> str:
     """
     使用 ffmpeg 生成截图，返回生成图片路径
+
+    video_path 为远程视频流直链时，需要通过 http_headers 传入 Referer 等请求头
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -22,9 +34,14 @@ def generate_screenshot(video_path: str, output_dir: str, timestamp: int, index:
     filename = f"screenshot_{index:03}_{uuid.uuid4()}.jpg"
     output_path = output_dir / filename
 
+    header_args = []
+    if http_headers:
+        header_args = ["-headers", format_http_headers(http_headers)]
+
     command = [
         "ffmpeg",
         "-ss", str(timestamp),
+        *header_args,
         "-i", str(video_path),
         "-frames:v", "1",
         "-q:v", "2",
@@ -3,10 +3,14 @@ import os
 import re
 import subprocess
 import ffmpeg
+from typing import Optional
+
 from PIL import Image, ImageDraw, ImageFont
 
+from app.utils.image_budget import ImageBudget, ImagePayloadReport
 from app.utils.logger import get_logger
 from app.utils.path_helper import get_app_dir
+from app.utils.video_helper import format_http_headers
 
 logger = get_logger(__name__)
 class VideoReader:
@@ -19,8 +23,14 @@ class VideoReader:
                  save_quality=90,
                  font_path="fonts/arial.ttf",
                  frame_dir=None,
-                 grid_dir=None):
+                 grid_dir=None,
+                 http_headers=None,
+                 duration=None,
+                 budget: Optional[ImageBudget] = None):
+        # video_path 既可以是本地文件，也可以是远程视频流直链（配合 http_headers 使用）
         self.video_path = video_path
+        self.http_headers = http_headers or {}
+        self.duration = duration
         self.grid_size = grid_size
         self.frame_interval = frame_interval
         self.unit_width = unit_width
@@ -30,6 +40,9 @@ class VideoReader:
         self.grid_dir = grid_dir or get_app_dir("grid_output")
         print(f"视频路径：{video_path}",self.frame_dir,self.grid_dir)
         self.font_path = font_path
+        # 图片预算：限制网格图尺寸、编码格式与数量，None 时保持原始 JPEG 输出
+        self.budget = budget
+        self.payload_report = ImagePayloadReport()
 
     def format_time(self, seconds: float) -> str:
         mm = int(seconds // 60)
@@ -43,19 +56,60 @@ class VideoReader:
             return mm * 60 + ss
         return float('inf')
 
-    def extract_frames(self, max_frames=1000) -> list[str]:
-
+    def input_args(self) -> list[str]:
+        """
+        构造 ffmpeg 输入参数。-ss 放在 -i 之前，远程流时 ffmpeg 会按时间点发起 HTTP Range 请求，
+        只拉取目标关键帧附近的数据，而不是顺序读取整个文件。
+        """
+        args = []
+        if self.http_headers:
+            args += ["-headers", format_http_headers(self.http_headers)]
+        return args + ["-i", self.video_path]
+
+    def build_frame_cmd(self, ts: int, output_path: str) -> list[str]:
+        return ["ffmpeg", "-ss", str(ts), *self.input_args(), "-frames:v", "1", "-q:v", "2", "-y", output_path,
+                "-hide_banner", "-loglevel", "error"]
+
+    def probe_duration(self) -> float:
+        if self.duration:
+            return float(self.duration)
+        probe_kwargs = {}
+        if self.http_headers:
+            probe_kwargs["headers"] = format_http_headers(self.http_headers)
+        return float(ffmpeg.probe(self.video_path, **probe_kwargs)["format"]["duration"])
+
+    def frame_timestamps(self, max_frames=1000) -> list[int]:
+        duration = self.probe_duration()
+        return [i for i in range(0, int(duration), self.frame_interval)][:max_frames]
+
+    def plan_groups(self, max_frames=1000) -> tuple[list[list[int]], int]:
+        """
+        抽帧前先按时间点分组并按预算选组，只有被选中的网格才需要抽帧（远程流时也少发 Range 请求）
+
+        :return: (选中的各组时间点, 完整网格总数)；不足一组的尾部时间点直接丢弃
+        """
+        group_size = self.grid_size[0] * self.grid_size[1]
+        timestamps = self.frame_timestamps(max_frames)
+        groups = [timestamps[i:i + group_size] for i in range(0, len(timestamps), group_size)]
+        if groups and len(groups[-1]) < group_size:
+            logger.warning(f"⚠️ 跳过第 {len(groups)} 组，图片不足 {group_size} 张")
+            groups.pop()
+        return self.select_groups(groups), len(groups)
+
+    def extract_frames(self, max_frames=1000, timestamps: Optional[list[int]] = None) -> list[str]:
+        """
+        :param timestamps: 只抽取这些时间点（秒），None 时按 frame_interval 抽取整段视频
+        """
         try:
             os.makedirs(self.frame_dir, exist_ok=True)
-            duration = float(ffmpeg.probe(self.video_path)["format"]["duration"])
-            timestamps = [i for i in range(0, int(duration), self.frame_interval)][:max_frames]
+            if timestamps is None:
+                timestamps = self.frame_timestamps(max_frames)
 
             image_paths = []
             for ts in timestamps:
                 time_label = self.format_time(ts)
                 output_path = os.path.join(self.frame_dir, f"frame_{time_label}.jpg")
-                cmd = ["ffmpeg", "-ss", str(ts), "-i", self.video_path, "-frames:v", "1", "-q:v", "2", "-y", output_path,
-                       "-hide_banner", "-loglevel", "error"]
+                cmd = self.build_frame_cmd(ts, output_path)
                 subprocess.run(cmd, check=True)
                 image_paths.append(output_path)
             return image_paths
@@ -70,13 +124,35 @@ class VideoReader:
         group_size = self.grid_size[0] * self.grid_size[1]
         return [image_files[i:i + group_size] for i in range(0, len(image_files), group_size)]
 
+    def grid_unit_size(self) -> tuple[int, int]:
+        """
+        按预算的最长边等比缩小单元格，直接把帧缩放到最终尺寸，省去拼好后再缩放整张网格
+        """
+        cols, rows = self.grid_size
+        if not self.budget or self.budget.max_edge <= 0:
+            return self.unit_width, self.unit_height
+        scale = min(1.0, self.budget.max_edge / max(self.unit_width * cols, self.unit_height * rows))
+        return max(1, int(self.unit_width * scale)), max(1, int(self.unit_height * scale))
+
+    def select_groups(self, groups: list[list[str]]) -> list[list[str]]:
+        """
+        网格数超过预算上限时，沿时间轴均匀抽取，保证覆盖整段视频
+        """
+        limit = self.budget.max_images if self.budget else 0
+        if limit <= 0 or len(groups) <= limit:
+            return groups
+        step = len(groups) / limit
+        return [groups[int(i * step)] for i in range(limit)]
+
     def concat_images(self, image_paths: list[str], name: str) -> str:
         os.makedirs(self.grid_dir, exist_ok=True)
-        font = ImageFont.truetype(self.font_path, 48) if os.path.exists(self.font_path) else ImageFont.load_default()
+        unit_width, unit_height = self.grid_unit_size()
+        font_size = max(12, int(48 * unit_height / 720))
+        font = ImageFont.truetype(self.font_path, font_size) if os.path.exists(self.font_path) else ImageFont.load_default()
         images = []
 
         for path in image_paths:
-            img = Image.open(path).convert("RGB").resize((self.unit_width, self.unit_height), Image.Resampling.LANCZOS)
+            img = Image.open(path).convert("RGB").resize((unit_width, unit_height), Image.Resampling.LANCZOS)
             timestamp = re.search(r"frame_(\d{2})_(\d{2})\.jpg", os.path.basename(path))
             time_text = f"{timestamp.group(1)}:{timestamp.group(2)}" if timestamp else ""
             draw = ImageDraw.Draw(img)
@@ -84,23 +160,31 @@ class VideoReader:
             images.append(img)
 
         cols, rows = self.grid_size
-        grid_img = Image.new("RGB", (self.unit_width * cols, self.unit_height * rows), (255, 255, 255))
+        grid_img = Image.new("RGB", (unit_width * cols, unit_height * rows), (255, 255, 255))
 
         for i, img in enumerate(images):
-            x = (i % cols) * self.unit_width
-            y = (i // cols) * self.unit_height
+            x = (i % cols) * unit_width
+            y = (i // cols) * unit_height
             grid_img.paste(img, (x, y))
 
-        save_path = os.path.join(self.grid_dir, f"{name}.jpg")
-        grid_img.save(save_path, quality=self.save_quality)
+        if self.budget:
+            save_path = os.path.join(self.grid_dir, f"{name}.{self.budget.extension}")
+            grid_img.save(save_path, format=self.budget.pil_format, quality=self.budget.quality)
+        else:
+            save_path = os.path.join(self.grid_dir, f"{name}.jpg")
+            grid_img.save(save_path, quality=self.save_quality)
+        self.payload_report.width, self.payload_report.height = grid_img.size
         return save_path
 
     def encode_images_to_base64(self, image_paths: list[str]) -> list[str]:
         base64_images = []
         for path in image_paths:
+            mime = "image/webp" if path.endswith(".webp") else "image/jpeg"
             with open(path, "rb") as img_file:
                 encoded_string = base64.b64encode(img_file.read()).decode("utf-8")
-                base64_images.append(f"data:image/jpeg;base64,{encoded_string}")
+                base64_images.append(f"data:{mime};base64,{encoded_string}")
+        self.payload_report.images = len(base64_images)
+        self.payload_report.payload_bytes = sum(len(url) for url in base64_images)
         return base64_images
 
     def run(self)->list[str]:
@@ -120,15 +204,16 @@ class VideoReader:
                 if file.startswith("grid_"):
                     os.remove(os.path.join(self.grid_dir, file))
             print(self.frame_dir,self.grid_dir)
-            self.extract_frames()
+            # 先按数量上限选组再抽帧，超出的网格既不抽帧也不做解码与编码
+            planned, total = self.plan_groups()
+            self.payload_report.skipped = total - len(planned)
+            self.extract_frames(timestamps=[ts for group in planned for ts in group])
             print("2#3",self.frame_dir,self.grid_dir)
             logger.info("开始拼接网格图...")
             image_paths = []
-            groups = self.group_images()
-            for idx, group in enumerate(groups, start=1):
-                if len(group) < self.grid_size[0] * self.grid_size[1]:
-                    logger.warning(f"⚠️ 跳过第 {idx} 组，图片不足 {self.grid_size[0] * self.grid_size[1]} 张")
-                    continue
+            # 帧文件按时间排序后正好是选中的各个完整分组
+            selected = self.group_images()
+            for idx, group in enumerate(selected, start=1):
                 out_path = self.concat_images(group, f"grid_{idx}")
                 image_paths.append(out_path)
 
@@ -0,0 +1,84 @@
+"""
+基准脚本的公共工具：计时统计与 JSON 结果输出。
+
+结果文件附带 git 提交与运行环境，可用 bench_compare.py 对比两次提交的结果。
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(samples: List[float]) -> dict:
+    """
+    :param samples: 单次耗时（秒）
+    :return: 毫秒统计
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "iterations": n,
+        "mean_ms": round(sum(ordered) / n * 1000, 4),
+        "p50_ms": round(ordered[n // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(n - 1, int(n * 0.95))] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 1) -> dict:
+    """
+    先空跑 warmup 次，再计时 iterations 次
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_results(results: Dict[str, dict]) -> None:
+    width = max([len(name) for name in results] + [10]) + 2
+    print(f"{'case':<{width}}{'mean(ms)':>12}{'p50(ms)':>12}{'p95(ms)':>12}{'n':>6}")
+    for name, r in results.items():
+        print(f"{name:<{width}}{r['mean_ms']:>12.3f}{r['p50_ms']:>12.3f}{r['p95_ms']:>12.3f}{r['iterations']:>6}")
+
+
+def write_results(benchmark: str, params: dict, results: Dict[str, dict], output: Optional[str]) -> dict:
+    """
+    打印结果表，并在指定 output 时写出 JSON
+    """
+    report = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        # 输出路径与日志开关不影响结果，不参与对比
+        "params": {k: v for k, v in params.items() if k not in ("output", "verbose")},
+        "results": results,
+    }
+    print_results(results)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"results written to {output}")
+    return report
@@ -0,0 +1,71 @@
+"""
+对比两次基准运行的 JSON 结果（如基线提交与当前提交），按 p50 计算变化比例；
+有用例变慢超过阈值时以非零状态码退出，便于在 CI 中使用。
+
+用法（在 backend 目录下）：
+    git checkout main && python benchmarks/bench_pipeline.py --output base.json
+    git checkout my-branch && python benchmarks/bench_pipeline.py --output head.json
+    python benchmarks/bench_compare.py base.json head.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _fmt(value) -> str:
+    return f"{value:.3f}" if value is not None else "-"
+
+
+def compare(base: dict, head: dict, metric: str = "p50_ms") -> list:
+    """
+    :return: [(用例, 基线值, 当前值, 变化比例)]，只在一侧出现的用例变化比例为 None
+    """
+    rows = []
+    for name in list(base["results"]) + [n for n in head["results"] if n not in base["results"]]:
+        before = base["results"].get(name, {}).get(metric)
+        after = head["results"].get(name, {}).get(metric)
+        change = (after - before) / before if before and after is not None else None
+        rows.append((name, before, after, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--metric", default="p50_ms", choices=["mean_ms", "p50_ms", "p95_ms", "min_ms"])
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定为退化的变慢比例")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="基线低于该值的用例只展示不判定，避免噪声")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    if base.get("benchmark") != head.get("benchmark"):
+        parser.error(f"different benchmarks: {base.get('benchmark')} vs {head.get('benchmark')}")
+    if base.get("params") != head.get("params"):
+        print("warning: benchmark params differ, results may not be comparable")
+
+    rows = compare(base, head, args.metric)
+    width = max([len(r[0]) for r in rows] + [10]) + 2
+    print(f"{base.get('commit')} -> {head.get('commit')} ({args.metric})")
+    print(f"{'case':<{width}}{'base':>12}{'head':>12}{'change':>10}")
+    regressions = []
+    for name, before, after, change in rows:
+        flag = ""
+        if change is not None and before >= args.min_ms and change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<{width}}{_fmt(before):>12}{_fmt(after):>12}"
+              f"{(f'{change:+.1%}' if change is not None else '-'):>10}{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+流水线热点的微基准：
+    video_reader   VideoReader 分组、按预算选组、拼网格图与 base64 编码（帧由 PIL 预先合成，
+                   不调用 ffmpeg 抽帧）
+    screenshots    NoteGenerator._extract_screenshot_timestamps 解析截图标记
+    links          replace_content_markers 替换原片链接
+    status         /api/task_status 轮询：处理中、成功全量、按字段、ETag 命中 304
+
+用法（在 backend 目录下）：
+    python benchmarks/bench_micro.py --iterations 200 --output micro.json
+    python benchmarks/bench_micro.py --only status,links
+"""
+import argparse
+import contextlib
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 使用临时库与临时输出目录，避免污染本地数据
+_tmp_dir = tempfile.mkdtemp(prefix="bench_micro_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["NOTE_OUTPUT_DIR"] = os.path.join(_tmp_dir, "note_results")
+
+from PIL import Image, ImageDraw  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from _common import measure, write_results  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.enmus.task_status_enums import TaskStatus  # noqa: E402
+from app.models.audio_model import AudioDownloadResult  # noqa: E402
+from app.models.notes_model import NoteResult  # noqa: E402
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment  # noqa: E402
+from app.services.note import NoteGenerator  # noqa: E402
+from app.services.result_store import result_store  # noqa: E402
+from app.utils.image_budget import ImageBudget  # noqa: E402
+from app.utils.note_helper import replace_content_markers  # noqa: E402
+from app.utils.video_reader import VideoReader  # noqa: E402
+
+SUITES = ("video_reader", "screenshots", "links", "status")
+
+
+def render_frames(frame_dir: str, count: int, interval: int, seed: int) -> None:
+    """
+    合成确定的 1280x720 帧，命名与 VideoReader.extract_frames 一致
+    """
+    rng = random.Random(seed)
+    os.makedirs(frame_dir, exist_ok=True)
+    for i in range(count):
+        img = Image.new("RGB", (1280, 720), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(40):
+            x, y = rng.randrange(1280), rng.randrange(720)
+            draw.rectangle((x, y, x + rng.randint(20, 300), y + rng.randint(20, 200)),
+                           fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        mm, ss = divmod(i * interval, 60)
+        img.save(os.path.join(frame_dir, f"frame_{mm:02d}_{ss:02d}.jpg"), quality=90)
+
+
+class PrerenderedVideoReader(VideoReader):
+    """
+    用预先合成的帧代替 ffmpeg 抽帧，只测量分组、拼图与编码
+    """
+
+    def __init__(self, source_dir: str, **kwargs):
+        super().__init__(video_path="bench.mp4", **kwargs)
+        self.source_dir = source_dir
+
+    def extract_frames(self, max_frames=1000, timestamps=None) -> list[str]:
+        if timestamps is None:
+            timestamps = self.frame_timestamps(max_frames)
+        paths = []
+        for ts in timestamps:
+            name = f"frame_{self.format_time(ts)}.jpg"
+            paths.append(shutil.copy(os.path.join(self.source_dir, name), self.frame_dir))
+        return paths
+
+
+def bench_video_reader(args) -> dict:
+    source = os.path.join(_tmp_dir, "source_frames")
+    render_frames(source, args.frames, 2, args.seed)
+
+    def case(budget):
+        reader = PrerenderedVideoReader(
+            source, grid_size=(3, 3), frame_interval=2, duration=args.frames * 2, unit_width=1280, unit_height=720,
+            frame_dir=os.path.join(_tmp_dir, "frames"), grid_dir=os.path.join(_tmp_dir, "grids"), budget=budget,
+        )
+        return lambda: reader.run()
+
+    iterations = max(1, args.iterations // 20)
+    return {
+        f"video_reader {args.frames} frames, no budget (jpeg)": measure(case(None), iterations),
+        f"video_reader {args.frames} frames, default budget (webp)": measure(case(ImageBudget()), iterations),
+    }
+
+
+def build_markdown(markers: int, marker: str) -> str:
+    lines = []
+    for i in range(markers):
+        mm, ss = divmod(i * 37 % 3600, 60)
+        lines.append(f"## 第 {i + 1} 节\n\n" + "正文内容 " * 30 + marker.format(mm=mm, ss=ss) + "\n")
+    return "\n".join(lines)
+
+
+def bench_screenshots(args) -> dict:
+    markdown = build_markdown(args.markers, "*Screenshot-[{mm:02d}:{ss:02d}]")
+    legacy = build_markdown(args.markers, "*Screenshot-{mm:02d}:{ss:02d}")
+    extract = NoteGenerator._extract_screenshot_timestamps
+    assert len(extract(markdown)) == args.markers
+    return {
+        f"screenshot markers x{args.markers}": measure(lambda: extract(markdown), args.iterations),
+        f"screenshot markers (legacy) x{args.markers}": measure(lambda: extract(legacy), args.iterations),
+    }
+
+
+def bench_links(args) -> dict:
+    markdown = build_markdown(args.markers, "*Content-[{mm:02d}:{ss:02d}]")
+    return {
+        f"content links bilibili x{args.markers}": measure(
+            lambda: replace_content_markers(markdown, video_id="BV1bench", platform="bilibili"), args.iterations),
+        f"content links youtube x{args.markers}": measure(
+            lambda: replace_content_markers(markdown, video_id="bench", platform="youtube"), args.iterations),
+    }
+
+
+def bench_status(args) -> dict:
+    init_db()
+    generator = NoteGenerator.__new__(NoteGenerator)
+    generator.trace = None
+    rng = random.Random(args.seed)
+    segments = [TranscriptSegment(start=i * 3.0, end=i * 3.0 + 2.8, text=f"segment {i} " * rng.randint(3, 12))
+                for i in range(args.segments)]
+    note = NoteResult(
+        markdown=build_markdown(args.markers, "*Content-[{mm:02d}:{ss:02d}]"),
+        transcript=TranscriptResult(language="zh", full_text=" ".join(s.text for s in segments), segments=segments),
+        audio_meta=AudioDownloadResult(file_path="bench.m4a", title="Benchmark video", duration=args.segments * 3.0,
+                                       cover_url=None, platform="bilibili", video_id="BV1bench", raw_info={}),
+    )
+    result_store.save("bench-success", note)
+    generator._update_status("bench-success", TaskStatus.SUCCESS)
+    generator._update_status("bench-running", TaskStatus.TRANSCRIBING)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+
+    with TestClient(create_app(lifespan=lifespan)) as client:
+        url = "/api/task_status/bench-success"
+        etag = client.get(url).headers["ETag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        return {
+            "status poll running": measure(lambda: client.get("/api/task_status/bench-running"), args.iterations),
+            f"status poll success, {args.segments} segments": measure(lambda: client.get(url), args.iterations),
+            "status poll success, fields=markdown": measure(
+                lambda: client.get(url, params={"fields": "markdown"}), args.iterations),
+            "status poll success, etag 304": measure(
+                lambda: client.get(url, headers={"If-None-Match": etag}), args.iterations),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=36, help="VideoReader 合成帧数（3x3 网格）")
+    parser.add_argument("--markers", type=int, default=200, help="Markdown 中的标记数")
+    parser.add_argument("--segments", type=int, default=2000, help="状态轮询结果中的转写分段数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help=f"逗号分隔，只运行部分：{', '.join(SUITES)}")
+    parser.add_argument("--output", help="写出 JSON 结果的路径")
+    parser.add_argument("--verbose", action="store_true", help="保留应用日志输出")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.only.split(",")] if args.only else list(SUITES)
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite: {', '.join(unknown)}")
+
+    runners = {"video_reader": bench_video_reader, "screenshots": bench_screenshots,
+               "links": bench_links, "status": bench_status}
+    results = {}
+    # VideoReader 与状态文件写入带有 print，默认屏蔽，避免淹没结果表
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    with quiet:
+        for suite in suites:
+            results.update(runners[suite](args))
+    logging.disable(logging.NOTSET)
+
+    write_results("micro", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+笔记流水线端到端基准：NoteGenerator 使用桩下载器、生成合成 TranscriptSegment 的桩转写器，
+以及本地 OpenAI 兼容桩服务，测量完整 generate + 结果保存的耗时，并从任务时间线（trace.json）
+汇总各阶段耗时。桩的输出只由参数与随机种子决定，结果可跨提交对比。
+
+场景：
+    cold         每次新 task_id、跳过 LLM 响应缓存，走完整流程
+    llm_cached   每次新 task_id、命中 LLM 响应缓存（下载与转写仍未命中）
+    variants     一次转写并发生成多个风格的笔记
+
+截图依赖 ffmpeg 与真实视频，不在本基准范围内，笔记只做链接替换。
+
+用法（在 backend 目录下）：
+    python benchmarks/bench_pipeline.py --segments 2000 --iterations 10 --output pipeline.json
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 使用临时库与临时输出目录，避免污染本地数据
+_tmp_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ["NOTE_OUTPUT_DIR"] = os.path.join(_tmp_dir, "note_results")
+os.environ["LLM_CACHE_DIR"] = os.path.join(_tmp_dir, "llm_cache")
+
+from _common import summarize, write_results  # noqa: E402
+
+from app.db.init_db import init_db  # noqa: E402
+from app.db.provider_dao import insert_provider  # noqa: E402
+from app.db.registry import provider_registry  # noqa: E402
+from app.decorators.timeit import timeit  # noqa: E402
+from app.downloaders.base import Downloader  # noqa: E402
+from app.models.audio_model import AudioDownloadResult  # noqa: E402
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment  # noqa: E402
+from app.services.note import NOTE_OUTPUT_DIR, NoteGenerator  # noqa: E402
+from app.services.result_store import result_store  # noqa: E402
+from app.transcriber.base import Transcriber  # noqa: E402
+from app.utils.trace import load_trace  # noqa: E402
+
+PROVIDER_ID = "bench"
+MODEL = "bench-model"
+WORDS = ("视频", "笔记", "模型", "数据", "训练", "推理", "缓存", "延迟", "吞吐", "索引",
+         "the", "model", "token", "latency", "frame", "audio", "prompt", "cache", "queue", "stage")
+
+
+class StubDownloader(Downloader):
+    """
+    写出固定大小的假音频文件，可选模拟网络耗时
+    """
+
+    def __init__(self, work_dir: str, audio_bytes: int, duration: float, latency: float):
+        super().__init__()
+        self.work_dir = work_dir
+        self.duration = duration
+        self.audio_bytes = audio_bytes
+        self.latency = latency
+
+    def download(self, video_url, output_dir=None, quality="fast", need_video=False, audio_formats=None):
+        if self.latency:
+            time.sleep(self.latency)
+        path = os.path.join(self.work_dir, f"{uuid.uuid4().hex}.m4a")
+        with open(path, "wb") as f:
+            f.write(b"\0" * self.audio_bytes)
+        return AudioDownloadResult(
+            file_path=path, title="Benchmark video", duration=self.duration, cover_url=None,
+            platform="bilibili", video_id="BV1bench", raw_info={"tags": ["benchmark", "pipeline"]},
+            downloaded_bytes=self.audio_bytes, postprocess_seconds=0.0,
+        )
+
+
+class SyntheticTranscriber(Transcriber):
+    """
+    按种子生成确定的转写分段，可选模拟转写耗时
+    """
+    native_audio_formats = ("m4a",)
+
+    def __init__(self, segments: int, seed: int, latency: float):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.result = TranscriptResult(
+            language="zh",
+            full_text="",
+            segments=[
+                TranscriptSegment(start=i * 3.0, end=i * 3.0 + 2.8,
+                                  text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))))
+                for i in range(segments)
+            ],
+        )
+        self.result.full_text = " ".join(s.text for s in self.result.segments)
+
+    @timeit("transcription")
+    def transcript(self, file_path: str) -> TranscriptResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.result
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    最小的 OpenAI 兼容 /chat/completions：返回带 Content 标记的固定笔记与 usage
+    """
+    latency = 0.0
+    markdown = ""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body or b"{}")
+        if self.latency:
+            time.sleep(self.latency)
+        payload = json.dumps({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": request.get("model", MODEL),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": self.markdown}}],
+            "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(self.markdown) // 4,
+                      "total_tokens": (len(body) + len(self.markdown)) // 4,
+                      "prompt_tokens_details": {"cached_tokens": 0}},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_markdown(sections: int) -> str:
+    lines = ["# Benchmark video"]
+    for i in range(sections):
+        mm, ss = divmod(i * 45, 60)
+        lines += [f"## 第 {i + 1} 部分 *Content-[{mm:02d}:{ss:02d}]", "", f"要点 {i + 1}：" + "内容 " * 40, ""]
+    return "\n".join(lines)
+
+
+def start_stub_server(latency: float, sections: int) -> ThreadingHTTPServer:
+    handler = type("Handler", (StubOpenAIHandler,), {"latency": latency, "markdown": build_markdown(sections)})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class BenchNoteGenerator(NoteGenerator):
+    def __init__(self, transcriber: Transcriber, downloader: Downloader):
+        self._stub_transcriber = transcriber
+        self._stub_downloader = downloader
+        super().__init__()
+
+    def _init_transcriber(self) -> Transcriber:
+        return self._stub_transcriber
+
+    def _get_downloader(self, platform: str) -> Downloader:
+        return self._stub_downloader
+
+
+def run_task(transcriber, downloader, **kwargs) -> str:
+    task_id = str(uuid.uuid4())
+    note = BenchNoteGenerator(transcriber, downloader).generate(
+        video_url="https://www.bilibili.com/video/BV1bench", platform="bilibili", task_id=task_id,
+        model_name=MODEL, provider_id=PROVIDER_ID, link=True, _format=["link"], style="detailed", **kwargs,
+    )
+    if note is None:
+        raise RuntimeError(f"task {task_id} failed, see {NOTE_OUTPUT_DIR / (task_id + '.status.json')}")
+    result_store.save(task_id, note)
+    return task_id
+
+
+def run_scenario(iterations: int, transcriber, downloader, **kwargs) -> tuple:
+    samples, task_ids = [], []
+    # 丢弃第一次运行（导入与连接建立）
+    run_task(transcriber, downloader, **kwargs)
+    for _ in range(iterations):
+        start = time.perf_counter()
+        task_ids.append(run_task(transcriber, downloader, **kwargs))
+        samples.append(time.perf_counter() - start)
+    return summarize(samples), task_ids
+
+
+def stage_breakdown(task_ids) -> dict:
+    """
+    汇总各任务时间线中同名阶段的耗时；同一任务内的同名 span（如多个变体的 llm）按总和计
+    """
+    per_stage = {}
+    for task_id in task_ids:
+        trace = load_trace(task_id, str(NOTE_OUTPUT_DIR)) or {"spans": []}
+        totals = {}
+        for span in trace["spans"]:
+            totals[span["name"]] = totals.get(span["name"], 0.0) + span["duration"]
+        for name, seconds in totals.items():
+            per_stage.setdefault(name, []).append(seconds)
+    return {name: summarize(samples) for name, samples in per_stage.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--segments", type=int, default=2000, help="合成转写分段数（每段 3 秒）")
+    parser.add_argument("--sections", type=int, default=20, help="桩服务返回笔记的章节数")
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--audio-bytes", type=int, default=1 << 20)
+    parser.add_argument("--download-latency-ms", type=float, default=0)
+    parser.add_argument("--transcribe-latency-ms", type=float, default=0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="写出 JSON 结果的路径")
+    parser.add_argument("--verbose", action="store_true", help="保留应用日志输出")
+    args = parser.parse_args()
+
+    init_db()
+    server = start_stub_server(args.llm_latency_ms / 1000, args.sections)
+    insert_provider(PROVIDER_ID, PROVIDER_ID, "sk-bench-0000000000",
+                    f"http://127.0.0.1:{server.server_address[1]}/v1", "custom", "custom")
+    provider_registry.load()
+
+    work_dir = os.path.join(_tmp_dir, "media")
+    os.makedirs(work_dir, exist_ok=True)
+    downloader = StubDownloader(work_dir, args.audio_bytes, args.segments * 3.0, args.download_latency_ms / 1000)
+    transcriber = SyntheticTranscriber(args.segments, args.seed, args.transcribe_latency_ms / 1000)
+    styles = ["detailed", "academic", "minimal", "tutorial", "xiaohongshu"]
+    variants = [{"style": styles[i % len(styles)], "format": ["link"]} for i in range(args.variants)]
+
+    scenarios = {
+        "cold": {"bypass_llm_cache": True},
+        "llm_cached": {"bypass_llm_cache": False},
+        "variants": {"bypass_llm_cache": True, "variants": variants},
+    }
+    results = {}
+    # 应用日志与状态文件的 print 会淹没结果表，默认屏蔽
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    with quiet:
+        for name, kwargs in scenarios.items():
+            results[f"e2e {name}"], task_ids = run_scenario(args.iterations, transcriber, downloader, **kwargs)
+            for stage, stats in stage_breakdown(task_ids).items():
+                results[f"e2e {name} / {stage}"] = stats
+    logging.disable(logging.NOTSET)
+    server.shutdown()
+
+    write_results("pipeline", vars(args), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
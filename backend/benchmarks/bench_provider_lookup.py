@@ -0,0 +1,67 @@
+"""
+供应商查询延迟基准：对比「每次查库 + 序列化」与进程内注册表的字典读取。
+
+用法（在 backend 目录下）：
+    python benchmarks/bench_provider_lookup.py --providers 20 --iterations 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 使用临时库，避免污染本地数据
+_tmp_dir = tempfile.mkdtemp(prefix="bench_provider_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+from app.db.engine import Base, get_engine  # noqa: E402
+from app.db.provider_dao import get_provider_by_id, insert_provider  # noqa: E402
+from app.db.registry import provider_registry  # noqa: E402
+from app.services.provider import ProviderService  # noqa: E402
+
+
+def _measure(fn, ids, iterations: int) -> dict:
+    samples = []
+    for i in range(iterations):
+        pid = ids[i % len(ids)]
+        start = time.perf_counter()
+        fn(pid)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": sum(samples) / len(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[int(len(samples) * 0.95)] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+    ids = [f"bench-{i}" for i in range(args.providers)]
+    for pid in ids:
+        insert_provider(pid, pid, "sk-bench-0000000000", "https://api.example.com/v1", "custom", "openai")
+    provider_registry.load()
+
+    results = {
+        "db + serialize (before)": _measure(
+            lambda pid: ProviderService.serialize_provider(get_provider_by_id(pid)), ids, args.iterations
+        ),
+        "registry (after)": _measure(ProviderService.get_provider_by_id, ids, args.iterations),
+    }
+
+    print(f"{'lookup':<26}{'mean(us)':>12}{'p50(us)':>12}{'p95(us)':>12}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['mean_us']:>12.1f}{r['p50_us']:>12.1f}{r['p95_us']:>12.1f}")
+    before, after = results["db + serialize (before)"], results["registry (after)"]
+    print(f"speedup (p50): {before['p50_us'] / after['p50_us']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
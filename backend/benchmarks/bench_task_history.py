@@ -0,0 +1,116 @@
+"""
+任务历史查询基准：向临时库灌入大量 video_tasks 记录，比较 keyset 分页与 OFFSET 分页、
+带平台/状态/日期筛选的分页、按视频查最新任务的耗时，并打印执行计划确认命中索引。
+
+用法（在 backend 目录下）：
+    python benchmarks/bench_task_history.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp_dir = tempfile.mkdtemp(prefix="bench_tasks_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db.engine import get_engine  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+from app.db.video_task_dao import encode_cursor, get_task_by_video, list_video_tasks  # noqa: E402
+
+PLATFORMS = ["bilibili", "youtube", "douyin", "kuaishou"]
+BATCH = 50_000
+
+
+def seed(rows: int) -> None:
+    base = datetime(2023, 1, 1)
+    with get_engine().begin() as conn:
+        for start in range(0, rows, BATCH):
+            conn.execute(
+                text(
+                    "INSERT INTO video_tasks (video_id, platform, task_id, created_at, status, duration, title) "
+                    "VALUES (:video_id, :platform, :task_id, :created_at, :status, 600, :title)"
+                ),
+                [
+                    {
+                        "video_id": f"v{i % (rows // 3 + 1)}",
+                        "platform": PLATFORMS[i % len(PLATFORMS)],
+                        "task_id": f"task-{i}",
+                        "status": "FAILED" if i % 50 == 0 else "SUCCESS",
+                        "title": f"video {i}",
+                        "created_at": base + timedelta(seconds=i),
+                    }
+                    for i in range(start, min(start + BATCH, rows))
+                ],
+            )
+
+
+def timed(fn, repeat: int = 50) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s ({_tmp_dir})")
+
+    engine = get_engine()
+    deep = args.rows // 2
+    deep_cursor = encode_cursor(args.rows - deep + 1)
+    video_id = f"v{random.randrange(args.rows // 3)}"
+
+    def offset_page():
+        with engine.connect() as conn:
+            conn.execute(
+                text("SELECT * FROM video_tasks ORDER BY id DESC LIMIT :l OFFSET :o"),
+                {"l": args.page_size, "o": deep},
+            ).fetchall()
+
+    results = {
+        "keyset first page": timed(lambda: list_video_tasks(limit=args.page_size)),
+        f"keyset page @ row {deep}": timed(lambda: list_video_tasks(limit=args.page_size, cursor=deep_cursor)),
+        f"offset page @ row {deep}": timed(offset_page, repeat=5),
+        "keyset page, platform filter": timed(
+            lambda: list_video_tasks(limit=args.page_size, cursor=deep_cursor, platform="youtube")),
+        "keyset page, status filter": timed(
+            lambda: list_video_tasks(limit=args.page_size, cursor=deep_cursor, status="FAILED")),
+        "keyset page, date range": timed(lambda: list_video_tasks(
+            limit=args.page_size, created_from=datetime(2023, 1, 2), created_to=datetime(2023, 1, 3))),
+        "get_task_by_video": timed(lambda: get_task_by_video(video_id, "bilibili")),
+    }
+    print(f"{'query':<32}{'p50(ms)':>10}")
+    for name, ms in results.items():
+        print(f"{name:<32}{ms:>10.2f}")
+
+    with engine.connect() as conn:
+        for label, sql in [
+            ("history", "SELECT * FROM video_tasks WHERE id < 100 ORDER BY id DESC LIMIT 20"),
+            ("by status", "SELECT id FROM video_tasks WHERE status = 'FAILED' AND id < 100 "
+                          "ORDER BY id DESC LIMIT 20"),
+            ("by video", "SELECT task_id FROM video_tasks WHERE video_id = 'v1' AND platform = 'bilibili' "
+                         "ORDER BY created_at DESC LIMIT 1"),
+        ]:
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+            print(f"plan[{label}]: " + "; ".join(str(row[-1]) for row in plan))
+
+
+if __name__ == "__main__":
+    main()
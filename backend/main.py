@@ -9,6 +9,9 @@ from dotenv import load_dotenv
 
 from app.db.init_db import init_db
 from app.db.provider_dao import seed_default_providers
+from app.db.registry import provider_registry
+from app.services.model_catalog import MODEL_CATALOG_BACKGROUND, model_catalog
+from app.services.provider_health import provider_health
 from app.exceptions.exception_handlers import register_exception_handlers
 # from app.db.model_dao import init_model_table
 # from app.db.provider_dao import init_provider_table
@@ -42,7 +45,13 @@ async def lifespan(app: FastAPI):
     init_db()
     get_transcriber(transcriber_type=os.getenv("TRANSCRIBER_TYPE", "fast-whisper"))
     seed_default_providers()
+    provider_registry.load()
+    if MODEL_CATALOG_BACKGROUND:
+        model_catalog.start()
+    provider_health.start()
     yield
+    model_catalog.stop()
+    provider_health.stop()
 
 app = create_app(lifespan=lifespan)
 origins = [
@@ -203,3 +203,41 @@ class TestTaskStatusAPI:
                 os.remove(status_file)
             if os.path.exists(result_file):
                 os.remove(result_file)
+
+
+    def test_task_status_field_selection_and_etag(self, client):
+        """
+        Test that ?fields= trims the result and an unchanged result returns 304.
+        """
+        task_id = "test-etag-task-001"
+        note_output_dir = os.getenv("NOTE_OUTPUT_DIR", "note_results")
+        os.makedirs(note_output_dir, exist_ok=True)
+        result_file = os.path.join(note_output_dir, f"{task_id}.json")
+        mock_result = {
+            "markdown": "# Note",
+            "audio_meta": {"title": "Video", "raw_info": {"tags": []}},
+            "transcript": {"segments": []}
+        }
+
+        try:
+            with open(result_file, "w", encoding="utf-8") as f:
+                json.dump(mock_result, f)
+
+            url = f"/api/task_status/{task_id}?fields=markdown,audio_meta.title"
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.json()["data"]["result"] == {"markdown": "# Note", "audio_meta": {"title": "Video"}}
+            etag = response.headers["ETag"]
+
+            cached = client.get(url, headers={"If-None-Match": etag})
+            assert cached.status_code == 304
+            assert cached.headers["ETag"] == etag
+
+            # a different selection is a different representation
+            other = client.get(f"/api/task_status/{task_id}", headers={"If-None-Match": etag})
+            assert other.status_code == 200
+            assert other.json()["data"]["result"] == mock_result
+
+        finally:
+            if os.path.exists(result_file):
+                os.remove(result_file)
@@ -0,0 +1,76 @@
+"""
+Unit tests for the cached cookie configuration manager.
+"""
+import json
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.cookie_manager import CookieConfigManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return CookieConfigManager(str(tmp_path / "downloader.json"))
+
+
+class Listener:
+    def __init__(self):
+        self.values = []
+
+    def on_change(self, cookie):
+        self.values.append(cookie)
+
+
+class TestCookieConfigManager:
+
+    def test_get_uses_cached_contents(self, manager):
+        manager.set("douyin", "a=1")
+        with patch("app.services.cookie_manager.json.load") as load:
+            assert manager.get("douyin") == "a=1"
+            assert manager.get("douyin") == "a=1"
+        load.assert_not_called()
+
+    def test_external_edit_is_reloaded(self, manager):
+        manager.set("douyin", "a=1")
+        manager.path.write_text(json.dumps({"douyin": {"cookie": "edited-externally"}}), encoding="utf-8")
+        os.utime(manager.path, ns=(1, 1))
+
+        assert manager.get("douyin") == "edited-externally"
+
+    def test_concurrent_sets_are_not_lost(self, manager):
+        threads = [threading.Thread(target=manager.set, args=(f"p{i}", str(i))) for i in range(50)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        on_disk = json.loads(manager.path.read_text(encoding="utf-8"))
+        assert len(on_disk) == 50
+        assert manager.list_all()["p7"] == "7"
+        assert not [p for p in os.listdir(manager.path.parent) if p.endswith(".tmp")]
+
+    def test_subscribers_receive_updates(self, manager):
+        manager.set("douyin", "old")
+        listener = Listener()
+        manager.subscribe("douyin", listener.on_change)
+
+        manager.set("douyin", "new")
+        manager.set("kuaishou", "ignored")
+        manager.delete("douyin")
+
+        assert listener.values == ["old", "new", None]
+
+    def test_collected_subscribers_are_dropped(self, manager):
+        listener = Listener()
+        manager.subscribe("douyin", listener.on_change)
+        del listener
+
+        manager.set("douyin", "x")
+        assert manager._listeners["douyin"] == []
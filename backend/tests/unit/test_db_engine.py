@@ -0,0 +1,103 @@
+"""
+Unit tests for the SQLite engine configuration and unit-of-work helpers.
+
+Uses a temporary file database built with create_db_engine so the WAL,
+busy-timeout and pool settings apply exactly as in production.
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db import engine as engine_module
+from app.db import video_task_dao
+from app.db.engine import Base, create_db_engine, session_scope
+from app.db.models.video_tasks import VideoTask
+
+
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(engine_module, "SessionLocal", Session)
+    yield engine
+    engine.dispose()
+
+
+class TestEngineConfiguration:
+    def test_sqlite_pragmas_applied(self, file_db):
+        with file_db.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == engine_module.SQLITE_BUSY_TIMEOUT_MS
+
+    def test_pool_sized_from_config(self, file_db):
+        assert file_db.pool.size() == engine_module.DB_POOL_SIZE
+
+    def test_memory_database_still_supported(self):
+        engine = create_db_engine("sqlite://")
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+        engine.dispose()
+
+
+class TestUnitOfWork:
+    def test_session_scope_commits_grouped_writes(self, file_db):
+        with session_scope() as db:
+            video_task_dao.insert_video_task("v1", "bilibili", "t1", db=db)
+            video_task_dao.insert_video_task("v1", "bilibili", "t2", db=db)
+
+        with session_scope() as db:
+            assert db.query(VideoTask).count() == 2
+
+    def test_session_scope_rolls_back_on_error(self, file_db):
+        with pytest.raises(RuntimeError):
+            with session_scope() as db:
+                video_task_dao.insert_video_task("v1", "bilibili", "t1", db=db)
+                raise RuntimeError("boom")
+
+        with session_scope() as db:
+            assert db.query(VideoTask).count() == 0
+
+    def test_note_pipeline_commits_status_with_metadata(self, file_db, tmp_path, monkeypatch):
+        """Task registration + status land in a single commit."""
+        from sqlalchemy import event
+        from app.enmus.task_status_enums import TaskStatus
+        from app.services import note as note_module
+
+        monkeypatch.setattr(note_module, "NOTE_OUTPUT_DIR", tmp_path)
+        gen = note_module.NoteGenerator.__new__(note_module.NoteGenerator)
+        gen.trace = None
+        commits = []
+        event.listen(engine_module.SessionLocal, "after_commit", lambda session: commits.append(session))
+
+        gen._save_task_state("t1", TaskStatus.SUCCESS, platform="bilibili", video_id="v1", result_path="/r/t1")
+
+        assert len(commits) == 1
+        with session_scope() as db:
+            task = db.query(VideoTask).filter_by(task_id="t1").one()
+            assert (task.status, task.result_path) == (TaskStatus.SUCCESS.value, "/r/t1")
+
+    def test_dao_failure_is_raised(self, file_db):
+        video_task_dao.insert_video_task("v1", "bilibili", "dup")
+        with pytest.raises(Exception):
+            video_task_dao.insert_video_task("v1", "bilibili", "dup")
+
+    def test_parallel_inserts(self, file_db):
+        """200 concurrent inserts all succeed without 'database is locked'."""
+        def insert(i):
+            video_task_dao.insert_video_task(f"v{i % 10}", "bilibili", f"task-{i}")
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            list(pool.map(insert, range(200)))
+
+        with session_scope() as db:
+            assert db.query(VideoTask).count() == 200
+        assert video_task_dao.delete_task_by_video("v0", "bilibili") == 20
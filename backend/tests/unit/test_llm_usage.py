@@ -0,0 +1,102 @@
+"""
+Unit tests for per-call LLM usage accounting, aggregation and the usage API.
+"""
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db import engine as engine_module
+from app.db import llm_usage_dao
+from app.db.engine import Base, create_db_engine, session_scope
+from app.db.migrations import run_migrations
+from app.db.models.llm_usage import LLMUsage
+from app.gpt.prompt_cache import PromptUsage
+from app.services import usage as usage_module
+from app.services.usage import UsageService, estimate_cost
+
+
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(engine_module, "SessionLocal", Session)
+    yield engine
+    engine.dispose()
+
+
+def fake_gpt(provider_id="p1", model="gpt-4o", prompt=1000, cached=0, completion=200, cache_hit=False):
+    usage = None if cache_hit else PromptUsage(prompt_tokens=prompt, cached_tokens=cached,
+                                               completion_tokens=completion)
+    return SimpleNamespace(provider_id=provider_id, model=model, last_usage=usage,
+                           last_latency=None if cache_hit else 1.5, cache_hit=cache_hit)
+
+
+class TestUsageAccounting:
+
+    def test_estimate_cost_uses_cached_price(self):
+        prices = {"gpt-4o": {"prompt": 2.0, "completion": 10.0, "cached": 1.0}}
+        usage = PromptUsage(prompt_tokens=1_000_000, cached_tokens=500_000, completion_tokens=100_000)
+        assert estimate_cost("openai/gpt-4o-mini", usage, prices) == pytest.approx(1.0 + 0.5 + 1.0)
+        assert estimate_cost("qwen-max", usage, prices) is None
+
+    def test_record_and_task_usage(self, file_db, monkeypatch):
+        monkeypatch.setattr(usage_module, "_PRICES", {"gpt-4o": {"prompt": 2.0, "completion": 10.0}})
+        UsageService.record("t1", fake_gpt(cached=400), style="minimal")
+        UsageService.record("t1", fake_gpt(cache_hit=True), style="detailed")
+        UsageService.record("t1", SimpleNamespace(model="m"))  # no call made, nothing recorded
+
+        result = UsageService.get_task_usage("t1")
+        assert len(result["calls"]) == 2
+        first, second = result["calls"]
+        assert (first["prompt_tokens"], first["cached_tokens"], first["latency_ms"]) == (1000, 400, 1500.0)
+        assert first["cost"] == pytest.approx((1000 * 2.0 + 200 * 10.0) / 1_000_000)
+        assert second["cache_hit"] and second["prompt_tokens"] == 0
+        assert result["total"]["completion_tokens"] == 200
+
+    def test_aggregate_by_provider_model_day(self, file_db):
+        with session_scope() as db:
+            db.add_all([
+                LLMUsage(task_id="a", provider_id="p1", model="m1", prompt_tokens=100, completion_tokens=10,
+                         latency_ms=100, created_at=datetime(2024, 1, 1, 8)),
+                LLMUsage(task_id="b", provider_id="p1", model="m1", prompt_tokens=300, completion_tokens=30,
+                         latency_ms=300, created_at=datetime(2024, 1, 1, 9)),
+                LLMUsage(task_id="c", provider_id="p2", model="m2", prompt_tokens=50, cache_hit=True,
+                         created_at=datetime(2024, 1, 2, 9)),
+            ])
+
+        items = llm_usage_dao.aggregate_llm_usage(["provider", "model", "day"])
+        assert items[0] == {"provider": "p1", "model": "m1", "day": "2024-01-01", "calls": 2, "cache_hits": 0,
+                            "prompt_tokens": 400, "completion_tokens": 40, "cached_tokens": 0,
+                            "avg_latency_ms": 200.0, "cost": None}
+        assert items[1]["cache_hits"] == 1
+
+        items = llm_usage_dao.aggregate_llm_usage(["provider"], created_from=datetime(2024, 1, 2))
+        assert [(i["provider"], i["calls"]) for i in items] == [("p2", 1)]
+        with pytest.raises(ValueError):
+            llm_usage_dao.aggregate_llm_usage(["nope"])
+
+    def test_api(self, file_db):
+        from contextlib import asynccontextmanager
+        from fastapi.testclient import TestClient
+        from app import create_app
+
+        @asynccontextmanager
+        async def lifespan(app):
+            yield
+
+        UsageService.record("t1", fake_gpt())
+        with TestClient(create_app(lifespan=lifespan)) as client:
+            body = client.get("/api/tasks/t1/usage").json()
+            assert body["data"]["total"]["prompt_tokens"] == 1000
+            body = client.get("/api/usage", params={"group_by": "model"}).json()
+            assert body["data"]["items"][0]["model"] == "gpt-4o"
+            assert client.get("/api/usage", params={"group_by": "bad"}).json()["code"] == 400
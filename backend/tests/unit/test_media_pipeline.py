@@ -0,0 +1,236 @@
+"""
+Unit tests for NoteGenerator media orchestration.
+
+Tests that the video needed for screenshots is fetched once (reusing the
+mp4 bundled with the audio download when the platform supports it) and
+otherwise concurrently with the audio download.
+"""
+import json
+import os
+import sys
+import threading
+from contextvars import copy_context
+from pathlib import Path
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.downloaders.base import Downloader
+from app.enmus.task_status_enums import TaskStatus
+from app.models.audio_model import AudioDownloadResult
+from app.models.transcriber_model import TranscriptResult
+from app.services import note as note_module
+from app.services.note import NoteGenerator
+from app.transcriber.base import Transcriber
+
+
+class StubTranscriber(Transcriber):
+    native_audio_formats = ("m4a",)
+
+    def transcript(self, file_path):
+        raise NotImplementedError
+
+
+class StubDownloader(Downloader):
+    def __init__(self, tmp_path: Path, bundles_video: bool):
+        super().__init__()
+        self.tmp_path = tmp_path
+        self.bundles_video = bundles_video
+        self.download_calls = []
+        self.video_calls = []
+
+    def download(self, video_url, output_dir=None, quality="fast", need_video=False, audio_formats=None):
+        self.download_calls.append({
+            "need_video": need_video,
+            "audio_formats": audio_formats,
+            "thread": threading.current_thread().name,
+        })
+        audio = self.tmp_path / "vid.mp3"
+        audio.write_bytes(b"audio")
+        video_path = None
+        if need_video:
+            video = self.tmp_path / "vid.mp4"
+            video.write_bytes(b"video")
+            video_path = str(video)
+        return AudioDownloadResult(
+            file_path=str(audio), title="t", duration=1, cover_url=None,
+            platform="stub", video_id="vid", raw_info={}, video_path=video_path,
+        )
+
+    def download_video(self, video_url, output_dir=None, max_height=None):
+        self.video_calls.append({"max_height": max_height, "thread": threading.current_thread().name})
+        video = self.tmp_path / "separate.mp4"
+        video.write_bytes(b"video")
+        return str(video)
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    """NoteGenerator without loading a real transcriber."""
+    monkeypatch.setattr(note_module, "NOTE_OUTPUT_DIR", tmp_path)
+    gen = NoteGenerator.__new__(NoteGenerator)
+    gen.transcriber = StubTranscriber()
+    gen.video_path = None
+    gen.video_headers = None
+    gen.video_img_urls = []
+    gen.image_budget = None
+    gen.image_payload = None
+    gen.platform = None
+    gen.trace = None
+    gen._video_future = None
+    return gen
+
+
+def _download(gen, downloader, tmp_path):
+    return gen._download_media(
+        downloader=downloader,
+        video_url="https://example.com/v",
+        quality="fast",
+        audio_cache_file=tmp_path / "task_audio.json",
+        status_phase=TaskStatus.DOWNLOADING,
+        platform="stub",
+        output_path=str(tmp_path),
+        screenshot=True,
+        video_understanding=False,
+        video_interval=0,
+        grid_size=[],
+    )
+
+
+class TestMediaPipeline:
+
+    def test_bundled_platform_downloads_once(self, generator, tmp_path):
+        """The mp4 kept by the audio download is reused for screenshots."""
+        downloader = StubDownloader(tmp_path, bundles_video=True)
+        audio = _download(generator, downloader, tmp_path)
+        generator._wait_for_video("task")
+
+        assert downloader.download_calls[0]["need_video"] is True
+        assert downloader.download_calls[0]["audio_formats"] == ("m4a",)
+        assert downloader.video_calls == []
+        assert str(generator.video_path) == audio.video_path
+
+    def test_unbundled_platform_fetches_video_in_background(self, generator, tmp_path):
+        """Platforms without bundled video fetch it on a worker thread."""
+        downloader = StubDownloader(tmp_path, bundles_video=False)
+        _download(generator, downloader, tmp_path)
+        generator._wait_for_video("task")
+
+        assert downloader.download_calls[0]["need_video"] is False
+        assert len(downloader.video_calls) == 1
+        assert downloader.video_calls[0]["thread"].startswith("video")
+        assert generator.video_path == tmp_path / "separate.mp4"
+
+    def test_cached_audio_reuses_bundled_video(self, generator, tmp_path):
+        """A cached audio result that still points at a local mp4 skips all downloads."""
+        downloader = StubDownloader(tmp_path, bundles_video=True)
+        _download(generator, downloader, tmp_path)
+        generator._wait_for_video("task")
+
+        _download(generator, downloader, tmp_path)
+        generator._wait_for_video("task")
+        assert len(downloader.download_calls) == 1
+        assert downloader.video_calls == []
+
+    def test_video_failure_surfaces_on_wait(self, generator, tmp_path):
+        downloader = StubDownloader(tmp_path, bundles_video=False)
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        downloader.download_video = broken
+        _download(generator, downloader, tmp_path)
+        with pytest.raises(RuntimeError):
+            generator._wait_for_video("task")
+        assert generator._video_future is None
+
+
+class StubGPT:
+    def __init__(self, provider_id, model, markdown="# note"):
+        self.provider_id = provider_id
+        self.model = model
+        self.markdown = markdown
+
+    def summarize(self, source):
+        return self.markdown
+
+
+class TestVariants:
+    AUDIO = AudioDownloadResult(file_path="a.mp3", title="t", duration=1, cover_url=None,
+                                platform="stub", video_id="vid", raw_info={})
+
+    @pytest.fixture(autouse=True)
+    def no_usage(self, monkeypatch):
+        monkeypatch.setattr(note_module.UsageService, "record", staticmethod(lambda *a, **k: None))
+
+    def test_variants_use_the_provider_resolved_for_the_task(self, generator):
+        """Failover happens once per task; every variant uses the chosen provider."""
+        calls = []
+
+        def get_gpt(model_name, provider_id, failover=True):
+            calls.append((model_name, provider_id, failover))
+            return StubGPT(provider_id, model_name)
+
+        generator._get_gpt = get_gpt
+        results = generator._summarize_variants(
+            task_id="task", audio_meta=self.AUDIO,
+            transcript=TranscriptResult(language="zh", full_text="", segments=[]),
+            gpt=StubGPT("fallback", "model-b"),
+            variants=[{"style": s, "format": [], "extras": None} for s in ("a", "b", "c")],
+            platform="stub",
+        )
+
+        assert [r["markdown"] for r in results] == ["# note"] * 3
+        assert calls == [("model-b", "fallback", False)] * 3
+
+    def test_all_empty_variants_fail_with_message(self, generator, monkeypatch):
+        monkeypatch.setattr(note_module, "update_video_task", lambda *a, **k: 0)
+        generator._save_task_state = lambda *a, **k: None
+        generator._get_downloader = lambda platform: None
+        generator._get_gpt = lambda *a, **k: StubGPT("p", "m")
+        generator._download_media = lambda **kwargs: self.AUDIO
+        generator._transcribe_audio = lambda **kwargs: TranscriptResult(language="zh", full_text="", segments=[])
+        generator._summarize_variants = lambda **kwargs: [
+            {"style": "a", "format": [], "markdown": None, "error": None}]
+
+        # generate sets the platform / trace context vars; keep them out of other tests
+        result = copy_context().run(generator.generate, "https://example.com/v", "stub", task_id="task",
+                                    variants=[{"style": "a"}])
+
+        assert result is None
+        status = json.loads((note_module.NOTE_OUTPUT_DIR / "task.status.json").read_text(encoding="utf-8"))
+        assert status["status"] == TaskStatus.FAILED.value
+        assert "所有笔记变体均未生成内容" in status["message"]
+
+
+class TestVideoCleanup:
+    def test_pending_video_job_is_cancelled(self, generator):
+        from concurrent.futures import Future
+
+        future = Future()
+        generator._video_future = future
+        generator._discard_video("task")
+        assert future.cancelled()
+        assert generator._video_future is None
+
+    def test_running_video_job_is_awaited_and_error_swallowed(self, generator, tmp_path):
+        """A transcription failure waits for the in-flight video download instead of orphaning it."""
+        downloader = StubDownloader(tmp_path, bundles_video=False)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_failing(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        downloader.download_video = slow_failing
+        _download(generator, downloader, tmp_path)
+        future = generator._video_future
+        started.wait(5)
+        threading.Timer(0.05, release.set).start()
+
+        generator._discard_video("task")
+        assert future.done()
+        assert generator._video_future is None
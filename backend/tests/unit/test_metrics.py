@@ -0,0 +1,99 @@
+"""
+Unit tests for pipeline stage timing and the Prometheus /metrics endpoint.
+"""
+import os
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.decorators.timeit import timeit
+from app.utils.metrics import (
+    METRIC_PLATFORMS, current_platform, record_cache, record_task, register_queue, stage_timer,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestStageTimer:
+
+    def test_observes_duration_and_active_count(self):
+        before = sample("bilinote_stage_duration_seconds_count", stage="t_ok", platform="bilibili")
+        with stage_timer("t_ok", platform="bilibili") as timer:
+            assert sample("bilinote_stage_active", stage="t_ok") == 1
+        assert sample("bilinote_stage_active", stage="t_ok") == 0
+        assert sample("bilinote_stage_duration_seconds_count", stage="t_ok", platform="bilibili") == before + 1
+        assert timer.elapsed >= 0
+
+    def test_errors_counted_and_reraised(self):
+        with pytest.raises(RuntimeError):
+            with stage_timer("t_err", platform="youtube"):
+                raise RuntimeError("boom")
+        assert sample("bilinote_stage_errors_total", stage="t_err", platform="youtube") == 1
+        assert sample("bilinote_stage_active", stage="t_err") == 0
+
+    def test_timeit_decorator_uses_context_platform(self):
+        @timeit("t_deco")
+        def work(x):
+            return x * 2
+
+        token = current_platform.set("douyin")
+        try:
+            assert work(2) == 4
+            assert work(3) == 6
+        finally:
+            current_platform.reset(token)
+        assert sample("bilinote_stage_duration_seconds_count", stage="t_deco", platform="douyin") == 2
+
+    def test_bare_timeit_still_supported(self):
+        @timeit
+        def legacy_stage():
+            return "ok"
+
+        assert legacy_stage() == "ok"
+        assert sample("bilinote_stage_duration_seconds_count", stage="legacy_stage", platform="unknown") == 1
+
+    def test_unsupported_platform_labelled_other(self):
+        with stage_timer("t_label", platform="evil-<script>"):
+            pass
+        token = current_platform.set("made-up-platform")
+        try:
+            with stage_timer("t_label"):
+                pass
+        finally:
+            current_platform.reset(token)
+        assert sample("bilinote_stage_duration_seconds_count", stage="t_label", platform="other") == 2
+
+        before = sample("bilinote_tasks_total", platform="other", status="t_label")
+        record_task("random-1234", "t_label")
+        assert sample("bilinote_tasks_total", platform="other", status="t_label") == before + 1
+        assert sample("bilinote_tasks_total", platform="random-1234", status="t_label") == 0
+
+    def test_metric_platforms_match_supported_platforms(self):
+        from app.services.constant import SUPPORT_PLATFORM_MAP
+
+        assert METRIC_PLATFORMS == set(SUPPORT_PLATFORM_MAP)
+
+
+def test_metrics_endpoint():
+    from contextlib import asynccontextmanager
+    from fastapi.testclient import TestClient
+    from app import create_app
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+
+    record_cache("t_cache", True)
+    register_queue("t_queue", lambda: 3)
+    with TestClient(create_app(lifespan=lifespan)) as client:
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'bilinote_cache_requests_total{cache="t_cache",result="hit"} 1.0' in response.text
+    assert 'bilinote_queue_depth{queue="t_queue"} 3.0' in response.text
@@ -0,0 +1,151 @@
+"""
+Unit tests for the schema migration runner and task-history queries.
+
+Covers upgrading a pre-migration video_tasks table, idempotency on a
+fresh create_all schema, keyset pagination with created_at ties, and
+the /api/tasks endpoint.
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db import engine as engine_module
+from app.db import video_task_dao
+from app.db.engine import Base, create_db_engine, session_scope
+from app.db.migrations import MIGRATIONS, run_migrations
+from app.db.models.video_tasks import VideoTask
+
+
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(engine_module, "SessionLocal", Session)
+    yield engine
+    engine.dispose()
+
+
+def _seed(count, server_time=False):
+    """Insert tasks; with server_time the database fills created_at (second resolution)."""
+    base = datetime(2024, 1, 1)
+    with session_scope() as db:
+        for i in range(count):
+            created = None if server_time else base + timedelta(minutes=i)
+            db.add(VideoTask(video_id=f"v{i}", platform="bilibili", task_id=f"t{i}", created_at=created))
+
+
+class TestMigrations:
+    def test_upgrades_legacy_table(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE video_tasks (id INTEGER PRIMARY KEY, video_id VARCHAR NOT NULL, "
+                "platform VARCHAR NOT NULL, task_id VARCHAR NOT NULL UNIQUE, "
+                "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+            ))
+            conn.execute(text("INSERT INTO video_tasks (video_id, platform, task_id) VALUES ('v', 'bilibili', 't')"))
+
+        assert run_migrations(engine) == [m.VERSION for m in MIGRATIONS]
+
+        inspector = inspect(engine)
+        columns = {c["name"] for c in inspector.get_columns("video_tasks")}
+        assert {"status", "duration", "result_path", "title", "cover_url"} <= columns
+        indexes = {i["name"] for i in inspector.get_indexes("video_tasks")}
+        assert "ix_video_tasks_platform_video_created" in indexes
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT status FROM video_tasks")).scalar() == "SUCCESS"
+        assert run_migrations(engine) == []
+        engine.dispose()
+
+    def test_fresh_schema_is_noop(self, file_db):
+        with file_db.connect() as conn:
+            versions = [r[0] for r in conn.execute(text("SELECT version FROM schema_migrations"))]
+        assert versions == [m.VERSION for m in MIGRATIONS]
+
+    def test_video_lookup_uses_composite_index(self, file_db):
+        with file_db.connect() as conn:
+            plan = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT task_id FROM video_tasks WHERE video_id = 'v' AND platform = 'b' "
+                "ORDER BY created_at DESC LIMIT 1"
+            )).fetchall()
+        assert "ix_video_tasks_platform_video_created" in " ".join(str(r) for r in plan)
+
+
+class TestTaskHistory:
+    def test_keyset_pagination_with_same_second_rows(self, file_db):
+        _seed(25, server_time=True)
+        seen, cursor = [], None
+        while True:
+            items, cursor = video_task_dao.list_video_tasks(limit=10, cursor=cursor)
+            seen.extend(i["task_id"] for i in items)
+            if cursor is None:
+                break
+        assert len(seen) == 25
+        assert len(set(seen)) == 25
+
+    def test_newest_first(self, file_db):
+        _seed(3)
+        items, cursor = video_task_dao.list_video_tasks(limit=5)
+        assert [i["task_id"] for i in items] == ["t2", "t1", "t0"]
+        assert cursor is None
+
+    def test_filters_and_projection(self, file_db):
+        video_task_dao.save_video_task("a", video_id="v1", platform="bilibili", status="SUCCESS", title="A",
+                                       cover_url="http://c/a.jpg", result_path="note_results/a.json")
+        video_task_dao.save_video_task("b", video_id="v2", platform="youtube", status="FAILED")
+        video_task_dao.save_video_task("c", video_id="v3", platform="bilibili", status="TRANSCRIBING")
+
+        items, _ = video_task_dao.list_video_tasks(platform="bilibili")
+        assert [i["task_id"] for i in items] == ["c", "a"]
+        items, _ = video_task_dao.list_video_tasks(status="FAILED")
+        assert [i["task_id"] for i in items] == ["b"]
+
+        item = video_task_dao.list_video_tasks(platform="bilibili", status="SUCCESS")[0][0]
+        assert item["title"] == "A"
+        assert item["cover_url"] == "http://c/a.jpg"
+        assert "result_path" not in item
+
+        items, _ = video_task_dao.list_video_tasks(created_from=datetime(2000, 1, 1), created_to=datetime(2000, 1, 2))
+        assert items == []
+        items, _ = video_task_dao.list_video_tasks(created_from=datetime(2000, 1, 1))
+        assert len(items) == 3
+
+    def test_save_updates_existing_task(self, file_db):
+        video_task_dao.save_video_task("a", video_id="", platform="bilibili", status="PARSING")
+        video_task_dao.save_video_task("a", video_id="BV1", platform="bilibili", title="T")
+        assert video_task_dao.update_video_task("a", status="SUCCESS") == 1
+        assert video_task_dao.update_video_task("missing", status="SUCCESS") == 0
+
+        items, _ = video_task_dao.list_video_tasks()
+        assert len(items) == 1
+        assert (items[0]["video_id"], items[0]["title"], items[0]["status"]) == ("BV1", "T", "SUCCESS")
+
+    def test_api(self, file_db):
+        from contextlib import asynccontextmanager
+        from fastapi.testclient import TestClient
+        from app import create_app
+
+        @asynccontextmanager
+        async def lifespan(app):
+            yield
+
+        _seed(3)
+        with TestClient(create_app(lifespan=lifespan)) as client:
+            body = client.get("/api/tasks", params={"limit": 2}).json()
+            assert body["code"] == 0
+            assert len(body["data"]["items"]) == 2
+            body = client.get("/api/tasks", params={"cursor": body["data"]["next_cursor"]}).json()
+            assert [i["task_id"] for i in body["data"]["items"]] == ["t0"]
+            assert client.get("/api/tasks", params={"cursor": "bad"}).json()["code"] == 400
+            body = client.get("/api/tasks", params={"date_from": "2024-01-01", "date_to": "2024-01-01"}).json()
+            assert len(body["data"]["items"]) == 3
+            assert client.get("/api/tasks", params={"status": "NOPE"}).status_code == 422
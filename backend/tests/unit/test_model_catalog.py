@@ -0,0 +1,107 @@
+"""
+Unit tests for the cached, concurrently refreshed model catalog.
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.registry import provider_registry
+from app.services.model_catalog import ModelCatalog
+
+PROVIDERS = [
+    {"id": "a", "name": "A", "enabled": 1, "base_url": "http://a", "api_key": "ka"},
+    {"id": "b", "name": "B", "enabled": 1, "base_url": "http://b", "api_key": "kb"},
+    {"id": "c", "name": "C", "enabled": 1, "base_url": "http://c", "api_key": "kc"},
+]
+
+
+@pytest.fixture(autouse=True)
+def providers(monkeypatch):
+    providers = [dict(p) for p in PROVIDERS]
+    by_id = {p["id"]: p for p in providers}
+    monkeypatch.setattr(provider_registry, "get_provider_by_id", lambda pid: by_id.get(str(pid)))
+    monkeypatch.setattr(provider_registry, "get_enabled_providers", lambda: providers)
+    monkeypatch.setattr(provider_registry, "get_all_providers", lambda: providers)
+    return by_id
+
+
+class FakeFetcher:
+    """Returns one model per provider after a delay; provider 'b' fails."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, provider):
+        with self.lock:
+            self.calls.append(provider["id"])
+        time.sleep(self.delay)
+        if provider["id"] == "b":
+            raise RuntimeError("401 unauthorized")
+        return [{"id": f"{provider['id']}-model"}]
+
+
+class TestModelCatalog:
+
+    def test_refresh_all_is_concurrent_and_records_errors(self):
+        fetcher = FakeFetcher(delay=0.3)
+        catalog = ModelCatalog(fetcher=fetcher, ttl=60, timeout=5, workers=4)
+
+        started = time.perf_counter()
+        catalog.refresh_all()
+        assert time.perf_counter() - started < 0.8
+
+        status = {s["provider_id"]: s for s in catalog.status()}
+        assert status["a"]["model_count"] == 1 and not status["a"]["stale"]
+        assert status["b"]["last_error"] == "401 unauthorized"
+        assert status["b"]["stale"]
+
+    def test_get_serves_cache_until_ttl(self):
+        fetcher = FakeFetcher(delay=0)
+        catalog = ModelCatalog(fetcher=fetcher, ttl=60, timeout=5)
+
+        assert catalog.get("a").models == [{"id": "a-model"}]
+        assert catalog.get("a").models == [{"id": "a-model"}]
+        assert fetcher.calls == ["a"]
+        assert catalog.get("missing") is None
+
+    def test_stale_entry_is_returned_while_refreshing(self):
+        fetcher = FakeFetcher(delay=0)
+        catalog = ModelCatalog(fetcher=fetcher, ttl=60, timeout=5)
+        catalog.get("a")
+        catalog._entries["a"].fetched_at -= 120
+
+        entry = catalog.get("a")
+        assert entry.models == [{"id": "a-model"}]
+        future = catalog._inflight.get("a")
+        if future:
+            future.result()
+        assert fetcher.calls == ["a", "a"]
+        assert not catalog._entries["a"].is_stale(60)
+
+    def test_failed_refresh_keeps_last_good_models(self, providers):
+        fetcher = FakeFetcher(delay=0)
+        catalog = ModelCatalog(fetcher=fetcher, ttl=60, timeout=5)
+        catalog.get("a")
+        catalog._fetcher = lambda provider: (_ for _ in ()).throw(TimeoutError("timed out"))
+
+        catalog._refresh_one(providers["a"])
+        entry = catalog.get("a")
+        assert entry.models == [{"id": "a-model"}]
+        assert entry.last_error == "timed out"
+
+    def test_changed_credentials_invalidate_entry(self, providers):
+        fetcher = FakeFetcher(delay=0)
+        catalog = ModelCatalog(fetcher=fetcher, ttl=60, timeout=5)
+        catalog.get("a")
+        providers["a"]["api_key"] = "rotated"
+
+        catalog.get("a")
+        assert fetcher.calls == ["a", "a"]
@@ -0,0 +1,53 @@
+"""
+Unit tests for precompiled prompt templates and the static prefix cache.
+"""
+import os
+import sys
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.gpt.prompt_builder import PromptTemplate, _static_prefix, generate_base_prompt, get_static_prefix
+
+
+class TestPromptBuilder:
+
+    def test_template_renders_like_format(self):
+        template = PromptTemplate("a {x} b {y}!", version=1)
+        assert template.render(x=1, y="z") == "a {x} b {y}!".format(x=1, y="z")
+        assert template.render(x=None, y="") == "a  b !"
+
+    def test_static_instructions_first_transcript_last(self):
+        prompt = generate_base_prompt("Title", "00:00 - hello", ["tag"], _format=["link"], style="minimal",
+                                      extras="extra ask")
+        prefix = get_static_prefix("minimal", ["link"])
+        assert prompt.startswith(prefix)
+        assert prompt.rstrip().endswith("00:00 - hello\n---")
+        assert prompt.index("Title") > prompt.index("精简信息")
+        assert prompt.index("extra ask") < prompt.index("00:00 - hello")
+
+    def test_prefix_shared_across_videos(self):
+        a = generate_base_prompt("A", "00:00 - one", "t1", _format=["toc", "summary"], style="detailed")
+        b = generate_base_prompt("B", "00:05 - two", "t2", _format=["summary", "toc"], style="detailed")
+        prefix = get_static_prefix("detailed", ["toc", "summary"])
+        assert a.startswith(prefix) and b.startswith(prefix)
+
+    def test_prefix_cached_per_combination(self):
+        _static_prefix.cache_clear()
+        get_static_prefix("academic", ["screenshot", "link"])
+        get_static_prefix("academic", ["link", "screenshot", "link"])
+        get_static_prefix("academic", [])
+        info = _static_prefix.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+
+    def test_legacy_gpt_uses_shared_instructions(self):
+        from app.gpt.openai_gpt import OpenaiGPT
+        from app.gpt.prompt import AI_SUM, LINK
+        from app.models.transcriber_model import TranscriptSegment
+
+        gpt = OpenaiGPT.__new__(OpenaiGPT)
+        gpt.screenshot, gpt.link = False, True
+        content = gpt.create_messages([TranscriptSegment(start=0, end=2, text="hello")], "Title", "tag")[0]["content"]
+        assert content.startswith(get_static_prefix())
+        assert LINK in content and AI_SUM in content
+        assert content.index(AI_SUM) < content.index("00:00 - hello")
@@ -0,0 +1,63 @@
+"""
+Unit tests for the system/user message split, cache_control hints and
+cached-token usage extraction.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.gpt.prompt_cache import extract_usage, supports_cache_control
+from app.gpt.universal_gpt import UniversalGPT
+from app.models.transcriber_model import TranscriptSegment
+
+
+def build(gpt, title, text):
+    return gpt.create_messages([TranscriptSegment(start=0, end=3, text=text)], title=title, tags="",
+                               _format=["toc"], style="minimal", video_img_urls=[])
+
+
+class TestMessageSplit:
+
+    def test_system_prefix_is_stable_across_videos(self):
+        gpt = UniversalGPT(client=None, model="gpt-4o")
+        a = build(gpt, "A", "first video")
+        b = build(gpt, "B", "second video")
+
+        assert [m["role"] for m in a] == ["system", "user"]
+        assert a[0] == b[0]
+        assert isinstance(a[0]["content"], str)
+        assert "first video" in a[1]["content"][0]["text"]
+        assert "first video" not in a[0]["content"]
+
+    def test_cache_control_hint_on_system_message(self):
+        gpt = UniversalGPT(client=None, model="claude-3-5-sonnet", cache_control=True)
+        system = build(gpt, "A", "text")[0]["content"]
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_supports_cache_control(self):
+        assert supports_cache_control("https://openrouter.ai/api/v1", "openai/gpt-4o")
+        assert supports_cache_control("https://dashscope.aliyuncs.com/compatible-mode/v1", "qwen-max")
+        assert supports_cache_control("https://proxy.example.com/v1", "claude-3-5-sonnet")
+        assert not supports_cache_control("https://api.openai.com/v1", "gpt-4o")
+
+
+class TestUsageExtraction:
+
+    def test_openai_cached_tokens(self):
+        response = SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=1200, completion_tokens=300,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1024)))
+        usage = extract_usage(response)
+        assert (usage.prompt_tokens, usage.cached_tokens, usage.uncached_tokens) == (1200, 1024, 176)
+
+    def test_deepseek_cache_hit_tokens(self):
+        response = SimpleNamespace(usage={"prompt_tokens": 900, "completion_tokens": 10,
+                                          "prompt_cache_hit_tokens": 640})
+        assert extract_usage(response).cached_tokens == 640
+
+    def test_missing_usage(self):
+        assert extract_usage(SimpleNamespace()) is None
+        assert extract_usage(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=5))).cached_tokens == 0
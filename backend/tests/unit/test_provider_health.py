@@ -0,0 +1,96 @@
+"""
+Unit tests for provider health tracking and failover selection.
+"""
+import os
+import sys
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.registry import provider_registry
+from app.services.provider_health import ProviderHealthMonitor, normalize_model_name
+
+PROVIDERS = [
+    {"id": "slow", "name": "Slow", "enabled": 1},
+    {"id": "fast", "name": "Fast", "enabled": 1},
+    {"id": "down", "name": "Down", "enabled": 1},
+    {"id": "other", "name": "Other", "enabled": 1},
+]
+MODELS = {
+    "slow": [{"model_name": "gpt-4o"}],
+    "fast": [{"model_name": "openai/GPT-4o"}],
+    "down": [{"model_name": "gpt-4o"}],
+    "other": [{"model_name": "qwen-max"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(provider_registry, "get_enabled_providers", lambda: [dict(p) for p in PROVIDERS])
+    monkeypatch.setattr(provider_registry, "get_all_providers", lambda: [dict(p) for p in PROVIDERS])
+    monkeypatch.setattr(provider_registry, "get_models_by_provider", lambda pid: MODELS.get(str(pid), []))
+
+
+def record_many(monitor, provider_id, latencies, ok=True):
+    for latency in latencies:
+        monitor.record(provider_id, latency, ok, None if ok else "boom")
+
+
+class TestProviderHealthMonitor:
+
+    def test_rolling_percentiles_and_error_rate(self):
+        monitor = ProviderHealthMonitor(window=10)
+        record_many(monitor, "slow", [i / 100 for i in range(1, 21)])
+        monitor.record("slow", 5.0, False, "timeout")
+
+        stats = monitor.stats("slow")
+        assert stats["samples"] == 10
+        assert stats["p50_ms"] == 160.0
+        assert stats["p95_ms"] == 200.0
+        assert stats["error_rate"] == 0.1
+        assert stats["last_error"] == "timeout"
+        assert not stats["degraded"]
+
+    def test_consecutive_failures_degrade(self):
+        monitor = ProviderHealthMonitor()
+        record_many(monitor, "down", [0.1] * 10)
+        record_many(monitor, "down", [1.0] * 3, ok=False)
+        assert monitor.is_degraded("down")
+
+        monitor.record("down", 0.1, True)
+        assert not monitor.is_degraded("down")
+
+    def test_failover_picks_fastest_healthy_equivalent(self):
+        monitor = ProviderHealthMonitor()
+        record_many(monitor, "down", [1.0] * 3, ok=False)
+        record_many(monitor, "slow", [0.9] * 5)
+        record_many(monitor, "fast", [0.2] * 5)
+        record_many(monitor, "other", [0.05] * 5)
+
+        provider, model = monitor.pick_failover("down", "gpt-4o")
+        assert provider["id"] == "fast"
+        assert model == "openai/GPT-4o"
+
+    def test_no_failover_when_healthy_or_no_candidate(self):
+        monitor = ProviderHealthMonitor()
+        record_many(monitor, "slow", [0.5] * 5)
+        assert monitor.pick_failover("slow", "gpt-4o") is None
+
+        record_many(monitor, "down", [1.0] * 3, ok=False)
+        assert monitor.pick_failover("down", "claude-3") is None
+
+    def test_probe_all_records_results(self):
+        def prober(provider):
+            if provider["id"] == "down":
+                raise ConnectionError("refused")
+
+        monitor = ProviderHealthMonitor(prober=prober)
+        monitor.probe_all()
+
+        assert monitor.stats("fast")["samples"] == 1
+        assert monitor.stats("down")["last_error"] == "refused"
+
+    def test_normalize_model_name(self):
+        assert normalize_model_name("OpenAI/GPT-4o ") == "gpt-4o"
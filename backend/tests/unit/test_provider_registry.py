@@ -0,0 +1,102 @@
+"""
+Unit tests for the in-process provider/model registry.
+
+The registry and DAOs are pointed at an in-memory SQLite database; a
+counting session factory verifies that lookups are served from memory
+and that DAO writes invalidate the snapshot.
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db import model_dao, provider_dao, registry as registry_module
+from app.db.engine import Base
+from app.db.registry import ProviderRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    sessions = {"count": 0}
+
+    def get_db():
+        sessions["count"] += 1
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    reg = ProviderRegistry()
+    for module in (registry_module, provider_dao, model_dao):
+        monkeypatch.setattr(module, "get_db", get_db)
+    for module in (provider_dao, model_dao):
+        monkeypatch.setattr(module, "provider_registry", reg)
+    reg.sessions = sessions
+    yield reg
+    engine.dispose()
+
+
+def _insert(id_="p1", name="OpenAI"):
+    provider_dao.insert_provider(id_, name, "sk-1234567890", "https://api.test/v1", "custom", "openai")
+
+
+class TestProviderRegistry:
+    def test_lookups_are_served_from_memory(self, registry):
+        _insert()
+        registry.load()
+        before = registry.sessions["count"]
+        for _ in range(10):
+            assert registry.get_provider_by_id("p1")["name"] == "OpenAI"
+            assert registry.get_provider_by_name("OpenAI")["id"] == "p1"
+            assert len(registry.get_all_providers()) == 1
+        assert registry.sessions["count"] == before
+
+    def test_provider_writes_invalidate(self, registry):
+        _insert()
+        assert registry.get_provider_by_id("p1")["enabled"] == 1
+
+        provider_dao.update_provider("p1", enabled=0)
+        assert registry.get_provider_by_id("p1")["enabled"] == 0
+
+        provider_dao.delete_provider("p1")
+        assert registry.get_provider_by_id("p1") is None
+
+    def test_model_writes_invalidate(self, registry):
+        _insert()
+        assert registry.get_models_by_provider("p1") == []
+
+        model = model_dao.insert_model("p1", "gpt-4o")
+        assert registry.get_model_by_provider_and_name("p1", "gpt-4o")["id"] == model["id"]
+        assert [m["model_name"] for m in registry.get_all_models()] == ["gpt-4o"]
+
+        model_dao.delete_model(model["id"])
+        assert registry.get_models_by_provider("p1") == []
+
+    def test_returned_dicts_are_copies(self, registry):
+        _insert()
+        registry.get_provider_by_id("p1")["api_key"] = "changed"
+        assert registry.get_provider_by_id("p1")["api_key"] == "sk-1234567890"
+
+    def test_load_racing_with_write_is_not_cached(self, registry, monkeypatch):
+        _insert()
+        original = registry_module.provider_row_to_dict
+
+        def row_to_dict_with_concurrent_write(p):
+            registry.invalidate()
+            return original(p)
+
+        monkeypatch.setattr(registry_module, "provider_row_to_dict", row_to_dict_with_concurrent_write)
+        registry.get_provider_by_id("p1")
+        assert registry._snapshot is None
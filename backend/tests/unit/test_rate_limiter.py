@@ -0,0 +1,132 @@
+"""
+Unit tests for the per-provider LLM rate limiter and retry scheduler.
+
+A fake clock whose sleep advances time keeps the tests deterministic.
+"""
+import os
+import sys
+
+import httpx
+import pytest
+from openai import BadRequestError, InternalServerError, RateLimitError
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.gpt.rate_limiter import LLMScheduler, RateLimit, estimate_tokens, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def api_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_scheduler(clock, default=None, overrides=None, max_retries=3):
+    return LLMScheduler(default=default or RateLimit(), overrides=overrides or {}, max_retries=max_retries,
+                        clock=clock, sleep=clock.sleep)
+
+
+class TestRateLimits:
+
+    def test_rpm_queues_excess_requests(self, clock):
+        scheduler = make_scheduler(clock, default=RateLimit(rpm=2))
+        waits = [scheduler.acquire("p1", 10) for _ in range(4)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(30.0)
+        assert waits[3] == pytest.approx(30.0)
+
+    def test_tpm_limits_by_estimated_tokens(self, clock):
+        scheduler = make_scheduler(clock, default=RateLimit(tpm=6000))
+        assert scheduler.acquire("p1", 5000) == 0.0
+        # 4000 tokens short at 100 tokens/s
+        assert scheduler.acquire("p1", 5000) == pytest.approx(40.0)
+
+    def test_limits_are_per_provider(self, clock):
+        scheduler = make_scheduler(clock, default=RateLimit(rpm=1), overrides={"big": RateLimit(rpm=100)})
+        assert scheduler.acquire("a", 1) == 0.0
+        assert scheduler.acquire("b", 1) == 0.0
+        assert scheduler.acquire("big", 1) == 0.0
+        assert scheduler.acquire("big", 1) == 0.0
+        assert scheduler.acquire("a", 1) > 0
+
+    def test_unlimited_by_default(self, clock):
+        scheduler = make_scheduler(clock)
+        assert all(scheduler.acquire("p1", 10 ** 6) == 0.0 for _ in range(100))
+
+
+class TestRetries:
+
+    def test_retries_429_honouring_retry_after(self, clock):
+        scheduler = make_scheduler(clock)
+        calls = []
+
+        def fn():
+            calls.append(clock.now)
+            if len(calls) < 3:
+                raise api_error(RateLimitError, 429, {"retry-after": "7"})
+            return "ok"
+
+        result, stats = scheduler.call("p1", 100, fn)
+        assert result == "ok"
+        assert stats.retries == 2
+        assert all(7 <= s <= 8 for s in clock.sleeps)
+        assert stats.retry_wait == pytest.approx(sum(clock.sleeps))
+
+    def test_5xx_retried_until_exhausted(self, clock):
+        scheduler = make_scheduler(clock, max_retries=2)
+
+        def fn():
+            raise api_error(InternalServerError, 503)
+
+        with pytest.raises(InternalServerError):
+            scheduler.call("p1", 100, fn)
+        assert len(clock.sleeps) == 2
+
+    def test_client_errors_are_not_retried(self, clock):
+        scheduler = make_scheduler(clock)
+
+        def fn():
+            raise api_error(BadRequestError, 400)
+
+        with pytest.raises(BadRequestError):
+            scheduler.call("p1", 100, fn)
+        assert clock.sleeps == []
+
+    def test_queue_wait_reported(self, clock):
+        scheduler = make_scheduler(clock, default=RateLimit(rpm=1))
+        scheduler.call("p1", 1, lambda: "first")
+        _, stats = scheduler.call("p1", 1, lambda: "second")
+        assert stats.queue_wait == pytest.approx(60.0)
+
+
+class TestHelpers:
+
+    def test_estimate_tokens_counts_cjk_per_char(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("你好世界") == 4
+        assert estimate_tokens("a" * 40) == 10
+
+    def test_retry_after_http_date(self):
+        exc = api_error(RateLimitError, 429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert retry_after_seconds(exc) == 0.0
+        assert retry_after_seconds(api_error(RateLimitError, 429)) is None
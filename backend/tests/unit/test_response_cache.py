@@ -0,0 +1,113 @@
+"""
+Unit tests for the on-disk LLM response cache and its use in UniversalGPT.
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.gpt import universal_gpt
+from app.gpt.response_cache import ResponseCache, make_cache_key
+from app.gpt.universal_gpt import UniversalGPT
+from app.models.gpt_model import GPTSource
+from app.models.transcriber_model import TranscriptSegment
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(directory=str(tmp_path), ttl=3600, max_entries=3)
+
+
+class FakeClient:
+    """Minimal OpenAI client stand-in that counts chat completion calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f" note {self.calls} "))])
+
+
+def make_source(**kwargs):
+    return GPTSource(segment=[TranscriptSegment(start=0, end=5, text="hello")], title="T", tags="", video_img_urls=[],
+                     **kwargs)
+
+
+class TestResponseCache:
+
+    def test_key_is_canonical(self):
+        a = make_cache_key("m", 0.7, [{"role": "user", "content": [{"type": "text", "text": "x"}]}])
+        b = make_cache_key("m", 0.7, [{"content": [{"text": "x", "type": "text"}], "role": "user"}])
+        assert a == b
+        assert a != make_cache_key("m2", 0.7, [{"role": "user", "content": [{"type": "text", "text": "x"}]}])
+        assert a != make_cache_key("m", 0.2, [{"role": "user", "content": [{"type": "text", "text": "x"}]}])
+
+    def test_round_trip_persists_across_instances(self, cache, tmp_path):
+        cache.put("k1", "content", model="m")
+        assert cache.get("k1") == "content"
+        assert ResponseCache(directory=str(tmp_path)).get("k1") == "content"
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = ResponseCache(directory=str(tmp_path), ttl=0)
+        cache.put("k1", "content")
+        assert cache.get("k1") is None
+        assert not (tmp_path / "k1.json").exists()
+
+    def test_lru_eviction(self, cache, tmp_path):
+        for key in ("a", "b", "c"):
+            cache.put(key, key)
+        cache.get("a")
+        cache.put("d", "d")
+
+        assert cache.get("b") is None
+        assert not (tmp_path / "b.json").exists()
+        assert [cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+
+    def test_lru_order_restored_from_mtime(self, cache, tmp_path):
+        for i, key in enumerate(("a", "b", "c")):
+            cache.put(key, key)
+            os.utime(tmp_path / f"{key}.json", (time.time() - 100 + i, time.time() - 100 + i))
+        os.utime(tmp_path / "a.json")  # most recently used
+
+        reloaded = ResponseCache(directory=str(tmp_path), max_entries=3)
+        reloaded.put("d", "d")
+        assert reloaded.get("b") is None
+        assert reloaded.get("a") == "a"
+
+    def test_disabled_cache_is_noop(self, tmp_path):
+        cache = ResponseCache(directory=str(tmp_path), enabled=False)
+        cache.put("k1", "content")
+        assert cache.get("k1") is None
+
+
+class TestSummarizeCaching:
+
+    def test_repeat_summaries_hit_cache(self, cache, monkeypatch):
+        monkeypatch.setattr(universal_gpt, "llm_response_cache", cache)
+        client = FakeClient()
+        gpt = UniversalGPT(client=client, model="m")
+
+        assert gpt.summarize(make_source()) == "note 1"
+        assert gpt.summarize(make_source()) == "note 1"
+        assert gpt.cache_hit
+        assert client.calls == 1
+
+        assert gpt.summarize(make_source(style="detailed")) == "note 2"
+        assert client.calls == 2
+
+    def test_bypass_refreshes_cache(self, cache, monkeypatch):
+        monkeypatch.setattr(universal_gpt, "llm_response_cache", cache)
+        client = FakeClient()
+        gpt = UniversalGPT(client=client, model="m")
+
+        gpt.summarize(make_source())
+        assert gpt.summarize(make_source(bypass_cache=True)) == "note 2"
+        assert not gpt.cache_hit
+        assert gpt.summarize(make_source()) == "note 2"
@@ -0,0 +1,148 @@
+"""
+Unit tests for the compact note result store.
+
+Covers round-tripping a NoteResult, raw_info trimming, lazy markdown and
+time-range segment reads, and the fallback to legacy {task_id}.json files.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models.audio_model import AudioDownloadResult
+from app.models.notes_model import NoteResult
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.services.result_store import ResultStore, dump_transcript, load_transcript, parse_fields
+
+
+def make_note(segment_count=10):
+    segments = [TranscriptSegment(start=i * 10.0, end=i * 10.0 + 9.5, text=f"line {i}")
+                for i in range(segment_count)]
+    transcript = TranscriptResult(language="zh", full_text=" ".join(s.text for s in segments),
+                                  segments=segments, raw={"bulky": "x" * 1000})
+    audio = AudioDownloadResult(
+        file_path="/tmp/a.m4a", title="Title", duration=100.0, cover_url=None,
+        platform="bilibili", video_id="BV1", raw_info={"tags": ["a", "b"], "formats": [{"url": "x"}] * 50},
+    )
+    return NoteResult(markdown="# 笔记\n\n内容", transcript=transcript, audio_meta=audio)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path), compression="gzip", block_size=3)
+
+
+class TestResultStore:
+
+    def test_round_trip_drops_raw_bulk(self, store):
+        store.save("t1", make_note())
+        result = store.load("t1")
+
+        assert result["markdown"] == "# 笔记\n\n内容"
+        assert result["audio_meta"]["raw_info"] == {"tags": ["a", "b"]}
+        assert result["transcript"]["raw"] is None
+        assert len(result["transcript"]["segments"]) == 10
+        assert result["transcript"]["segments"][4] == {"start": 40.0, "end": 49.5, "text": "line 4"}
+
+    def test_lazy_reads(self, store):
+        store.save("t1", make_note())
+
+        assert store.load_markdown("t1") == "# 笔记\n\n内容"
+        segments = store.load_segments("t1", start=35, end=60)
+        assert [s["text"] for s in segments] == ["line 3", "line 4", "line 5"]
+        assert store.load_audio_meta("t1")["video_id"] == "BV1"
+
+    def test_range_read_only_touches_matching_blocks(self, store):
+        store.save("t1", make_note())
+        # blocks hold 3 segments each; remove the ones that do not cover 0-20s
+        for name in ("segments-1.gz", "segments-2.gz", "segments-3.gz"):
+            os.remove(store.path_for("t1") / name)
+
+        assert [s["text"] for s in store.load_segments("t1", end=20)] == ["line 0", "line 1"]
+
+    def test_resave_replaces_result_and_legacy_file(self, store):
+        legacy = store.legacy_path_for("t1")
+        legacy.parent.mkdir(parents=True, exist_ok=True)
+        legacy.write_text(json.dumps({"markdown": "old"}), encoding="utf-8")
+
+        store.save("t1", make_note(2))
+        store.save("t1", make_note(4))
+
+        assert not legacy.exists()
+        assert len(store.load("t1")["transcript"]["segments"]) == 4
+
+    def test_legacy_json_fallback(self, store, tmp_path):
+        legacy = {"markdown": "legacy", "transcript": {"segments": [
+            {"start": 0, "end": 5, "text": "a"}, {"start": 5, "end": 10, "text": "b"}]}}
+        (tmp_path / "old.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        assert store.exists("old")
+        assert store.load("old") == legacy
+        assert store.load_markdown("old") == "legacy"
+        assert store.load_segments("old", start=6) == [{"start": 5, "end": 10, "text": "b"}]
+        assert store.load("missing") is None
+
+
+class TestFieldSelection:
+
+    def test_parse_fields(self):
+        assert parse_fields(None) is None
+        assert parse_fields("markdown, audio_meta.title,audio_meta.duration") == {
+            "markdown": None, "audio_meta": {"title": None, "duration": None}}
+        assert parse_fields("audio_meta,audio_meta.title") == {"audio_meta": None}
+
+    def test_load_fields_reads_only_selected_parts(self, store):
+        store.save("t1", make_note())
+        # without the transcript parts the selection must still be served
+        for part in store.path_for("t1").iterdir():
+            if part.name.startswith(("segments-", "full_text")):
+                part.unlink()
+
+        result = store.load_fields("t1", parse_fields("markdown,audio_meta.title,transcript.language"))
+        assert result == {"markdown": "# 笔记\n\n内容", "audio_meta": {"title": "Title"},
+                          "transcript": {"language": "zh"}}
+
+    def test_load_fields_projects_segments(self, store):
+        store.save("t1", make_note(2))
+        result = store.load_fields("t1", parse_fields("transcript.segments.text"))
+        assert result == {"transcript": {"segments": [{"text": "line 0"}, {"text": "line 1"}]}}
+
+    def test_variants_round_trip(self, store):
+        note = make_note(2)
+        note.variants = [
+            {"style": "minimal", "format": [], "markdown": "# 简要", "error": None},
+            {"style": "detailed", "format": ["link"], "markdown": None, "error": "timeout"},
+        ]
+        store.save("t1", note)
+
+        assert store.load("t1")["variants"] == note.variants
+        result = store.load_fields("t1", parse_fields("variants.style,variants.error"))
+        assert result == {"variants": [{"style": "minimal", "error": None},
+                                       {"style": "detailed", "error": "timeout"}]}
+
+    def test_version_tag_changes_on_resave(self, store):
+        assert store.version_tag("t1") is None
+        store.save("t1", make_note(2))
+        first = store.version_tag("t1")
+        store.save("t1", make_note(5))
+        assert store.version_tag("t1") != first
+
+
+class TestTranscriptCache:
+
+    def test_columnar_round_trip(self):
+        transcript = make_note(3).transcript
+        restored = load_transcript(dump_transcript(transcript))
+
+        assert restored.segments == transcript.segments
+        assert restored.full_text == transcript.full_text
+        assert restored.raw is None
+
+    def test_reads_legacy_row_format(self):
+        data = json.dumps({"language": "en", "full_text": "hi",
+                           "segments": [{"start": 0, "end": 1, "text": "hi"}]}).encode()
+        assert load_transcript(data).segments == [TranscriptSegment(start=0, end=1, text="hi")]
@@ -0,0 +1,107 @@
+"""
+Unit tests for the per-task stage timeline.
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.metrics import observe_stage, stage_timer
+from app.utils.trace import TaskTrace, current_trace, load_trace, trace_annotate, trace_event
+
+
+@pytest.fixture
+def trace():
+    trace = TaskTrace("task-1")
+    token = current_trace.set(trace)
+    yield trace
+    current_trace.reset(token)
+
+
+class TestTaskTrace:
+
+    def test_stage_timer_records_span_with_attrs(self, trace):
+        with stage_timer("download", platform="bilibili") as span:
+            span.set(backend="BilibiliDownloader", cache="miss", bytes=None)
+            span.set(bytes=1024)
+        observe_stage("audio_extract", 0.5)
+
+        spans = trace.to_dict()["spans"]
+        download = next(s for s in spans if s["name"] == "download")
+        assert download["backend"] == "BilibiliDownloader"
+        assert download["bytes"] == 1024
+        assert download["cache"] == "miss"
+        assert download["end"] >= download["start"]
+        extract = next(s for s in spans if s["name"] == "audio_extract")
+        assert extract["duration"] == 0.5
+
+    def test_failed_stage_records_error(self, trace):
+        with pytest.raises(ValueError):
+            with stage_timer("llm"):
+                raise ValueError("rate limited")
+        assert trace.to_dict()["spans"][0]["error"] == "ValueError: rate limited"
+
+    def test_event_and_annotate(self, trace):
+        trace_event("transcription", cache="hit")
+        with stage_timer("transcription"):
+            pass
+        trace_annotate("transcription", backend="fast-whisper")
+
+        first, second = trace.to_dict()["spans"]
+        assert first["duration"] == 0 and first["cache"] == "hit"
+        assert "backend" not in first
+        assert second["backend"] == "fast-whisper"
+
+    def test_context_copied_into_worker_threads(self, trace):
+        def work():
+            with stage_timer("frame_extract"):
+                pass
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="video") as pool:
+            pool.submit(copy_context().run, work).result()
+        span = trace.to_dict()["spans"][0]
+        assert span["name"] == "frame_extract"
+        assert span["thread"].startswith("video")
+
+    def test_no_trace_outside_task(self):
+        with stage_timer("save"):
+            pass
+        trace_event("download", cache="hit")
+        assert current_trace.get() is None
+
+    def test_save_and_load(self, trace, tmp_path):
+        with stage_timer("post_process"):
+            pass
+        trace.save(str(tmp_path))
+
+        data = load_trace("task-1", str(tmp_path))
+        assert data["task_id"] == "task-1"
+        assert [s["name"] for s in data["spans"]] == ["post_process"]
+        assert load_trace("missing", str(tmp_path)) is None
+
+
+def test_run_note_task_persists_task_and_save_spans(tmp_path, monkeypatch):
+    from app.routers import note as note_router
+
+    class FakeGenerator:
+        def generate(self, task_id, **kwargs):
+            with stage_timer("llm"):
+                pass
+            return type("Note", (), {"markdown": "# note"})()
+
+    monkeypatch.setattr(note_router, "NOTE_OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(note_router, "NoteGenerator", FakeGenerator)
+    monkeypatch.setattr(note_router, "save_note_to_file", lambda task_id, note: None)
+
+    # Background tasks run in their own context; keep the trace from leaking into other tests
+    copy_context().run(note_router.run_note_task, "task-2", "https://example.com/v", "bilibili", "fast",
+                       model_name="m", provider_id="p")
+
+    names = [s["name"] for s in load_trace("task-2", str(tmp_path))["spans"]]
+    assert set(names) == {"task", "llm", "save"}
+    assert names[0] == "task"
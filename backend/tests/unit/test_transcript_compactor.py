@@ -0,0 +1,84 @@
+"""
+Unit tests for transcript compaction before prompting.
+"""
+import os
+import sys
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.gpt.transcript_compactor import (
+    compact_transcript, context_tokens_for, dedup_segments, format_time, merge_segments,
+)
+from app.models.transcriber_model import TranscriptSegment
+
+
+def seg(start, text, length=3.0):
+    return TranscriptSegment(start=start, end=start + length, text=text)
+
+
+class TestCompaction:
+
+    def test_format_time_keeps_hours_as_minutes(self):
+        assert format_time(65) == "01:05"
+        assert format_time(4530.9) == "75:30"
+
+    def test_dedup_drops_repeats_and_hallucinations(self):
+        segments = [
+            seg(0, "今天讲排序算法"),
+            seg(3, "今天讲排序算法。"),
+            seg(6, "好的好的好的好的好的"),
+            seg(9, "请不吝点赞 订阅 转发 打赏支持明镜与点点栏目"),
+            seg(12, "Thanks for watching!"),
+            seg(15, "价格是10000元"),
+        ]
+        kept, dropped = dedup_segments(segments)
+        assert [s.text for s in kept] == ["今天讲排序算法", "好的", "价格是10000元"]
+        assert dropped == 3
+
+    def test_merge_into_time_buckets(self):
+        segments = [seg(t, f"s{t}") for t in range(0, 60, 5)]
+        merged = merge_segments(segments, 20)
+        assert [(m.start, m.text) for m in merged] == [
+            (0, "s0 s5 s10 s15"), (20, "s20 s25 s30 s35"), (40, "s40 s45 s50 s55")]
+        assert merged[-1].end == 58
+
+    def test_report_counts_saved_tokens(self):
+        segments = [seg(t, f"sentence number {t}") for t in range(0, 600, 3)]
+        text, report = compact_transcript(segments, bucket_seconds=30)
+        assert report.original_segments == 200
+        assert report.compacted_segments == 20
+        assert report.saved_tokens > 0
+        assert text.splitlines()[1].startswith("00:30 - ")
+
+    def test_budget_grows_buckets_then_truncates(self):
+        segments = [seg(t, f"第{t}秒的内容讲解") for t in range(0, 3600, 3)]
+        _, report = compact_transcript(segments, token_budget=10000, bucket_seconds=10)
+        assert report.bucket_seconds > 10 and not report.truncated
+        assert report.compacted_tokens <= 10000
+
+        text, report = compact_transcript(segments, token_budget=2000, bucket_seconds=10)
+        assert report.truncated
+        assert report.compacted_tokens <= 2000
+        assert text.splitlines()[-1].startswith("55:00 - ")
+
+    def test_budget_below_timestamp_overhead_drops_whole_segments(self):
+        segments = [seg(t, f"第{t}秒的内容讲解" * 5) for t in range(0, 36000, 3)]
+        text, report = compact_transcript(segments, token_budget=60, bucket_seconds=10)
+        assert report.truncated
+        assert report.compacted_tokens <= 60
+        assert 1 < report.compacted_segments < 120
+        # every kept line still carries text, not just a timestamp
+        assert all(line.split(" - ", 1)[1] for line in text.splitlines())
+        assert int(text.splitlines()[-1].split(":")[0]) >= 500
+
+    def test_default_keeps_original_segments(self):
+        segments = [seg(t, f"s{t}") for t in range(0, 60, 5)]
+        _, report = compact_transcript(segments)
+        assert report.bucket_seconds == 0
+        assert report.compacted_segments == len(segments)
+
+    def test_context_tokens_longest_prefix(self):
+        assert context_tokens_for("gpt-4o-mini") == 128000
+        assert context_tokens_for("gpt-4-0613") == 8192
+        assert context_tokens_for("deepseek-ai/DeepSeek-V3") == 64000
@@ -0,0 +1,190 @@
+"""
+Unit tests for low-resolution / remote-stream frame extraction.
+
+Tests the yt-dlp format selection helpers and the ffmpeg commands that
+VideoReader builds for local files and remote streams.
+"""
+import os
+import sys
+
+import pytest
+import yt_dlp
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from PIL import Image
+
+from app.downloaders.base import low_res_video_opts, video_stream_from_info
+from app.utils.image_budget import ImageBudget
+from app.utils.video_helper import format_http_headers
+from app.utils.video_reader import VideoReader
+
+
+class TestLowResFormatSelection:
+    """Tests for low_res_video_opts."""
+
+    def test_prefers_video_only_streams(self):
+        """Video-only formats are tried before falling back to muxed best."""
+        opts = low_res_video_opts(720)
+        assert opts["format"].split("/")[0].startswith("bv")
+        assert opts["format"].endswith("/b[ext=mp4]")
+
+    @staticmethod
+    def _select(formats, max_height=720):
+        info = {
+            "id": "vid", "title": "vid", "extractor": "generic", "extractor_key": "Generic",
+            "webpage_url": "https://example.invalid/vid",
+            "formats": [
+                {"format_id": fid, "ext": ext, "height": h, "width": h * 16 // 9, "vcodec": vcodec,
+                 "acodec": acodec, "url": f"https://example.invalid/{fid}", "protocol": "https", "filesize": h * 1000}
+                for fid, ext, h, vcodec, acodec in formats
+            ],
+        }
+        with yt_dlp.YoutubeDL({"quiet": True, "simulate": True, **low_res_video_opts(max_height)}) as ydl:
+            return ydl.process_ie_result(info, download=False)
+
+    def test_picks_low_res_mp4_video_only(self):
+        """The largest mp4 video-only stream within the cell height is chosen."""
+        selected = self._select([
+            ("avc-1080", "mp4", 1080, "avc1", "none"),
+            ("avc-720", "mp4", 720, "avc1", "none"),
+            ("vp9-720", "webm", 720, "vp9", "none"),
+            ("18", "mp4", 360, "avc1", "mp4a"),
+        ])
+        assert selected["format_id"] == "avc-720"
+
+    def test_fallback_never_selects_webm(self):
+        """Without mp4 video-only streams the muxed mp4 wins over webm, so the .mp4 output path exists."""
+        selected = self._select([
+            ("vp9-720", "webm", 720, "vp9", "none"),
+            ("vp9-1080", "webm", 1080, "vp9", "none"),
+            ("webm-muxed", "webm", 720, "vp9", "opus"),
+            ("18", "mp4", 360, "avc1", "mp4a"),
+        ])
+        assert selected["format_id"] == "18"
+        assert selected["ext"] == "mp4"
+
+    def test_sorts_by_target_resolution_then_size(self):
+        """Resolution is capped at the grid cell height, smaller files win ties."""
+        opts = low_res_video_opts(480)
+        assert opts["format_sort"][0] == "res:480"
+        assert "+size" in opts["format_sort"]
+
+
+class TestVideoStreamFromInfo:
+    """Tests for video_stream_from_info."""
+
+    def test_extracts_direct_url_and_headers(self):
+        info = {
+            "url": "https://cdn.example.com/v.m4s",
+            "http_headers": {"Referer": "https://www.bilibili.com/"},
+            "width": 1280,
+            "height": 720,
+            "duration": 300,
+            "filesize_approx": 1024,
+        }
+        stream = video_stream_from_info(info)
+        assert stream.url == info["url"]
+        assert stream.http_headers == {"Referer": "https://www.bilibili.com/"}
+        assert stream.height == 720
+        assert stream.duration == 300
+        assert stream.filesize == 1024
+
+    def test_returns_none_without_direct_url(self):
+        """Merged selections have no single url and cannot be range-read."""
+        assert video_stream_from_info({"requested_formats": [{}, {}]}) is None
+
+
+class TestVideoReaderCommands:
+    """Tests for the ffmpeg commands built by VideoReader."""
+
+    @pytest.fixture
+    def dirs(self, tmp_path):
+        return {"frame_dir": str(tmp_path / "frames"), "grid_dir": str(tmp_path / "grids")}
+
+    def test_local_file_command(self, dirs):
+        reader = VideoReader(video_path="/data/a.mp4", **dirs)
+        cmd = reader.build_frame_cmd(12, "/tmp/frame_00_12.jpg")
+        assert "-headers" not in cmd
+        assert cmd.index("-ss") < cmd.index("-i")
+        assert cmd[cmd.index("-i") + 1] == "/data/a.mp4"
+
+    def test_remote_stream_command_seeks_before_input(self, dirs):
+        """-ss before -i makes ffmpeg issue a range request at the timestamp."""
+        headers = {"Referer": "https://www.bilibili.com/", "User-Agent": "ua"}
+        reader = VideoReader(video_path="https://cdn.example.com/v.m4s", http_headers=headers, **dirs)
+        cmd = reader.build_frame_cmd(30, "/tmp/frame_00_30.jpg")
+        assert cmd.index("-ss") < cmd.index("-headers") < cmd.index("-i")
+        assert cmd[cmd.index("-headers") + 1] == "Referer: https://www.bilibili.com/\r\nUser-Agent: ua\r\n"
+
+    def test_known_duration_skips_probe(self, dirs):
+        reader = VideoReader(video_path="https://cdn.example.com/v.m4s", duration=125.5, **dirs)
+        assert reader.probe_duration() == 125.5
+
+
+class TestImageBudget:
+    """Tests for grid downscaling, re-encoding and the image count cap."""
+
+    @pytest.fixture
+    def frames(self, tmp_path):
+        frame_dir = tmp_path / "frames"
+        frame_dir.mkdir()
+        paths = []
+        for i in range(4):
+            path = frame_dir / f"frame_00_{i * 2:02d}.jpg"
+            Image.new("RGB", (1280, 720), (i * 60, 90, 160)).save(path, quality=90)
+            paths.append(str(path))
+        return {"frame_dir": str(frame_dir), "grid_dir": str(tmp_path / "grids"), "paths": paths}
+
+    def test_grid_fits_max_edge_as_webp(self, frames):
+        budget = ImageBudget(max_edge=1024, format="webp", quality=70, max_images=0)
+        reader = VideoReader(video_path="v.mp4", grid_size=(2, 2), unit_width=1280, unit_height=720,
+                             frame_dir=frames["frame_dir"], grid_dir=frames["grid_dir"], budget=budget)
+        path = reader.concat_images(frames["paths"], "grid_1")
+
+        assert path.endswith(".webp")
+        assert max(Image.open(path).size) <= 1024
+        urls = reader.encode_images_to_base64([path])
+        assert urls[0].startswith("data:image/webp;base64,")
+        assert reader.payload_report.payload_bytes == len(urls[0])
+
+    def test_smaller_than_unbudgeted_grid(self, frames):
+        plain = VideoReader(video_path="v.mp4", grid_size=(2, 2), unit_width=1280, unit_height=720,
+                            frame_dir=frames["frame_dir"], grid_dir=frames["grid_dir"])
+        budgeted = VideoReader(video_path="v.mp4", grid_size=(2, 2), unit_width=1280, unit_height=720,
+                               frame_dir=frames["frame_dir"], grid_dir=frames["grid_dir"], budget=ImageBudget())
+        plain_size = os.path.getsize(plain.concat_images(frames["paths"], "grid_plain"))
+        budget_size = os.path.getsize(budgeted.concat_images(frames["paths"], "grid_budget"))
+        assert budget_size < plain_size
+
+    def test_max_images_samples_evenly(self, frames):
+        dirs = {"frame_dir": frames["frame_dir"], "grid_dir": frames["grid_dir"]}
+        reader = VideoReader(video_path="v.mp4", budget=ImageBudget(max_images=3), **dirs)
+        groups = [[str(i)] for i in range(9)]
+        assert reader.select_groups(groups) == [["0"], ["3"], ["6"]]
+        assert VideoReader(video_path="v.mp4", **dirs).select_groups(groups) == groups
+
+    def test_only_frames_of_selected_grids_are_extracted(self, tmp_path, monkeypatch):
+        """Grids beyond max_images are dropped before any ffmpeg call."""
+        reader = VideoReader(video_path="https://cdn.example.com/v.m4s", grid_size=(2, 1), frame_interval=10,
+                             duration=95, unit_width=64, unit_height=36, frame_dir=str(tmp_path / "frames"),
+                             grid_dir=str(tmp_path / "grids"), budget=ImageBudget(max_images=2))
+        extracted = []
+
+        def fake_ffmpeg(cmd, check):
+            extracted.append(int(cmd[cmd.index("-ss") + 1]))
+            Image.new("RGB", (64, 36)).save(cmd[cmd.index("-y") + 1])
+
+        monkeypatch.setattr("app.utils.video_reader.subprocess.run", fake_ffmpeg)
+        urls = reader.run()
+
+        # 10 frames -> 5 grids of 2, evenly sampled down to grids 0 and 2
+        assert extracted == [0, 10, 40, 50]
+        assert len(urls) == 2
+        assert reader.payload_report.skipped == 3
+
+
+def test_format_http_headers_empty():
+    assert format_http_headers(None) == ""
+    assert format_http_headers({}) == ""
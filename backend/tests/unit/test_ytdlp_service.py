@@ -0,0 +1,144 @@
+"""
+Unit tests for the shared yt-dlp service.
+
+yt_dlp.YoutubeDL is replaced with a fake that records calls, so the
+tests cover instance reuse, metadata probing and cache short-circuiting
+without touching the network.
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.downloaders import ytdlp_service as module
+from app.downloaders.base import audio_quality
+from app.enmus.note_enums import DownloadQuality
+
+
+class FakeYoutubeDL:
+    created = []
+
+    def __init__(self, params):
+        self.params = params
+        self.extract_calls = 0
+        self.process_calls = 0
+        self.progress_hooks = []
+        self.pp_hooks = []
+        self.closed = False
+        FakeYoutubeDL.created.append(self)
+
+    def close(self):
+        self.closed = True
+
+    def add_progress_hook(self, hook):
+        self.progress_hooks.append(hook)
+
+    def add_postprocessor_hook(self, hook):
+        self.pp_hooks.append(hook)
+
+    def extract_info(self, url, download=False):
+        assert download is False
+        self.extract_calls += 1
+        return {"id": "abc", "ext": "m4a", "title": "t"}
+
+    def process_ie_result(self, info, download=True):
+        self.process_calls += 1
+        for hook in self.progress_hooks:
+            hook({"status": "finished", "downloaded_bytes": 1000})
+        for status in ("started", "finished"):
+            for hook in self.pp_hooks:
+                hook({"status": status, "postprocessor": "ExtractAudio"})
+        return {**info, "downloaded": True}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    FakeYoutubeDL.created = []
+    monkeypatch.setattr(module.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    return module.YtDlpService()
+
+
+class TestYtDlpService:
+    def test_instances_reused_per_options(self, service):
+        a = service.get_ydl({"format": "ba"})
+        assert service.get_ydl({"format": "ba"}) is a
+        assert service.get_ydl({"format": "bv"}) is not a
+        assert a.params["concurrent_fragment_downloads"] == module.YTDLP_CONCURRENT_FRAGMENTS
+
+    def test_instances_bounded_per_thread(self, service):
+        first = service.get_ydl({"format": "f0"})
+        for i in range(1, module.YTDLP_INSTANCES_PER_THREAD):
+            service.get_ydl({"format": f"f{i}"})
+        # touching the oldest instance keeps it; the next new one evicts f1 instead
+        assert service.get_ydl({"format": "f0"}) is first
+        service.get_ydl({"format": "new"})
+        evicted = [y for y in FakeYoutubeDL.created if y.closed]
+        assert [y.params["format"] for y in evicted] == ["f1"]
+        assert len(service._local.instances) == module.YTDLP_INSTANCES_PER_THREAD
+        assert service.get_ydl({"format": "f0"}) is first
+
+    def test_instances_isolated_per_thread(self, service):
+        main = service.get_ydl({"format": "ba"})
+        other = []
+        t = threading.Thread(target=lambda: other.append(service.get_ydl({"format": "ba"})))
+        t.start()
+        t.join()
+        assert other[0] is not main
+
+    def test_skips_download_when_outputs_exist(self, service, tmp_path):
+        (tmp_path / "abc.m4a").write_bytes(b"x")
+        info = service.download("u", {"format": "ba"}, lambda i: [str(tmp_path / f"{i['id']}.m4a")])
+        ydl = FakeYoutubeDL.created[0]
+        assert ydl.extract_calls == 1
+        assert ydl.process_calls == 0
+        assert "downloaded" not in info
+
+    def test_downloads_from_probed_info(self, service, tmp_path):
+        info = service.download("u", {"format": "ba"}, lambda i: [str(tmp_path / "missing.m4a")])
+        ydl = FakeYoutubeDL.created[0]
+        assert ydl.extract_calls == 1
+        assert ydl.process_calls == 1
+        assert info["downloaded"] is True
+
+    def test_probe_is_cached(self, service):
+        service.probe("u", {"format": "ba"})
+        service.probe("u", {"format": "ba"})
+        assert FakeYoutubeDL.created[0].extract_calls == 1
+
+
+class TestDownloadAudio:
+    def test_native_format_skips_transcode(self, service, tmp_path):
+        info, audio_path, video_path, stats = service.download_audio(
+            "u", str(tmp_path), quality="fast", audio_formats=("m4a",)
+        )
+        params = FakeYoutubeDL.created[-1].params
+        assert audio_path == str(tmp_path / "abc.m4a")
+        assert video_path is None
+        assert "postprocessors" not in params
+        assert params["format"].startswith("ba[ext=m4a]/")
+        assert params["format_sort"][0] == "abr:64"
+        assert stats.downloaded_bytes == 1000
+        assert stats.postprocess_seconds >= 0
+
+    def test_unsupported_format_transcodes_with_quality(self, service, tmp_path):
+        _, audio_path, _, _ = service.download_audio("u", str(tmp_path), quality="slow", audio_formats=())
+        params = FakeYoutubeDL.created[-1].params
+        assert audio_path == str(tmp_path / "abc.mp3")
+        assert params["postprocessors"][0]["preferredquality"] == "128"
+        assert "format_sort" not in params
+        # the transcode branch reuses the probed info instead of extracting again
+        assert sum(y.extract_calls for y in FakeYoutubeDL.created) == 1
+
+
+class TestAudioQuality:
+    def test_maps_download_quality(self):
+        assert audio_quality(DownloadQuality.fast) == "32"
+        assert audio_quality("medium") == "64"
+        assert audio_quality(DownloadQuality.slow) == "128"
+
+    def test_unknown_falls_back_to_fast(self):
+        assert audio_quality(None) == "32"